@@ -1,29 +1,55 @@
+from pathlib import Path
+
 from dash import Dash, html,dcc
 from dash.dependencies import Input, Output
-from .pages.about import create_about_me_page
 from .components.navbar import create_navbar
 from .components.footer import create_footer
 import dash_bootstrap_components as dbc
-from .pages.SpotifyDemo import create_spotify_page
-from .components.sphere_renderer import create_sphere_component
+from .components.sphere_callbacks import register_sphere_callbacks
+from .pages.registry import PageRegistry
+from .tools.asset_bundle import AssetBundles
+from .tools.compression import init_compression
+
+ASSETS_FOLDER = Path(__file__).parent / 'assets'
+
 
-def create_app():
+def create_app(bundle_assets=True):
+    """
+    bundle_assets: serve assets/*.css and *.js as fingerprinted, precompressed bundles
+    (see tools/asset_bundle.py). Turn it off to have Dash link and hot-reload them one by one.
+    """
+    bundles = AssetBundles(ASSETS_FOLDER) if bundle_assets else None
     app = Dash(
         __name__,
-        external_stylesheets=[dbc.themes.CYBORG],
+        external_stylesheets=[dbc.themes.CYBORG, *(bundles.urls('.css') if bundles else [])],
+        external_scripts=bundles.urls('.js') if bundles else [],
         suppress_callback_exceptions=True,
         assets_folder='assets',  # Tell Dash where to find your assets
-        assets_url_path='/assets'  # URL path where assets will be served from
+        assets_url_path='/assets',  # URL path where assets will be served from
+        assets_ignore=bundles.ignore_pattern if bundles else ''
     )
+    if bundles:
+        bundles.register(app.server)
+    init_compression(app.server)
     return app
 
 
-def init_app():
+def init_app(preload_pages=False):
+    """
+    Page modules (and the heavy libraries behind them) load on their first request.
+    preload_pages=True imports them up front instead, e.g. for a preloading pre-fork server.
+    """
     app = create_app()
 
     from .pages.SpotifyDemo import register_spotify_callbacks
     register_spotify_callbacks(app)
 
+    from .pages.art import register_art_routes
+    register_art_routes(app)
+
+    sphere_options = dict(render_mode='client', trace_layout='single')
+    register_sphere_callbacks(app, **sphere_options)
+
     #outer corners
     app.layout = html.Div([
         dcc.Location(id='url', refresh=False),
@@ -45,28 +71,33 @@ def init_app():
         ]),
     ])
 
+    # Page routing table; page modules are imported on first hit
+    pages = PageRegistry(fallback='/about')
+    pages.register(['/', '/about'], 'app.pages.about:create_about_me_page', static=True)
+    pages.register('/projects/spotify', 'app.pages.SpotifyDemo:create_spotify_page', static=True, prefix=True)
+    pages.register('/projects/strava', lambda: html.Div("Strava"), static=True)
+    pages.register('/games/poker', lambda: html.Div("Poker Page"), static=True)
+    pages.register('/games/chess', lambda: html.Div("Chess"), static=True)
+    pages.register(
+        '/visualArt/sphere', 'app.components.sphere_renderer:create_sphere_component',
+        static=True, prefix=True, **sphere_options
+    )
+    pages.register('/projects/', lambda: html.Div("Projects Page - Coming Soon"), static=True, prefix=True)
+
+    if preload_pages:
+        pages.preload('app.tools.Spotify', 'app.pages.svgDemo')
+
     # Page routing callback
     @app.callback(
         Output('page-content', 'children'),
         Input('url', 'pathname')
     )
     def display_page(pathname):
-        base_path = pathname.rstrip('/').split('?')[0]
-
-        if base_path == '/' or base_path == '/about':
-            return create_about_me_page()
-        elif base_path.startswith('/projects/spotify'):
-            return create_spotify_page()
-        elif base_path == '/projects/strava':
-            return html.Div("Strava")
-        elif base_path == '/games/poker':
-            return html.Div("Poker Page")
-        elif base_path == '/games/chess':
-            return html.Div("Chess")
-        elif base_path.startswith('/visualArt/sphere'):
-            return create_sphere_component(app)
-        elif base_path.startswith('/projects/'):
-            return html.Div("Projects Page - Coming Soon")
-        return create_about_me_page()
-
-    return app
\ No newline at end of file
+        return pages.render(pathname)
+
+    # Dash moves the registered callbacks into app.callback_map on the first request, without
+    # a lock; a threaded worker's first concurrent requests can miss them. Do it now instead,
+    # which also happens before the fork when gunicorn preloads the app.
+    app.server.test_client().get('/')
+
+    return app
@@ -0,0 +1,90 @@
+// Clientside callbacks for the sphere renderer (render_mode='client').
+// Rotation state and the point transform run in the browser, so the
+// animation interval never makes a request to the server.
+(function () {
+// same convention as Rotation.from_euler('xyz', ...): Rz(z) @ Ry(y) @ Rx(x)
+function rotationMatrix(rotation) {
+    const ca = Math.cos(rotation.x), sa = Math.sin(rotation.x);
+    const cb = Math.cos(rotation.y), sb = Math.sin(rotation.y);
+    const cc = Math.cos(rotation.z), sc = Math.sin(rotation.z);
+    return [
+        cb * cc, sa * sb * cc - ca * sc, ca * sb * cc + sa * sc,
+        cb * sc, sa * sb * sc + ca * cc, ca * sb * sc - sa * cc,
+        -sb, sa * cb, ca * cb
+    ];
+}
+
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    sphere: {
+        rotate: function (n, autoRotate, velocity, rotation) {
+            if (!autoRotate || !autoRotate.length || !velocity) {
+                return window.dash_clientside.no_update;
+            }
+            return {
+                x: rotation.x + velocity.x,
+                y: rotation.y + velocity.y,
+                z: rotation.z + velocity.z
+            };
+        },
+
+        render: function (rotation, basePoints, figure) {
+            const m = rotationMatrix(rotation);
+
+            const data = basePoints.map(function (slice) {
+                const x = new Array(slice.length);
+                const y = new Array(slice.length);
+                const z = new Array(slice.length);
+                for (let i = 0; i < slice.length; i++) {
+                    const p = slice[i];
+                    x[i] = m[0] * p[0] + m[1] * p[1] + m[2] * p[2];
+                    y[i] = m[3] * p[0] + m[4] * p[1] + m[5] * p[2];
+                    z[i] = m[6] * p[0] + m[7] * p[1] + m[8] * p[2];
+                }
+                return {
+                    type: 'scatter3d',
+                    mode: 'lines',
+                    x: x, y: y, z: z,
+                    line: {color: 'white', width: 2},
+                    showlegend: false
+                };
+            });
+
+            return {data: data, layout: figure ? figure.layout : {}};
+        },
+
+        // trace_layout='single': all slices in one trace, NaN between slices
+        renderSingle: function (rotation, basePoints, figure) {
+            const m = rotationMatrix(rotation);
+            let n = basePoints.length - 1;
+            basePoints.forEach(function (slice) { n += slice.length; });
+
+            const x = new Float32Array(n), y = new Float32Array(n), z = new Float32Array(n);
+            let i = 0;
+            basePoints.forEach(function (slice, s) {
+                if (s > 0) {
+                    x[i] = y[i] = z[i] = NaN;
+                    i++;
+                }
+                for (const p of slice) {
+                    x[i] = m[0] * p[0] + m[1] * p[1] + m[2] * p[2];
+                    y[i] = m[3] * p[0] + m[4] * p[1] + m[5] * p[2];
+                    z[i] = m[6] * p[0] + m[7] * p[1] + m[8] * p[2];
+                    i++;
+                }
+            });
+
+            return {
+                data: [{
+                    type: 'scatter3d',
+                    mode: 'lines',
+                    x: x, y: y, z: z,
+                    connectgaps: false,
+                    line: {color: 'white', width: 2},
+                    showlegend: false
+                }],
+                layout: figure ? figure.layout : {}
+            };
+        }
+    }
+});
+})();
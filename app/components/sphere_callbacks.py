@@ -0,0 +1,89 @@
+# Sphere page callbacks, kept apart from sphere_renderer so init_app can declare
+# them without importing numpy/scipy/plotly; the renderer loads on first use.
+from dash.dependencies import Input, Output, State, ClientsideFunction
+
+# seconds of rotation per animation tick
+DT = 0.05
+
+RENDER_MODES = ('client', 'server')
+TRACE_LAYOUTS = ('slices', 'single')
+
+
+def check_options(render_mode, trace_layout):
+    if render_mode not in RENDER_MODES:
+        raise ValueError(f"Unknown render_mode: {render_mode}")
+    if trace_layout not in TRACE_LAYOUTS:
+        raise ValueError(f"Unknown trace_layout: {trace_layout}")
+
+
+def register_sphere_callbacks(app, render_mode='client', trace_layout='slices'):
+    check_options(render_mode, trace_layout)
+    if render_mode == 'client':
+        register_client_callbacks(app, trace_layout)
+    else:
+        register_server_callbacks(app, trace_layout)
+
+
+def register_client_callbacks(app, trace_layout='slices'):
+    # the only server round-trip: convert slider speeds to per-tick increments
+    @app.callback(
+        Output('rotation-velocity', 'data'),
+        Input('x-speed', 'value'),
+        Input('y-speed', 'value'),
+        Input('z-speed', 'value')
+    )
+    def update_velocity(x_speed, y_speed, z_speed):
+        return {
+            'x': (x_speed or 0) * DT,
+            'y': (y_speed or 0) * DT,
+            'z': (z_speed or 0) * DT
+        }
+
+    app.clientside_callback(
+        ClientsideFunction(namespace='sphere', function_name='rotate'),
+        Output('rotation-state', 'data'),
+        Input('animation-interval', 'n_intervals'),
+        Input('auto-rotate', 'value'),
+        Input('rotation-velocity', 'data'),
+        State('rotation-state', 'data')
+    )
+
+    app.clientside_callback(
+        ClientsideFunction(
+            namespace='sphere',
+            function_name='renderSingle' if trace_layout == 'single' else 'render'
+        ),
+        Output('sphere-graph', 'figure'),
+        Input('rotation-state', 'data'),
+        State('sphere-base-points', 'data'),
+        State('sphere-graph', 'figure')
+    )
+
+
+def register_server_callbacks(app, trace_layout='slices'):
+    @app.callback(
+        Output('rotation-state', 'data'),
+        Input('animation-interval', 'n_intervals'),
+        Input('auto-rotate', 'value'),
+        Input('x-speed', 'value'),
+        Input('y-speed', 'value'),
+        Input('z-speed', 'value'),
+        State('rotation-state', 'data')
+    )
+    def update_rotation(n, auto_rotate, x_speed, y_speed, z_speed, rotation):
+        if not auto_rotate:
+            return rotation
+
+        return {
+            'x': rotation['x'] + x_speed * DT,
+            'y': rotation['y'] + y_speed * DT,
+            'z': rotation['z'] + z_speed * DT
+        }
+
+    @app.callback(
+        Output('sphere-graph', 'figure'),
+        Input('rotation-state', 'data')
+    )
+    def update_graph(rotation):
+        from .sphere_renderer import frame_caches
+        return frame_caches[trace_layout].get([rotation['x'], rotation['y'], rotation['z']]).figure
@@ -1,8 +1,12 @@
+import base64
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
 from dash import html, dcc
 import numpy as np
-from dash.dependencies import Input, Output, State
 import plotly.graph_objects as go
 from scipy.spatial.transform import Rotation
+from .sphere_callbacks import DT, TRACE_LAYOUTS, check_options
 
 
 def generate_sphere_points(num_slices=30, num_points=100):
@@ -18,8 +22,20 @@ def generate_sphere_points(num_slices=30, num_points=100):
     return np.stack([x, y, z], axis=-1)
 
 
-def create_sphere_traces(base_points, rotation):
+def create_sphere_traces(base_points, rotation, trace_layout='slices'):
+    """
+    trace_layout:
+    - 'slices': one go.Scatter3d per slice
+    - 'single': every slice in one scatter3d trace, NaN rows between slices,
+      coordinates sent as base64 float32 typed arrays
+    """
     rotated = Rotation.from_euler('xyz', rotation).apply(base_points)
+    if trace_layout == 'single':
+        return [single_trace(rotated)]
+    return slice_traces(rotated)
+
+
+def slice_traces(points):
     return [
         go.Scatter3d(
             x=slice_points[:, 0],
@@ -29,20 +45,191 @@ def create_sphere_traces(base_points, rotation):
             line=dict(color='white', width=2),
             showlegend=False
         )
-        for slice_points in rotated
+        for slice_points in points
     ]
 
 
-def create_sphere_component(app=None):
+def join_polylines(lines):
+    """Stack (n_i, 3) polylines (slices, meridians, ...) into one float32 array with NaN breaks."""
+    lines = list(lines)
+    if not lines:
+        return np.empty((0, 3), dtype=np.float32)
+    lengths = np.array([len(line) for line in lines])
+    joined = np.full((lengths.sum() + len(lines) - 1, 3), np.nan, dtype=np.float32)
+    starts = np.concatenate([[0], np.cumsum(lengths[:-1] + 1)])
+    for start, line in zip(starts, lines):
+        joined[start:start + len(line)] = line
+    return joined
+
+
+def encode_array(values):
+    """plotly.js typed array spec: little-endian float32 bytes, base64 encoded."""
+    values = np.ascontiguousarray(values, dtype='<f4')
+    return {'dtype': 'f4', 'bdata': base64.b64encode(values.tobytes()).decode('ascii')}
+
+
+def single_trace(points):
+    joined = join_polylines(points)
+    return {
+        'type': 'scatter3d',
+        'x': encode_array(joined[:, 0]),
+        'y': encode_array(joined[:, 1]),
+        'z': encode_array(joined[:, 2]),
+        'mode': 'lines',
+        'connectgaps': False,
+        'line': {'color': 'white', 'width': 2},
+        'showlegend': False
+    }
+
+
+# slider speeds move in 0.1 steps, so reachable angles sit on a DT * 0.1 grid
+ANGLE_STEP = DT * 0.1
+
+SPHERE_LAYOUT = {
+    'template': 'plotly_dark',
+    'paper_bgcolor': 'rgba(0,0,0,0)',
+    'plot_bgcolor': 'rgba(0,0,0,0)',
+    'scene': {
+        'camera': {
+            'eye': {'x': 0, 'y': 0, 'z': 2.5}
+        },
+        'aspectmode': 'cube',
+        'xaxis': {'showgrid': False, 'zeroline': False, 'visible': False},
+        'yaxis': {'showgrid': False, 'zeroline': False, 'visible': False},
+        'zaxis': {'showgrid': False, 'zeroline': False, 'visible': False},
+        'bgcolor': 'rgba(0,0,0,0)'
+    },
+    'margin': {'l': 0, 'r': 0, 't': 0, 'b': 0},
+    'uirevision': True
+}
+
+
+@dataclass
+class SphereFrame:
+    points: np.ndarray
+    figure: dict
+
+
+class FrameCache:
+    """
+    Bounded LRU of rendered sphere frames keyed on the quantized (x, y, z) rotation,
+    so every viewer at the same angle shares one rotation. Concurrent misses for one
+    key wait on a single in-flight render.
+    """
+
+    def __init__(self, base_points, maxsize=128, step=ANGLE_STEP, trace_layout='slices'):
+        if trace_layout not in TRACE_LAYOUTS:
+            raise ValueError(f"Unknown trace_layout: {trace_layout}")
+        self.base_points = base_points
+        self.trace_layout = trace_layout
+        self.maxsize = maxsize
+        self.step = step
+        self.hits = 0
+        self.misses = 0
+        self._frames = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def key(self, rotation):
+        return tuple(int(round((angle % (2 * np.pi)) / self.step)) for angle in rotation)
+
+    def get(self, rotation) -> SphereFrame:
+        key = self.key(rotation)
+        while True:
+            with self._lock:
+                frame = self._frames.get(key)
+                if frame is not None:
+                    self._frames.move_to_end(key)
+                    self.hits += 1
+                    return frame
+                event = self._inflight.get(key)
+                if event is None:
+                    self.misses += 1
+                    event = self._inflight[key] = threading.Event()
+                    break
+            # another thread is rendering this key; if it failed, the next one through renders
+            event.wait()
+
+        try:
+            frame = self._render([k * self.step for k in key])
+            with self._lock:
+                self._frames[key] = frame
+                self._frames.move_to_end(key)
+                while len(self._frames) > self.maxsize:
+                    self._frames.popitem(last=False)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            event.set()
+        return frame
+
+    def _render(self, rotation) -> SphereFrame:
+        points = Rotation.from_euler('xyz', rotation).apply(self.base_points)
+        if self.trace_layout == 'single':
+            data = [single_trace(points)]
+        else:
+            data = [trace.to_plotly_json() for trace in slice_traces(points)]
+        figure = {
+            'data': data,
+            'layout': SPHERE_LAYOUT
+        }
+        # returned to Dash as a dict; Dash serializes the callback response itself
+        return SphereFrame(points=points, figure=figure)
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'size': len(self._frames),
+                'maxsize': self.maxsize
+            }
+
+    def clear(self):
+        with self._lock:
+            self._frames.clear()
+            self.hits = self.misses = 0
+
+
+frame_caches = {
+    trace_layout: FrameCache(generate_sphere_points(), trace_layout=trace_layout)
+    for trace_layout in TRACE_LAYOUTS
+}
+
+
+def create_sphere_component(render_mode='client', trace_layout='slices'):
+    """
+    Layout only; callbacks are registered once with
+    sphere_callbacks.register_sphere_callbacks using the same render_mode and trace_layout.
+
+    render_mode:
+    - 'client': rotation and point transform run in the browser (assets/sphere.js),
+      the server only answers speed slider changes
+    - 'server': every animation tick round-trips to the server for a new figure
+
+    trace_layout: 'slices' or 'single', see create_sphere_traces
+    """
+    check_options(render_mode, trace_layout)
+
     base_points = generate_sphere_points()
 
+    client_stores = [
+        # base geometry is shipped once with the layout, the browser rotates it
+        dcc.Store(id='sphere-base-points', data=base_points.round(6).tolist()),
+        dcc.Store(id='rotation-velocity'),
+    ] if render_mode == 'client' else []
+
     layout = html.Div([
         dcc.Graph(
             id='sphere-graph',
+            figure={'data': [], 'layout': SPHERE_LAYOUT},
             style={'height': '600px', 'backgroundColor': 'black'},
             config={'displayModeBar': False}
         ),
         dcc.Store(id='rotation-state', data={'x': 0, 'y': 0, 'z': 0}),
+        *client_stores,
         dcc.Interval(
             id='animation-interval',
             interval=50,
@@ -85,53 +272,4 @@ def create_sphere_component(app=None):
         ], className='w-96 mx-auto p-4')
     ], className='container mx-auto py-4')
 
-    if app is not None:
-        @app.callback(
-            Output('rotation-state', 'data'),
-            Input('animation-interval', 'n_intervals'),
-            Input('auto-rotate', 'value'),
-            Input('x-speed', 'value'),
-            Input('y-speed', 'value'),
-            Input('z-speed', 'value'),
-            State('rotation-state', 'data')
-        )
-        def update_rotation(n, auto_rotate, x_speed, y_speed, z_speed, rotation):
-            if not auto_rotate:
-                return rotation
-
-            dt = 0.05
-            return {
-                'x': rotation['x'] + x_speed * dt,
-                'y': rotation['y'] + y_speed * dt,
-                'z': rotation['z'] + z_speed * dt
-            }
-
-        @app.callback(
-            Output('sphere-graph', 'figure'),
-            Input('rotation-state', 'data')
-        )
-        def update_graph(rotation):
-            traces = create_sphere_traces(base_points, [rotation['x'], rotation['y'], rotation['z']])
-
-            return {
-                'data': traces,
-                'layout': {
-                    'template': 'plotly_dark',
-                    'paper_bgcolor': 'rgba(0,0,0,0)',
-                    'plot_bgcolor': 'rgba(0,0,0,0)',
-                    'scene': {
-                        'camera': {
-                            'eye': {'x': 0, 'y': 0, 'z': 2.5}
-                        },
-                        'aspectmode': 'cube',
-                        'xaxis': {'showgrid': False, 'zeroline': False, 'visible': False},
-                        'yaxis': {'showgrid': False, 'zeroline': False, 'visible': False},
-                        'zaxis': {'showgrid': False, 'zeroline': False, 'visible': False},
-                        'bgcolor': 'rgba(0,0,0,0)'
-                    },
-                    'margin': {'l': 0, 'r': 0, 't': 0, 'b': 0},
-                    'uirevision': True
-                }
-            }
-
-    return layout
\ No newline at end of file
+    return layout
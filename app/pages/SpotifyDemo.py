@@ -1,8 +1,16 @@
 from dash import html, dcc, callback, Input, Output, State
 from dash_iconify import DashIconify
-from app.tools.Spotify import SpotifyAPI
 
-spotify_api = SpotifyAPI()
+_spotify_api = None
+
+
+def get_spotify_api():
+    # created on first use so importing this module doesn't load pandas/requests or read .env
+    global _spotify_api
+    if _spotify_api is None:
+        from app.tools.Spotify import SpotifyAPI
+        _spotify_api = SpotifyAPI()
+    return _spotify_api
 
 
 def create_track_grid(tracks):
@@ -57,7 +65,7 @@ def register_spotify_callbacks(app):
     # Spotify auth endpoint
     @app.server.route('/spotify-auth')
     def spotify_auth():
-        auth_url = spotify_api.get_auth_url()
+        auth_url = get_spotify_api().get_auth_url()
         return app.server.redirect(auth_url)
 
     # Handle OAuth callback - parse authentication code
@@ -70,7 +78,7 @@ def register_spotify_callbacks(app):
     def handle_oauth_callback(search, current_auth):
         if search and 'code=' in search:
             code = search.split('code=')[1].split('&')[0]
-            token_info = spotify_api.get_token(code)
+            token_info = get_spotify_api().get_token(code)
             return token_info, ''
         return current_auth or None, search or ''
 
@@ -82,8 +90,9 @@ def register_spotify_callbacks(app):
     )
     def update_tracks(time_range, auth_data):
         if auth_data and auth_data.get('access_token'):
-            spotify_api.access_token = auth_data.get('access_token')
-            top_tracks = spotify_api.get_top_tracks(time_range=time_range)
+            top_tracks = get_spotify_api().get_top_tracks(
+                time_range=time_range, access_token=auth_data.get('access_token')
+            )
             if top_tracks is not None:
                 tracks_data = []
                 for _, track in top_tracks.iterrows():
@@ -0,0 +1,137 @@
+import math
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import BinaryIO, Callable, Dict, Optional, Tuple
+
+from flask import abort, request, send_file
+
+from app.tools.content_cache import ContentAddressedCache
+
+# bump when a scene's drawing code changes so cached files are not reused
+SCENE_VERSION = 1
+# seconds browsers may reuse a rendered scene
+ART_MAX_AGE = 86400
+
+
+@dataclass(frozen=True)
+class Param:
+    cast: Callable
+    default: object
+    low: float
+    high: float
+    # values are rounded to a multiple of step, so near-identical requests share a render
+    step: Optional[float] = None
+
+    def quantize(self, value):
+        if self.step is None:
+            return value
+        # the second round drops float noise such as 0.30000000000000004
+        return self.cast(round(round(value / self.step) * self.step, 6))
+
+
+@dataclass(frozen=True)
+class Scene:
+    render: Callable
+    params: Dict[str, Param]
+
+    def parse(self, args) -> Dict:
+        """Query arguments -> validated keyword arguments; unknown names are ignored."""
+        values = {}
+        for name, param in self.params.items():
+            raw = args.get(name)
+            try:
+                value = param.default if raw is None else param.cast(raw)
+            except ValueError:
+                abort(400, f"{name} must be a {param.cast.__name__}")
+            if not param.low <= value <= param.high:
+                abort(400, f"{name} must be between {param.low} and {param.high}")
+            values[name] = param.quantize(value)
+        return values
+
+
+def _render_sphere_slices(width, height, slices, points, rot_x, rot_y, precision):
+    # imported on first render, so registering the route doesn't load numpy
+    from app.pages import svgDemo
+    return svgDemo.render_sphere_slices(
+        width=width, height=height, num_slices=slices, num_points=points,
+        rotation_x=math.radians(rot_x), rotation_y=math.radians(rot_y), precision=precision
+    )
+
+
+SCENES = {
+    'sphere-slices': Scene(_render_sphere_slices, {
+        # defaults match svgDemo's
+        'width': Param(int, 800, 16, 4096),
+        'height': Param(int, 800, 16, 4096),
+        'slices': Param(int, 25, 2, 200),
+        'points': Param(int, 100, 3, 2000),
+        'rot_x': Param(float, 15.0, -360, 360, step=0.1),
+        'rot_y': Param(float, 30.0, -360, 360, step=0.1),
+        'precision': Param(int, 2, 0, 4),
+    }),
+}
+
+_art_cache = None
+_art_cache_lock = threading.Lock()
+
+
+def get_art_cache() -> ContentAddressedCache:
+    """
+    Rendered scenes on disk, configured from the environment:
+    - ART_CACHE_PATH: directory (default .cache/art)
+    - ART_CACHE_MAX_BYTES: size cap before least recently used files are evicted (default 256 MB)
+    """
+    global _art_cache
+    with _art_cache_lock:
+        if _art_cache is None:
+            _art_cache = ContentAddressedCache(
+                os.getenv('ART_CACHE_PATH', '.cache/art'),
+                max_bytes=int(os.getenv('ART_CACHE_MAX_BYTES', 256 * 1024 * 1024)),
+                suffix='.svg'
+            )
+        return _art_cache
+
+
+def scene_key(name: str, params: Dict) -> str:
+    """Cache key of a scene's SVG, which also serves as its ETag."""
+    return ContentAddressedCache.key_for(name, SCENE_VERSION, params)
+
+
+def render_scene(name: str, params: Dict) -> Tuple[str, BinaryIO]:
+    """
+    (cache key, open binary file) of the scene's SVG, rendered only if it isn't cached yet.
+    The file is opened before anything can evict it; the caller closes it.
+    """
+    scene = SCENES[name]
+    key = scene_key(name, params)
+    return key, get_art_cache().open_or_create(key, lambda f: scene.render(**params).save(f))
+
+
+def register_art_routes(app):
+    # Generated art, e.g. /art/sphere-slices.svg?slices=40&rot_y=45
+    @app.server.route('/art/<name>.svg')
+    def art(name):
+        scene = SCENES.get(name)
+        if scene is None:
+            abort(404)
+        params = scene.parse(request.args)
+        # the key names the content, so it doubles as a strong ETag; a client holding it
+        # gets a 304 without the scene being rendered or even read from the cache
+        key = scene_key(name, params)
+        if key in request.if_none_match:
+            response = app.server.response_class(status=304)
+            response.set_etag(key)
+            response.cache_control.public = True
+            response.cache_control.max_age = ART_MAX_AGE
+            response.expires = int(time.time() + ART_MAX_AGE)
+            return response
+
+        key, svg = render_scene(name, params)
+        # send_file closes svg
+        response = send_file(svg, mimetype='image/svg+xml', etag=key, conditional=True, max_age=ART_MAX_AGE)
+        if response.status_code == 200 and response.content_length is None:
+            # send_file only knows the size of paths and BytesIO
+            response.content_length = os.fstat(svg.fileno()).st_size
+        return response
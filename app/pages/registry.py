@@ -0,0 +1,96 @@
+import importlib
+import json
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from plotly.io.json import to_json_plotly
+
+
+@dataclass(eq=False)
+class Page:
+    # a callable, or 'package.module:function' imported on first render
+    factory: Union[str, Callable[..., Any]]
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+    # static pages are built once and served from their cached JSON form
+    static: bool = False
+    _cached: Any = field(default=None, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def load(self) -> Callable[..., Any]:
+        if isinstance(self.factory, str):
+            module_name, _, attr = self.factory.partition(':')
+            self.factory = getattr(importlib.import_module(module_name), attr)
+        return self.factory
+
+    def render(self):
+        if not self.static:
+            return self.load()(**self.kwargs)
+        if self._cached is None:
+            with self._lock:
+                if self._cached is None:
+                    # plain dicts/lists in Dash's component JSON shape; re-serializing them is cheap
+                    self._cached = json.loads(to_json_plotly(self.load()(**self.kwargs)))
+        return self._cached
+
+
+class PageRegistry:
+    """
+    Route table for the page-content callback: exact paths are a dict lookup,
+    prefix routes are tried longest first. Unknown paths fall back to `fallback`.
+    """
+
+    def __init__(self, fallback: Optional[str] = None):
+        self.fallback = fallback
+        self._exact: Dict[str, Page] = {}
+        self._prefixes: List[Tuple[str, Page]] = []
+
+    @staticmethod
+    def normalize(pathname: Optional[str]) -> str:
+        path = (pathname or '/').split('?')[0].rstrip('/')
+        return path or '/'
+
+    def register(self, paths: Union[str, Iterable[str]], factory: Union[str, Callable[..., Any]],
+                 static: bool = False, prefix: bool = False, **kwargs) -> Page:
+        """
+        factory: layout function, or a 'package.module:function' string so the page
+        module is only imported on its first hit. Extra kwargs are passed to the factory.
+        """
+        page = Page(factory, kwargs=kwargs, static=static)
+        for path in [paths] if isinstance(paths, str) else paths:
+            path = self.normalize(path) if not prefix else path
+            if prefix:
+                self._prefixes.append((path, page))
+            else:
+                self._exact[path] = page
+        self._prefixes.sort(key=lambda route: len(route[0]), reverse=True)
+        return page
+
+    def pages(self) -> List[Page]:
+        return list({id(page): page for page in [*self._exact.values(), *(p for _, p in self._prefixes)]}.values())
+
+    def preload(self, *modules: str):
+        """
+        Import every page module (and any extra modules) and build the static pages now,
+        e.g. before a pre-fork server forks so workers share them copy-on-write.
+        """
+        for page in self.pages():
+            page.render() if page.static else page.load()
+        for module in modules:
+            importlib.import_module(module)
+
+    def resolve(self, pathname: Optional[str]) -> Optional[Page]:
+        path = self.normalize(pathname)
+        page = self._exact.get(path)
+        if page is not None:
+            return page
+        for route, page in self._prefixes:
+            if path.startswith(route):
+                return page
+        if self.fallback is not None and path != self.fallback:
+            return self.resolve(self.fallback)
+        return None
+
+    def render(self, pathname: Optional[str]):
+        page = self.resolve(pathname)
+        return page.render() if page is not None else None
@@ -2,13 +2,19 @@ from dash import Dash, html, dcc, Input, Output
 from datetime import datetime
 import dash_bootstrap_components as dbc  # We'll use this for the grid system
 from flask import redirect, request
-from app.tools.stravaAPI import Strava
+from app.tools.stravaAPI import ActivityFetchError, Strava
+from app.tools.activity_store import ActivityStore, activity_frame, distance_by_type
+from app.tools.gps_track import as_track, bounding_box, centroid, simplify_track, zoom_for_bbox
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from typing import List, Dict
 
 
+# point budget for the activity map figure
+MAX_MAP_POINTS = 2000
+
+
 def create_layout():
     return dbc.Container([
         html.H1("Strava Dashboard", className='mb-4'),
@@ -125,15 +131,19 @@ def create_stat_card(label, value, icon):
 
 
 def create_distance_plot(activities, activity_type=None):
-    # create timeseries
-    df = pd.DataFrame(activities)
-    df = df.loc[df['type'] == activity_type] if activity_type else df
+    # activities: list of activity dicts, ActivityStore.load() output or an activity_frame
+    cumulative = distance_by_type(activity_frame(activities), freq='D', cumulative=True)
+    return create_cumulative_distance_plot(cumulative, activity_type)
 
-    df['date'] = pd.to_datetime(df['start_date']).dt.date
-    df['distance'] = df['distance'] / 1000
 
-    ts = df.groupby('date')['distance'].sum()
-    cumulative = ts.cumsum()
+def create_cumulative_distance_plot(cumulative_by_type, activity_type=None):
+    # cumulative_by_type: distance_by_type(..., cumulative=True), one column per activity type
+    if activity_type is None:
+        cumulative = cumulative_by_type.sum(axis=1)
+    elif activity_type in cumulative_by_type.columns:
+        cumulative = cumulative_by_type[activity_type]
+    else:
+        cumulative = pd.Series(dtype='float64')
 
     fig = px.line(
         x=cumulative.index,
@@ -151,7 +161,8 @@ def create_distance_plot(activities, activity_type=None):
     return dcc.Graph(figure=fig)
 
 
-def create_activity_map(activity_data: Dict):
+def create_activity_map(activity_data: Dict, show_payload_size: bool = False):
+    """show_payload_size: serialize the figure an extra time to report its size, for debugging"""
     if not activity_data:
         return html.Div("No recent activity data available")
 
@@ -161,23 +172,19 @@ def create_activity_map(activity_data: Dict):
     if 'latlng' not in streams:
         return html.Div("No GPS data available for this activity")
 
-    latlng = streams['latlng']['data']
-    lat, lon = zip(*latlng)
-
-    center_lat = sum(lat) / len(lat)
-    center_lon = sum(lon) / len(lon)
+    track = as_track(streams['latlng']['data'])
+    if not len(track):
+        return html.Div("No GPS data available for this activity")
 
-    df = pd.DataFrame({
-        'lat': lat,
-        'lon': lon
-    })
+    zoom = zoom_for_bbox(bounding_box(track))
+    simplified, summary = simplify_track(track, zoom=zoom, max_points=MAX_MAP_POINTS)
+    center_lat, center_lon = centroid(track)
 
     fig = px.line_mapbox(
-        df,
-        lat='lat',
-        lon='lon',
+        lat=simplified[:, 0],
+        lon=simplified[:, 1],
         center={'lat': center_lat, 'lon': center_lon},
-        zoom=11,
+        zoom=zoom,
         height=400
     )
 
@@ -188,9 +195,13 @@ def create_activity_map(activity_data: Dict):
         showlegend=False
     )
 
+    caption = f"{summary.simplified_points:,} of {summary.original_points:,} GPS points"
+    if show_payload_size:
+        caption += f", {len(fig.to_json()) / 1024:,.0f} KB"
     return html.Div([
         html.H4(f"Latest Activity: {activity['name']}", className='mb-3'),
-        dcc.Graph(figure=fig)
+        dcc.Graph(figure=fig),
+        html.P(caption, className='text-muted small')
     ])
 
 
@@ -201,6 +212,7 @@ def init_app():
                    'https://use.fontawesome.com/releases/v5.15.4/css/all.css'
                ])
     strava = Strava()
+    activity_store = ActivityStore()
 
     app.layout = create_layout()
 
@@ -231,12 +243,20 @@ def init_app():
                         athlete['id']
                     )
 
-                    # Fetch activities and create plot
-                    activities = strava.get_all_activities(tokens['access_token'])
-                    distance_plot = create_distance_plot(activities, 'Run')
+                    # Sync new activities into the local store and plot from it
+                    try:
+                        activity_store.sync(strava, tokens['access_token'], athlete['id'])
+                    except ActivityFetchError as e:
+                        # plot what is stored; the next sync resumes from it
+                        print(f"Activity sync incomplete: {e}")
+                    distance_plot = create_cumulative_distance_plot(
+                        activity_store.distance_by_type(athlete['id'], freq='D', cumulative=True),
+                        'Run'
+                    )
                     map_data = strava.get_latest_activity_map(tokens['access_token'])
+                    activity_map = create_activity_map(map_data, show_payload_size=app.server.debug)
 
-                    return create_profile_card(athlete, stats), distance_plot, create_activity_map(map_data), tokens
+                    return create_profile_card(athlete, stats), distance_plot, activity_map, tokens
 
         return None, None, None, None
 
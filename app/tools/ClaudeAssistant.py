@@ -2,9 +2,13 @@ import anthropic
 import os
 from dotenv import load_dotenv
 from datetime import datetime
-from typing import List, Union, Tuple
+from typing import Iterator, List, Union, Tuple
 from pathlib import Path
 
+from app.tools.codebase import DEFAULT_IGNORE_DIRS, count_lines, iter_files, iter_snapshot, write_snapshot
+from app.tools.code_search import CodeSearch
+from app.tools.codebase_index import CodebaseIndex
+
 
 class Claude:
 
@@ -47,10 +51,27 @@ class SoftwareEngineer(Claude):
         super().__init__()
         self.root_dir = Path('/Users/amatthew/PycharmProjects/PortfolioWebsite/app').resolve()
         self.target_extensions = {'.py', '.css'}
-        self.ignore_dirs = {'.git', '.idea', '__pycache__', 'venv', '.venv', 'node_modules', '.env'}
+        self.ignore_dirs = set(DEFAULT_IGNORE_DIRS)
+        # most code tokens to put in a prompt; larger codebases are cut down to the relevant parts
+        self.context_tokens = int(os.getenv('ASSISTANT_CONTEXT_TOKENS', 50000))
+        self._index = None
+        self._search = None
+
+    @property
+    def index(self) -> CodebaseIndex:
+        """Persistent per-file index of root_dir, so repeated prompts only re-read changed files."""
+        if self._index is None:
+            self._index = CodebaseIndex(self.root_dir, self.target_extensions, self.ignore_dirs)
+        return self._index
+
+    @property
+    def search(self) -> CodeSearch:
+        if self._search is None:
+            self._search = CodeSearch(self.index)
+        return self._search
 
     def create_new_feature(self, message: str) -> str:
-        codebase = self.read_codebase()
+        codebase = self.read_relevant_codebase(message)
 
         prompt = f"""
                 You are an expert software engineer tasked with adding new features to the codebase. 
@@ -74,20 +95,7 @@ class SoftwareEngineer(Claude):
 
     def read_codebase_structure(self) -> List[Path]:
         """ reads all files in the directory, ignores certain filetypes"""
-        target_files = []
-
-        for root, dirs, files in os.walk(self.root_dir):
-            # Remove ignored directories
-            dirs[:] = [d for d in dirs if d not in self.ignore_dirs]
-
-            for file in files:
-                file_path = Path(root) / file
-                if file_path.suffix.lower() in self.target_extensions:
-                    # Get relative path from root_dir
-                    rel_path = file_path.relative_to(self.root_dir)
-                    target_files.append(rel_path)
-
-        return sorted(target_files)
+        return list(iter_files(self.root_dir, self.target_extensions, self.ignore_dirs))
 
     def read_file_content(self, file_path: Path) -> Tuple[str, int]:
         """
@@ -98,60 +106,30 @@ class SoftwareEngineer(Claude):
         try:
             with open(full_path, 'r', encoding='utf-8') as f:
                 content = f.read()
-                line_count = len(content.splitlines())
-                return content, line_count
+            return content, count_lines(full_path)
         except Exception as e:
             print(f"Error reading {file_path}: {str(e)}")
             return f"Error reading file: {str(e)}", 0
 
+    def iter_codebase(self) -> Iterator[str]:
+        """The formatted codebase in pieces, without holding it all in memory."""
+        return iter_snapshot(self.root_dir, self.target_extensions, self.ignore_dirs)
+
     def read_codebase(self) -> str:
         """Format all found files into a structured text block."""
-        files = self.read_codebase_structure()
-
-        # Start with a header
-        formatted_text = f"# Code Contents from {self.root_dir}\n"
-        formatted_text += f"Total files found: {len(files)}\n\n"
-
-        total_lines = 0
+        changes = self.index.refresh()
+        if changes:
+            print(f"Codebase changes: {changes}")
+        return self.index.text()
 
-        # Group files by directory
-        current_dir = None
-        for file_path in files:
-            # Check if we've moved to a new directory
-            file_dir = str(file_path.parent)
-            if file_dir != current_dir:
-                current_dir = file_dir
-                formatted_text += f"\n## Directory: {current_dir if current_dir != '.' else 'root'}\n\n"
-
-            # Read and format file content
-            content, line_count = self.read_file_content(file_path)
-            total_lines += line_count
-
-            # Add file header with metadata
-            formatted_text += f"{'=' * 80}\n"
-            formatted_text += f"File: {file_path.name}\n"
-            formatted_text += f"Lines: {line_count}\n"
-            formatted_text += f"{'=' * 80}\n\n"
-
-            # Add the file content
-            formatted_text += content.strip() + "\n\n"
-
-        # Add summary at the end
-        formatted_text += f"\n{'=' * 80}\n"
-        formatted_text += f"Summary:\n"
-        formatted_text += f"Total files: {len(files)}\n"
-        formatted_text += f"Total lines of code: {total_lines}\n"
-
-        return formatted_text
+    def read_relevant_codebase(self, message: str) -> str:
+        """The codebase if it fits in context_tokens, otherwise the chunks that best match the message."""
+        return self.search.context(message, self.context_tokens)
 
     def save_formatted_codebase(self, output_file: str = "codebase_contents.txt"):
-        formatted_text = self.read_codebase()
-        output_path = self.root_dir / output_file
-
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(formatted_text)
-
-        return output_path
+        # written as it is read, so the snapshot never sits in memory whole
+        return write_snapshot(self.root_dir, self.root_dir / output_file,
+                              self.target_extensions, self.ignore_dirs)
 
 
 def main():
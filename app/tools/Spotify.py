@@ -1,9 +1,10 @@
 import os
-import requests
 from dotenv import load_dotenv
 from urllib.parse import urlencode
 import pandas as pd
 import base64
+from app.tools.api_cache import get_api_cache
+from app.tools.http_client import get_http_client
 
 
 class SpotifyAPI:
@@ -14,6 +15,8 @@ class SpotifyAPI:
         self.client_secret = os.getenv("SPOTIFY_CLIENT_SECRET")
         self.redirect_uri = os.getenv("SPOTIFY_REDIRECT_URI")
         self.access_token = None
+        self.api_url = os.getenv("SPOTIFY_API_URL", "https://api.spotify.com/v1")
+        self.accounts_url = os.getenv("SPOTIFY_ACCOUNTS_URL", "https://accounts.spotify.com")
 
     def get_auth_url(self):
         scope = "user-read-recently-played user-top-read"
@@ -23,11 +26,11 @@ class SpotifyAPI:
             'redirect_uri': self.redirect_uri,
             'scope': scope
         }
-        return f"https://accounts.spotify.com/authorize?{urlencode(auth_params)}"
+        return f"{self.accounts_url}/authorize?{urlencode(auth_params)}"
 
     def get_token(self, code):
         """Exchange authorization code for access token"""
-        token_url = 'https://accounts.spotify.com/api/token'
+        token_url = f'{self.accounts_url}/api/token'
 
         auth_header = base64.b64encode(f"{self.client_id}:{self.client_secret}".encode()).decode()
 
@@ -43,7 +46,7 @@ class SpotifyAPI:
         }
 
         try:
-            response = requests.post(token_url, headers=headers, data=data)
+            response = get_http_client().post(token_url, headers=headers, data=data)
             print(f"Token exchange response status: {response.status_code}")
             print(f"Token exchange response: {response.text}")
 
@@ -63,23 +66,25 @@ class SpotifyAPI:
         if not self.access_token:
             return None
 
-        endpoint = "https://api.spotify.com/v1/me"
+        endpoint = f"{self.api_url}/me"
         headers = {
             "Authorization": f"Bearer {self.access_token}",
             "Content-Type": "application/json"
         }
 
-        response = requests.get(endpoint, headers=headers)
+        response = get_http_client().get(endpoint, headers=headers)
 
         return response.json() if response.ok else None
 
-    def get_top_tracks(self, time_range='medium_term',limit=10):
-        if not self.access_token:
+    def get_top_tracks(self, time_range='medium_term', limit=10, access_token=None):
+        # pass access_token from request handlers; the instance is shared between worker threads
+        access_token = access_token or self.access_token
+        if not access_token:
             return None
 
-        endpoint = "https://api.spotify.com/v1/me/top/tracks"
+        endpoint = f"{self.api_url}/me/top/tracks"
         headers = {
-            "Authorization": f"Bearer {self.access_token}",
+            "Authorization": f"Bearer {access_token}",
             "Content-Type": "application/json"
         }
 
@@ -88,12 +93,14 @@ class SpotifyAPI:
             "time_range": time_range  # short_term (4 weeks), medium_term (6 months), long_term (years)
         }
 
-        response = requests.get(endpoint, headers=headers, params=params)
+        def fetch():
+            response = get_http_client().get(endpoint, headers=headers, params=params)
+            return response.json() if response.status_code == 200 else None
 
-        if response.status_code != 200:
+        data = get_api_cache().get_or_fetch('spotify.top_tracks', fetch, owner=access_token, params=params)
+        if data is None:
             return None
 
-        data = response.json()
         tracks = []
         for item in data['items']:
             track_info = {
@@ -0,0 +1,209 @@
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from app.tools.stravaAPI import ActivityFetchError
+
+COLUMNS = [
+    'id', 'name', 'type', 'start_date', 'distance', 'moving_time',
+    'elapsed_time', 'total_elevation_gain', 'average_speed'
+]
+
+# typed columns of the in-memory activity table
+ACTIVITY_DTYPES = {
+    'id': 'int64',
+    'name': 'string',
+    'type': 'category',
+    'distance': 'float32',
+    'moving_time': 'float32',
+    'elapsed_time': 'float32',
+    'total_elevation_gain': 'float32',
+    'average_speed': 'float32',
+}
+
+
+def _parse_start_dates(values: pd.Series) -> pd.Series:
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return pd.to_datetime(values, utc=True)
+    # Strava start_date is UTC 'YYYY-MM-DDTHH:MM:SSZ'; numpy parses those far faster than pandas
+    if pd.api.types.is_string_dtype(values) and values.str.endswith('Z').all():
+        parsed = np.asarray(values.str.removesuffix('Z'), dtype='datetime64[s]')
+        return pd.Series(pd.DatetimeIndex(parsed).tz_localize('UTC'), index=values.index)
+    return pd.to_datetime(values, utc=True, format='ISO8601')
+
+
+def activity_frame(activities: Union[List[Dict], pd.DataFrame]) -> pd.DataFrame:
+    """Typed columnar activity table: UTC datetime64 start_date, float32 metrics, categorical type."""
+    df = pd.DataFrame(activities, columns=COLUMNS)
+    df['start_date'] = _parse_start_dates(df['start_date'])
+    return df.astype(ACTIVITY_DTYPES)
+
+
+def distance_by_type(frame: pd.DataFrame, freq: str = 'D', cumulative: bool = False) -> pd.DataFrame:
+    """
+    Kilometers per `freq` bin (pandas offset alias, e.g. 'D', 'W') with one column per activity type.
+    Empty bins are zero, so cumulative=True gives a continuous running total.
+    """
+    types = frame['type'].cat.remove_unused_categories()
+    if frame.empty:
+        return pd.DataFrame(index=pd.DatetimeIndex([], tz='UTC', name='start_date'), dtype='float64')
+
+    # one column per type holding that activity's km, then a single resample over all columns
+    km = np.zeros((len(frame), len(types.cat.categories)))
+    codes = types.cat.codes.to_numpy()
+    # a missing type has code -1, which would index the last column; leave its row empty
+    typed = codes >= 0
+    km[np.flatnonzero(typed), codes[typed]] = frame['distance'].to_numpy(dtype='float64')[typed] / 1000
+    binned = pd.DataFrame(
+        km,
+        index=pd.DatetimeIndex(frame['start_date'], name='start_date'),
+        columns=pd.Index(types.cat.categories, name='type')
+    ).resample(freq).sum()
+    return binned.cumsum() if cumulative else binned
+
+
+class ActivityStore:
+    """
+    Local SQLite copy of each athlete's Strava activities.
+    sync() only asks the API for activities newer than the latest stored start_date.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = Path(path or os.getenv('ACTIVITY_STORE_PATH', '.cache/activities.sqlite3'))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        # (athlete_id, revision, ...) -> typed frame / aggregate
+        self._frames = OrderedDict()
+        self._frames_lock = threading.Lock()
+        self.max_cached = 32
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS activities (
+                    athlete_id INTEGER NOT NULL,
+                    id INTEGER NOT NULL,
+                    name TEXT,
+                    type TEXT,
+                    start_date TEXT,
+                    distance REAL,
+                    moving_time INTEGER,
+                    elapsed_time INTEGER,
+                    total_elevation_gain REAL,
+                    average_speed REAL,
+                    raw TEXT,
+                    PRIMARY KEY (athlete_id, id)
+                )
+            ''')
+            conn.execute(
+                'CREATE INDEX IF NOT EXISTS activities_start ON activities (athlete_id, start_date)'
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            self._local.conn = conn
+        return conn
+
+    def latest_start_date(self, athlete_id: int) -> Optional[datetime]:
+        row = self._connect().execute(
+            'SELECT MAX(start_date) FROM activities WHERE athlete_id = ?', (athlete_id,)
+        ).fetchone()
+        if not row or row[0] is None:
+            return None
+        return datetime.fromisoformat(row[0].replace('Z', '+00:00'))
+
+    def upsert(self, athlete_id: int, activities: List[Dict]) -> int:
+        rows = [
+            (athlete_id, *(activity.get(column) for column in COLUMNS), json.dumps(activity))
+            for activity in activities
+        ]
+        with self._connect() as conn:
+            conn.executemany(
+                f'INSERT OR REPLACE INTO activities (athlete_id, {", ".join(COLUMNS)}, raw) '
+                f'VALUES ({", ".join("?" * (len(COLUMNS) + 2))})',
+                rows
+            )
+        return len(rows)
+
+    def sync(self, strava, access_token: str, athlete_id: int) -> int:
+        """
+        Fetch and store activities newer than the latest stored one. Returns the number fetched.
+        If a page fails, only the oldest-first run of activities before it is stored, so the
+        latest start_date never moves past activities that were not fetched; the
+        ActivityFetchError is then re-raised.
+        """
+        latest = self.latest_start_date(athlete_id)
+        # one second of overlap; upsert makes the boundary activity a no-op. Always passing
+        # `after` makes Strava return oldest first, so any prefix of the result is contiguous.
+        after = int(latest.timestamp()) - 1 if latest else 0
+
+        try:
+            activities = strava.get_all_activities(access_token, after=after)
+        except ActivityFetchError as e:
+            contiguous = self._contiguous_prefix(e.activities)
+            if contiguous:
+                self.upsert(athlete_id, contiguous)
+            raise
+        if not activities:
+            return 0
+        return self.upsert(athlete_id, activities)
+
+    @staticmethod
+    def _contiguous_prefix(activities: List[Dict]) -> List[Dict]:
+        # only trust a partial result that really is oldest first
+        start_dates = [activity.get('start_date') for activity in activities]
+        if None in start_dates or start_dates != sorted(start_dates):
+            return []
+        return activities
+
+    def load(self, athlete_id: int) -> pd.DataFrame:
+        return pd.read_sql_query(
+            f'SELECT {", ".join(COLUMNS)} FROM activities WHERE athlete_id = ? ORDER BY start_date',
+            self._connect(),
+            params=(athlete_id,)
+        )
+
+    def revision(self, athlete_id: int) -> Tuple:
+        """Changes whenever an athlete's activities change, in this or any other worker."""
+        # separate subqueries so sqlite can answer MAX() from the indexes
+        return self._connect().execute(
+            'SELECT (SELECT COUNT(*) FROM activities WHERE athlete_id = :a), '
+            '(SELECT MAX(start_date) FROM activities WHERE athlete_id = :a), '
+            '(SELECT MAX(id) FROM activities WHERE athlete_id = :a)',
+            {'a': athlete_id}
+        ).fetchone()
+
+    def _cached(self, key: Tuple, build):
+        with self._frames_lock:
+            if key in self._frames:
+                self._frames.move_to_end(key)
+                return self._frames[key]
+        value = build()
+        with self._frames_lock:
+            self._frames[key] = value
+            while len(self._frames) > self.max_cached:
+                self._frames.popitem(last=False)
+        return value
+
+    def load_frame(self, athlete_id: int) -> pd.DataFrame:
+        """Typed activity table for one athlete, cached until the athlete's activities change."""
+        key = ('frame', athlete_id, self.revision(athlete_id))
+        return self._cached(key, lambda: activity_frame(self.load(athlete_id)))
+
+    def distance_by_type(self, athlete_id: int, freq: str = 'D', cumulative: bool = False) -> pd.DataFrame:
+        key = ('distance', athlete_id, self.revision(athlete_id), freq, cumulative)
+        return self._cached(key, lambda: distance_by_type(self.load_frame(athlete_id), freq, cumulative))
+
+    def count(self, athlete_id: int) -> int:
+        return self._connect().execute(
+            'SELECT COUNT(*) FROM activities WHERE athlete_id = ?', (athlete_id,)
+        ).fetchone()[0]
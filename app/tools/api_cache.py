@@ -0,0 +1,302 @@
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# seconds each endpoint's responses stay fresh
+DEFAULT_TTLS = {
+    'spotify.top_tracks': 300,
+    'strava.athlete': 600,
+    'strava.athlete_stats': 300,
+    'strava.all_activities': 120,
+    'github.repo_contents': 300,
+    'github.tree': 300,
+}
+DEFAULT_TTL = 60
+
+
+class MemoryBackend:
+    """
+    In-process LRU with per-entry expiry. Not shared between gunicorn workers.
+    Values are stored pickled, so like SQLiteBackend every get() returns the caller's
+    own copy and mutating it (or the object passed to set()) can't change the cache.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            data, expires_at = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+        return True, pickle.loads(data)
+
+    def set(self, key: str, value: Any, ttl: float):
+        data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._entries[key] = (data, time.time() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    # only one process uses this backend, so the in-process single flight is enough
+    def acquire_lease(self, key: str, ttl: float) -> bool:
+        return True
+
+    def release_lease(self, key: str):
+        pass
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteBackend:
+    """
+    Disk cache in a SQLite file that every gunicorn worker on the host can share.
+    Values must be JSON serializable. Leases give cross-process single flight.
+    """
+
+    def __init__(self, path: str, max_entries: int = 10000):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT, expires_at REAL)'
+            )
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS leases (key TEXT PRIMARY KEY, expires_at REAL)'
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        row = self._connect().execute(
+            'SELECT value FROM cache WHERE key = ? AND expires_at >= ?', (key, time.time())
+        ).fetchone()
+        if row is None:
+            return False, None
+        return True, json.loads(row[0])
+
+    def set(self, key: str, value: Any, ttl: float):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)',
+                (key, json.dumps(value), now + ttl)
+            )
+            conn.execute('DELETE FROM cache WHERE expires_at < ?', (now,))
+            conn.execute(
+                'DELETE FROM cache WHERE key IN '
+                '(SELECT key FROM cache ORDER BY expires_at DESC LIMIT -1 OFFSET ?)',
+                (self.max_entries,)
+            )
+
+    def acquire_lease(self, key: str, ttl: float) -> bool:
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute('DELETE FROM leases WHERE expires_at < ?', (now,))
+            cursor = conn.execute(
+                'INSERT OR IGNORE INTO leases (key, expires_at) VALUES (?, ?)', (key, now + ttl)
+            )
+            return cursor.rowcount == 1
+
+    def release_lease(self, key: str):
+        with self._connect() as conn:
+            conn.execute('DELETE FROM leases WHERE key = ?', (key,))
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute('DELETE FROM cache')
+            conn.execute('DELETE FROM leases')
+
+
+class _Flight:
+    """One in-progress fetch; concurrent misses for its key wait for its outcome."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        # set by the leader before done: the exception its fetch raised, or that it returned None
+        self.error: Optional[BaseException] = None
+        self.failed = False
+
+
+class ApiCache:
+    """
+    Read-through cache for third-party API responses.
+
+    Keys combine the endpoint, a hash of the token owner and the request params.
+    Concurrent misses for one key wait on a single in-flight fetch and share its
+    outcome, failures included. Fetches returning None are treated as failures and
+    not cached.
+    """
+
+    def __init__(self, backend=None, ttls: Optional[Dict[str, float]] = None, lease_timeout: float = 30):
+        self.backend = backend or MemoryBackend()
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.lease_timeout = lease_timeout
+        self._inflight: Dict[str, _Flight] = {}
+        self._inflight_lock = threading.Lock()
+        self._stats = defaultdict(lambda: {'hits': 0, 'misses': 0, 'fetch_seconds': 0.0, 'errors': 0})
+        self._stats_lock = threading.Lock()
+
+    @staticmethod
+    def owner_id(token: Optional[str]) -> str:
+        # never store raw tokens in keys
+        if not token:
+            return 'anonymous'
+        return hashlib.sha256(token.encode('utf-8')).hexdigest()[:16]
+
+    def make_key(self, endpoint: str, owner: Optional[str] = None, params: Optional[Dict] = None) -> str:
+        params_part = json.dumps(params or {}, sort_keys=True, default=str)
+        return f"{endpoint}:{self.owner_id(owner)}:{params_part}"
+
+    def get_or_fetch(self, endpoint: str, fetch: Callable[[], Any], owner: Optional[str] = None,
+                     params: Optional[Dict] = None, ttl: Optional[float] = None) -> Any:
+        key = self.make_key(endpoint, owner, params)
+        ttl = self.ttls.get(endpoint, DEFAULT_TTL) if ttl is None else ttl
+
+        found, value = self.backend.get(key)
+        if found:
+            self._record(endpoint, 'hits')
+            return value
+
+        # single flight within this process
+        with self._inflight_lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+
+        if not leader:
+            if flight.done.wait(self.lease_timeout):
+                # a failed leader's outcome is shared, rather than every waiter retrying at once
+                if flight.error is not None:
+                    raise flight.error
+                if flight.failed:
+                    return None
+            found, value = self.backend.get(key)
+            if found:
+                self._record(endpoint, 'hits')
+                return value
+            # the leader is stuck, or its value already expired
+            return self._fetch(endpoint, key, fetch, ttl)
+
+        try:
+            value = self._lead(endpoint, key, fetch, ttl)
+            flight.failed = value is None
+            return value
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+            flight.done.set()
+
+    def _lead(self, endpoint: str, key: str, fetch: Callable[[], Any], ttl: float) -> Any:
+        """The fetch for a key this thread leads, single flight across processes sharing the backend."""
+        deadline = time.time() + self.lease_timeout
+        while True:
+            leased = self.backend.acquire_lease(key, self.lease_timeout)
+            if leased:
+                break
+            found, value = self.backend.get(key)
+            if found:
+                self._record(endpoint, 'hits')
+                return value
+            if time.time() > deadline:
+                # the holder looks stuck: fetch without the lease, and leave its lease alone
+                break
+            time.sleep(0.05)
+        try:
+            if leased:
+                # the previous holder may have just filled it
+                found, value = self.backend.get(key)
+                if found:
+                    self._record(endpoint, 'hits')
+                    return value
+            return self._fetch(endpoint, key, fetch, ttl)
+        finally:
+            if leased:
+                self.backend.release_lease(key)
+
+    def _fetch(self, endpoint: str, key: str, fetch: Callable[[], Any], ttl: float) -> Any:
+        self._record(endpoint, 'misses')
+        start = time.perf_counter()
+        try:
+            value = fetch()
+        except Exception:
+            self._record(endpoint, 'errors')
+            raise
+        finally:
+            self._record(endpoint, 'fetch_seconds', time.perf_counter() - start)
+
+        if value is not None:
+            self.backend.set(key, value, ttl)
+        return value
+
+    def _record(self, endpoint: str, field: str, amount: float = 1):
+        with self._stats_lock:
+            self._stats[endpoint][field] += amount
+
+    def stats(self) -> Dict[str, Dict]:
+        with self._stats_lock:
+            report = {}
+            for endpoint, counts in self._stats.items():
+                lookups = counts['hits'] + counts['misses']
+                report[endpoint] = {
+                    **counts,
+                    'hit_rate': counts['hits'] / lookups if lookups else 0.0,
+                    'avg_fetch_ms': 1000 * counts['fetch_seconds'] / counts['misses'] if counts['misses'] else 0.0,
+                }
+            return report
+
+    def clear(self):
+        self.backend.clear()
+
+
+_api_cache = None
+_api_cache_lock = threading.Lock()
+
+
+def get_api_cache() -> ApiCache:
+    """
+    Process-wide cache used by the API clients, configured from the environment:
+    - API_CACHE_BACKEND: 'memory' (default) or 'sqlite'
+    - API_CACHE_PATH: SQLite file for the 'sqlite' backend
+    """
+    global _api_cache
+    with _api_cache_lock:
+        if _api_cache is None:
+            backend_name = os.getenv('API_CACHE_BACKEND', 'memory').lower()
+            if backend_name == 'sqlite':
+                backend = SQLiteBackend(os.getenv('API_CACHE_PATH', '.cache/api_cache.sqlite3'))
+            elif backend_name == 'memory':
+                backend = MemoryBackend()
+            else:
+                raise ValueError(f"Unknown API_CACHE_BACKEND: {backend_name}")
+            _api_cache = ApiCache(backend)
+        return _api_cache
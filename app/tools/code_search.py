@@ -0,0 +1,387 @@
+import ast
+import hashlib
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from app.tools.codebase import decode_source
+from app.tools.codebase_index import CodebaseIndex
+
+# BM25 term frequency saturation and length normalization
+K1 = 1.5
+B = 0.75
+# roughly how many characters of code make one model token
+CHARS_PER_TOKEN = 4
+# classes longer than this are split into one chunk per method
+MAX_CLASS_LINES = 80
+# lines per chunk for files that can't be parsed
+WINDOW_LINES = 60
+CSS_CHUNK_LINES = 30
+
+_IDENTIFIER = re.compile(r'[A-Za-z_][A-Za-z0-9_]*')
+_SUBWORD = re.compile(r'[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+')
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'if', 'in', 'is', 'it',
+    'not', 'of', 'on', 'or', 'that', 'the', 'this', 'to', 'with', 'def', 'self', 'return',
+    'import', 'none', 'true', 'false', 'else', 'elif',
+}
+
+
+def _stem(term: str) -> str:
+    if len(term) > 4 and term.endswith('ies'):
+        return term[:-3] + 'y'
+    if len(term) > 3 and term.endswith('s') and not term.endswith('ss'):
+        return term[:-1]
+    return term
+
+
+@lru_cache(maxsize=65536)
+def _identifier_terms(identifier: str) -> Tuple[str, ...]:
+    parts = [part.lower() for part in _SUBWORD.findall(identifier)]
+    terms = [identifier.lower().strip('_')] if len(parts) > 1 else []
+    terms.extend(_stem(part) for part in parts if len(part) > 1 and part not in STOPWORDS)
+    return tuple(terms)
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Search terms of code or prose: identifiers split at underscores and camelCase humps,
+    lowercased and crudely singularized; compound identifiers are kept whole as well.
+    """
+    terms = []
+    for identifier in _IDENTIFIER.findall(text):
+        terms.extend(_identifier_terms(identifier))
+    return terms
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+@dataclass
+class Chunk:
+    path: str
+    name: str
+    start_line: int
+    end_line: int
+    text: str
+    terms: Dict[str, int]
+    length: int
+
+    @property
+    def prompt_text(self) -> str:
+        return f"\n### {self.name} (lines {self.start_line}-{self.end_line})\n{self.text}\n"
+
+    @property
+    def tokens(self) -> int:
+        return estimate_tokens(self.prompt_text)
+
+
+def file_heading(path: str) -> str:
+    return f"\n## File: {path}\n"
+
+
+def _node_start(node: ast.AST) -> int:
+    # decorators belong to the definition
+    return min([node.lineno, *(d.lineno for d in getattr(node, 'decorator_list', []))])
+
+
+def _python_spans(source: str) -> List[Tuple[str, int, int]]:
+    """(name, first line, last line) of each function, class or method, plus the code between them."""
+    lines = source.split('\n')
+    tree = ast.parse(source)
+    spans = []
+
+    def gap(name, start, end):
+        # the statements between definitions, minus blank edges
+        while start <= end and not lines[start - 1].strip():
+            start += 1
+        while end >= start and not lines[end - 1].strip():
+            end -= 1
+        if start <= end:
+            spans.append((name, start, end))
+
+    def visit(body, prefix, name, start, end):
+        cursor = start
+        for node in body:
+            if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                continue
+            node_start = _node_start(node)
+            gap(name, cursor, node_start - 1)
+            qualified = f'{prefix}{node.name}'
+            if isinstance(node, ast.ClassDef) and node.end_lineno - node_start + 1 > MAX_CLASS_LINES:
+                visit(node.body, f'{qualified}.', qualified, node_start, node.end_lineno)
+            else:
+                spans.append((qualified, node_start, node.end_lineno))
+            cursor = node.end_lineno + 1
+        gap(name, cursor, end)
+
+    visit(tree.body, '', '<module>', 1, len(lines))
+    return sorted(spans, key=lambda span: span[1])
+
+
+def _css_spans(source: str) -> List[Tuple[str, int, int]]:
+    """Top-level rules, consecutive small ones merged, named by their first selector."""
+    lines = source.split('\n')
+    spans, depth, start = [], 0, None
+    for number, line in enumerate(lines, 1):
+        if start is None and line.strip():
+            start = number
+        depth += line.count('{') - line.count('}')
+        if start is not None and depth <= 0 and '}' in line:
+            depth = 0
+            if spans and number - spans[-1][1] < CSS_CHUNK_LINES:
+                spans[-1] = (spans[-1][0], spans[-1][1], number)
+            else:
+                spans.append((lines[start - 1].strip().rstrip('{').strip()[:60], start, number))
+            start = None
+    if start is not None:
+        spans.append((lines[start - 1].strip()[:60], start, len(lines)))
+    return spans
+
+
+def _window_spans(source: str) -> List[Tuple[str, int, int]]:
+    count = source.count('\n') + 1
+    return [
+        (f'lines {start}-{min(start + WINDOW_LINES - 1, count)}', start, min(start + WINDOW_LINES - 1, count))
+        for start in range(1, count + 1, WINDOW_LINES)
+    ]
+
+
+def chunk_source(path: str, source: str) -> List[Chunk]:
+    """Split a file into chunks: ast definitions for Python, rules for CSS, line windows otherwise."""
+    suffix = os.path.splitext(path)[1].lower()
+    try:
+        if suffix == '.py':
+            spans = _python_spans(source)
+        elif suffix == '.css':
+            spans = _css_spans(source)
+        else:
+            spans = _window_spans(source)
+    except (SyntaxError, ValueError):
+        spans = _window_spans(source)
+
+    lines = source.split('\n')
+    # the path's own words help a chunk match requests that name its module
+    path_terms = tokenize(path)
+    chunks = []
+    for name, start, end in spans:
+        text = '\n'.join(lines[start - 1:end])
+        if not text.strip():
+            continue
+        terms = Counter(tokenize(text))
+        terms.update(path_terms)
+        terms.update(tokenize(name))
+        chunks.append(Chunk(path, name, start, end, text, dict(terms), sum(terms.values())))
+    return chunks
+
+
+class CodeSearch:
+    """
+    BM25 over function, class and rule sized chunks of the files in a CodebaseIndex.
+    Chunks are stored next to the index with the sha256 of the file they came from, so
+    refresh() only re-chunks files whose content changed; postings are kept in memory
+    and updated per file.
+    """
+
+    def __init__(self, index: CodebaseIndex):
+        self.index = index
+        self.path = index.path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._chunks: Dict[int, Chunk] = {}
+        self._file_chunks: Dict[str, Tuple[str, List[int]]] = {}  # path -> (sha256, chunk ids)
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._total_length = 0
+        self._next_id = 0
+        with self._connect() as conn:
+            # the content each file was chunked from; files with no chunks are recorded too
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS chunked_files (root TEXT NOT NULL, path TEXT NOT NULL, '
+                'sha256 TEXT, PRIMARY KEY (root, path))'
+            )
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS chunks (
+                    root TEXT NOT NULL,
+                    path TEXT NOT NULL,
+                    ordinal INTEGER NOT NULL,
+                    name TEXT,
+                    start_line INTEGER,
+                    end_line INTEGER,
+                    text TEXT,
+                    terms TEXT,
+                    PRIMARY KEY (root, path, ordinal)
+                )
+            ''')
+        self._load()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            self._local.conn = conn
+        return conn
+
+    def _load(self):
+        conn = self._connect()
+        chunks: Dict[str, List[Chunk]] = {}
+        rows = conn.execute(
+            'SELECT path, name, start_line, end_line, text, terms FROM chunks '
+            'WHERE root = ? ORDER BY path, ordinal',
+            (self.index.root,)
+        )
+        for path, name, start, end, text, terms in rows:
+            terms = json.loads(terms)
+            chunks.setdefault(path, []).append(Chunk(path, name, start, end, text, terms, sum(terms.values())))
+        for path, sha256 in conn.execute('SELECT path, sha256 FROM chunked_files WHERE root = ?', (self.index.root,)):
+            self._add_file(path, sha256, chunks.get(path, []))
+
+    def _add_file(self, path: str, sha256: str, chunks: List[Chunk]):
+        ids = []
+        for chunk in chunks:
+            chunk_id, self._next_id = self._next_id, self._next_id + 1
+            self._chunks[chunk_id] = chunk
+            self._total_length += chunk.length
+            for term, count in chunk.terms.items():
+                self._postings.setdefault(term, {})[chunk_id] = count
+            ids.append(chunk_id)
+        self._file_chunks[path] = (sha256, ids)
+
+    def _remove_file(self, path: str):
+        _, ids = self._file_chunks.pop(path)
+        for chunk_id in ids:
+            chunk = self._chunks.pop(chunk_id)
+            self._total_length -= chunk.length
+            for term in chunk.terms:
+                postings = self._postings[term]
+                del postings[chunk_id]
+                if not postings:
+                    del self._postings[term]
+
+    def refresh(self) -> List[str]:
+        """Refresh the index, re-chunk the files whose content changed and return their paths."""
+        self.index.refresh()
+        files = self.index.files()
+        with self._lock:
+            stale = [path for path in self._file_chunks if path not in files]
+            changed = [path for path, sha256 in files.items()
+                       if self._file_chunks.get(path, (None,))[0] != sha256]
+            # path -> (sha256 of the bytes chunked, chunks); the file may have changed again
+            # since the index hashed it, and then the next refresh should re-chunk it
+            rechunked = {}
+            for path in changed:
+                try:
+                    with open(os.path.join(self.index.root, path), 'rb') as f:
+                        data = f.read()
+                except OSError as e:
+                    print(f"Error reading {path}: {str(e)}")
+                    continue
+                rechunked[path] = hashlib.sha256(data).hexdigest(), chunk_source(path, decode_source(data))
+
+            for path in stale + list(rechunked):
+                if path in self._file_chunks:
+                    self._remove_file(path)
+            for path, (sha256, chunks) in rechunked.items():
+                self._add_file(path, sha256, chunks)
+            self._save(stale, rechunked)
+            return sorted(stale + list(rechunked))
+
+    def _save(self, stale: List[str], rechunked: Dict[str, Tuple[str, List[Chunk]]]):
+        if not stale and not rechunked:
+            return
+        root = self.index.root
+        with self._connect() as conn:
+            for table in ('chunks', 'chunked_files'):
+                conn.executemany(
+                    f'DELETE FROM {table} WHERE root = ? AND path = ?',
+                    [(root, path) for path in stale + list(rechunked)]
+                )
+            conn.executemany(
+                'INSERT INTO chunked_files (root, path, sha256) VALUES (?, ?, ?)',
+                [(root, path, sha256) for path, (sha256, _) in rechunked.items()]
+            )
+            conn.executemany(
+                'INSERT INTO chunks (root, path, ordinal, name, start_line, end_line, text, terms) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                [
+                    (root, path, ordinal, chunk.name, chunk.start_line, chunk.end_line,
+                     chunk.text, json.dumps(chunk.terms))
+                    for path, (_, chunks) in rechunked.items()
+                    for ordinal, chunk in enumerate(chunks)
+                ]
+            )
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[Tuple[float, Chunk]]:
+        """Chunks matching any query term, best BM25 score first."""
+        with self._lock:
+            total = len(self._chunks)
+            if not total:
+                return []
+            average_length = self._total_length / total
+            scores: Dict[int, float] = {}
+            for term in set(tokenize(query)):
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+                for chunk_id, count in postings.items():
+                    norm = K1 * (1 - B + B * self._chunks[chunk_id].length / average_length)
+                    scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * count * (K1 + 1) / (count + norm)
+            ranked = sorted(scores.items(), key=lambda item: -item[1])[:limit]
+            return [(score, self._chunks[chunk_id]) for chunk_id, score in ranked]
+
+    def in_file_order(self) -> List[Chunk]:
+        with self._lock:
+            return [self._chunks[chunk_id] for path in sorted(self._file_chunks)
+                    for chunk_id in self._file_chunks[path][1]]
+
+    def select(self, query: str, token_budget: int) -> List[Chunk]:
+        """
+        The highest scoring chunks that fit in token_budget together with their file
+        headings, in file and line order. If no chunk matches the query, the budget is
+        filled with each file's module-level code (imports, constants) first, then the
+        remaining chunks in file order.
+        """
+        candidates = [chunk for _, chunk in self.search(query)]
+        if not candidates:
+            candidates = sorted(self.in_file_order(), key=lambda chunk: chunk.name != '<module>')
+        selected, paths, used = [], set(), 0
+        for chunk in candidates:
+            cost = chunk.tokens
+            if chunk.path not in paths:
+                cost += estimate_tokens(file_heading(chunk.path))
+            if used + cost <= token_budget:
+                selected.append(chunk)
+                paths.add(chunk.path)
+                used += cost
+        return sorted(selected, key=lambda chunk: (chunk.path, chunk.start_line))
+
+    def context(self, query: str, token_budget: int) -> str:
+        """Prompt text for a request: the whole snapshot if it fits, otherwise its most relevant chunks."""
+        self.refresh()
+        full = self.index.text()
+        if estimate_tokens(full) <= token_budget:
+            return full
+
+        title = f"# Code from {self.index.root} relevant to this request ({{}} of {len(self._chunks)} chunks)\n"
+        # room for the title once the count is filled in
+        chunks = self.select(query, token_budget - estimate_tokens(title) - 5)
+        parts = [title.format(len(chunks))]
+        current_path = None
+        for chunk in chunks:
+            if chunk.path != current_path:
+                current_path = chunk.path
+                parts.append(file_heading(chunk.path))
+            parts.append(chunk.prompt_text)
+        return ''.join(parts)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'files': len(self._file_chunks), 'chunks': len(self._chunks), 'terms': len(self._postings)}
@@ -0,0 +1,173 @@
+import os
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Set, TextIO, Tuple, Union
+
+DEFAULT_EXTENSIONS = {'.py', '.css'}
+DEFAULT_IGNORE_DIRS = {'.git', '.idea', '__pycache__', 'venv', '.venv', 'node_modules', '.env'}
+BLOCK_SIZE = 64 * 1024
+RULE = '=' * 80
+NEWLINE = ord('\n')
+
+
+def walk_targets(root: str, extensions: Set[str], ignore_dirs: Set[str],
+                 relative: str = '.') -> Iterator[Tuple[str, os.DirEntry]]:
+    """
+    (directory relative to root, os.DirEntry) of each target file in sorted path order.
+    Plain strings rather than Paths, since pathlib interns every path part it sees.
+    """
+    try:
+        with os.scandir(os.path.join(root, relative)) as it:
+            entries = sorted(it, key=lambda entry: entry.name)
+    except OSError:
+        return
+    for entry in entries:
+        try:
+            is_dir = entry.is_dir()
+        except OSError:
+            continue
+        if is_dir:
+            if entry.name not in ignore_dirs and not entry.is_symlink():
+                child = entry.name if relative == '.' else f'{relative}{os.sep}{entry.name}'
+                yield from walk_targets(root, extensions, ignore_dirs, child)
+        elif os.path.splitext(entry.name)[1].lower() in extensions:
+            yield relative, entry
+
+
+def iter_files(root: Union[str, Path], extensions: Iterable[str] = DEFAULT_EXTENSIONS,
+               ignore_dirs: Iterable[str] = DEFAULT_IGNORE_DIRS) -> Iterator[Path]:
+    """
+    Paths relative to root of the files with a target extension, in sorted path order.
+    Only one directory's entries are held at a time; symlinked directories are listed
+    but not followed, like os.walk.
+    """
+    extensions = {ext.lower() for ext in extensions}
+    for directory, entry in walk_targets(str(root), extensions, set(ignore_dirs)):
+        yield Path(directory, entry.name)
+
+
+def count_lines(path: Union[str, Path], block_size: int = BLOCK_SIZE) -> int:
+    """Lines in a file, counting newline bytes in fixed blocks; a last line without one counts too."""
+    buffer = bytearray(block_size)
+    lines, last = 0, NEWLINE
+    with open(path, 'rb') as f:
+        while True:
+            n = f.readinto(buffer)
+            if not n:
+                break
+            lines += buffer.count(b'\n', 0, n)
+            last = buffer[n - 1]
+    return lines if last == NEWLINE else lines + 1
+
+
+def count_lines_in(data: bytes) -> int:
+    """count_lines for bytes already in memory."""
+    lines = data.count(b'\n')
+    return lines if not data or data[-1] == NEWLINE else lines + 1
+
+
+def snapshot_header(root: str, total: int) -> str:
+    return f"# Code Contents from {root}\nTotal files found: {total}\n\n"
+
+
+def directory_heading(directory: str) -> str:
+    return f"\n## Directory: {directory if directory != '.' else 'root'}\n\n"
+
+
+def file_header(name: str, line_count: int) -> str:
+    return f"{RULE}\nFile: {name}\nLines: {line_count}\n{RULE}\n\n"
+
+
+def snapshot_summary(files: int, total_lines: int) -> str:
+    return f"\n{RULE}\nSummary:\nTotal files: {files}\nTotal lines of code: {total_lines}\n"
+
+
+def decode_source(data: bytes) -> str:
+    """File bytes decoded as open() in text mode would: utf-8 with replacement, universal newlines."""
+    return data.decode('utf-8', errors='replace').replace('\r\n', '\n').replace('\r', '\n')
+
+
+def format_file(name: str, data: bytes) -> Tuple[str, int]:
+    """(section, line count) of a file read whole, the same text iter_snapshot writes for it."""
+    text = decode_source(data)
+    line_count = count_lines_in(data)
+    return f"{file_header(name, line_count)}{text.strip()}\n\n", line_count
+
+
+def iter_content(path: Union[str, Path], block_size: int = BLOCK_SIZE) -> Iterator[str]:
+    """
+    The file's text with leading and trailing whitespace stripped, in chunks of about
+    block_size characters. Undecodable bytes become U+FFFD.
+    """
+    started = False
+    pending = ''  # trailing whitespace held back until more text follows it
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        while True:
+            chunk = f.read(block_size)
+            if not chunk:
+                return
+            if not started:
+                chunk = chunk.lstrip()
+                if not chunk:
+                    continue
+                started = True
+            text = chunk.rstrip()
+            if not text:
+                pending += chunk
+                continue
+            yield pending + text
+            pending = chunk[len(text):]
+
+
+def iter_snapshot(root: Union[str, Path], extensions: Iterable[str] = DEFAULT_EXTENSIONS,
+                  ignore_dirs: Iterable[str] = DEFAULT_IGNORE_DIRS,
+                  block_size: int = BLOCK_SIZE) -> Iterator[str]:
+    """
+    Every target file under root as one structured text block, yielded in pieces:
+    a header with the file count, files grouped under directory headings with their
+    line counts, then a summary. Memory stays bounded by block_size and the largest
+    single directory listing, however large the tree.
+    """
+    root = str(Path(root))
+    extensions = {ext.lower() for ext in extensions}
+    ignore_dirs = set(ignore_dirs)
+    # a cheap first walk, so the header can give the count without holding every path
+    total = sum(1 for _ in walk_targets(root, extensions, ignore_dirs))
+    yield snapshot_header(root, total)
+
+    files = total_lines = 0
+    current_dir = None
+    for file_dir, entry in walk_targets(root, extensions, ignore_dirs):
+        if file_dir != current_dir:
+            current_dir = file_dir
+            yield directory_heading(current_dir)
+
+        name, full_path = entry.name, entry.path
+        try:
+            line_count = count_lines(full_path, block_size)
+            content = iter_content(full_path, block_size)
+        except OSError as e:
+            print(f"Error reading {os.path.join(file_dir, name)}: {str(e)}")
+            line_count, content = 0, iter([f"Error reading file: {str(e)}"])
+        files += 1
+        total_lines += line_count
+
+        yield file_header(name, line_count)
+        yield from content
+        yield "\n\n"
+
+    yield snapshot_summary(files, total_lines)
+
+
+def write_snapshot(root: Union[str, Path], out: Union[str, Path, TextIO],
+                   extensions: Iterable[str] = DEFAULT_EXTENSIONS,
+                   ignore_dirs: Iterable[str] = DEFAULT_IGNORE_DIRS,
+                   block_size: int = BLOCK_SIZE) -> Optional[Path]:
+    """Stream the snapshot to a path or an open text file; returns the path if one was given."""
+    chunks = iter_snapshot(root, extensions, ignore_dirs, block_size)
+    if hasattr(out, 'write'):
+        out.writelines(chunks)
+        return None
+    path = Path(out)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.writelines(chunks)
+    return path
@@ -0,0 +1,200 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from app.tools.codebase import (
+    DEFAULT_EXTENSIONS, DEFAULT_IGNORE_DIRS, directory_heading, format_file, snapshot_header,
+    snapshot_summary, walk_targets
+)
+
+# a file modified this soon after it was hashed may still match the stored mtime and
+# size (coarse timestamps), so it is hashed again instead of trusted
+RACY_NS = 2 * 10 ** 9
+
+
+@dataclass
+class IndexEntry:
+    mtime_ns: int
+    size: int
+    sha256: str
+    lines: int
+    section: str
+    checked_ns: int
+
+    def row(self) -> Tuple:
+        return self.mtime_ns, self.size, self.sha256, self.lines, self.section, self.checked_ns
+
+    def stat_matches(self, stat: os.stat_result) -> bool:
+        return (
+            self.mtime_ns == stat.st_mtime_ns
+            and self.size == stat.st_size
+            and stat.st_mtime_ns + RACY_NS < self.checked_ns
+        )
+
+
+@dataclass
+class IndexChanges:
+    added: List[str] = field(default_factory=list)
+    modified: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    unchanged: int = 0
+
+    def __bool__(self):
+        return bool(self.added or self.modified or self.removed)
+
+    def __str__(self):
+        return (f"{len(self.added)} added, {len(self.modified)} modified, "
+                f"{len(self.removed)} removed, {self.unchanged} unchanged")
+
+
+class CodebaseIndex:
+    """
+    Formatted per-file sections of a codebase snapshot, kept in SQLite by path with the
+    mtime, size and sha256 they were made from. refresh() stats every file but only reads
+    the ones whose mtime or size moved, and only re-formats those whose hash changed.
+    text() gives the same snapshot as codebase.iter_snapshot.
+    """
+
+    def __init__(self, root: Union[str, Path], extensions: Iterable[str] = DEFAULT_EXTENSIONS,
+                 ignore_dirs: Iterable[str] = DEFAULT_IGNORE_DIRS, path: Optional[str] = None):
+        self.root = str(Path(root))
+        self.extensions = {ext.lower() for ext in extensions}
+        self.ignore_dirs = set(ignore_dirs)
+        self.path = Path(path or os.getenv('CODEBASE_INDEX_PATH', '.cache/codebase_index.sqlite3'))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # (directory, relative path) in snapshot order, from the last refresh
+        self._order: List[Tuple[str, str]] = []
+        self._text: Optional[str] = None
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS files (
+                    root TEXT NOT NULL,
+                    path TEXT NOT NULL,
+                    mtime_ns INTEGER,
+                    size INTEGER,
+                    sha256 TEXT,
+                    lines INTEGER,
+                    section TEXT,
+                    checked_ns INTEGER,
+                    PRIMARY KEY (root, path)
+                )
+            ''')
+        self._entries = self._load()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            self._local.conn = conn
+        return conn
+
+    def _load(self) -> Dict[str, IndexEntry]:
+        rows = self._connect().execute(
+            'SELECT path, mtime_ns, size, sha256, lines, section, checked_ns FROM files WHERE root = ?',
+            (self.root,)
+        )
+        return {path: IndexEntry(*values) for path, *values in rows}
+
+    def refresh(self) -> IndexChanges:
+        """Bring the index up to date with the files on disk and report what changed."""
+        with self._lock:
+            changes = IndexChanges()
+            order, seen, updated = [], set(), []
+            for directory, dir_entry in walk_targets(self.root, self.extensions, self.ignore_dirs):
+                name, full_path = dir_entry.name, dir_entry.path
+                relative = name if directory == '.' else f'{directory}{os.sep}{name}'
+                try:
+                    stat = dir_entry.stat()
+                except OSError:
+                    continue
+                order.append((directory, relative))
+                seen.add(relative)
+
+                entry = self._entries.get(relative)
+                if entry is not None and entry.stat_matches(stat):
+                    changes.unchanged += 1
+                    continue
+
+                checked_ns = time.time_ns()
+                try:
+                    with open(full_path, 'rb') as f:
+                        data = f.read()
+                except OSError as e:
+                    print(f"Error reading {relative}: {str(e)}")
+                    order.pop()
+                    seen.discard(relative)
+                    continue
+                sha256 = hashlib.sha256(data).hexdigest()
+                if entry is not None and entry.sha256 == sha256:
+                    # touched but not changed: keep the section, remember the new stat
+                    changes.unchanged += 1
+                    entry.mtime_ns, entry.size, entry.checked_ns = stat.st_mtime_ns, stat.st_size, checked_ns
+                else:
+                    (changes.added if entry is None else changes.modified).append(relative)
+                    section, lines = format_file(name, data)
+                    entry = IndexEntry(stat.st_mtime_ns, stat.st_size, sha256, lines, section, checked_ns)
+                    self._entries[relative] = entry
+                updated.append(relative)
+
+            changes.removed = sorted(set(self._entries) - seen)
+            for relative in changes.removed:
+                del self._entries[relative]
+            self._save(updated, changes.removed)
+
+            if changes or order != self._order:
+                self._order = order
+                self._text = None
+            return changes
+
+    def _save(self, updated: List[str], removed: List[str]):
+        if not updated and not removed:
+            return
+        with self._connect() as conn:
+            conn.executemany(
+                'INSERT OR REPLACE INTO files '
+                '(root, path, mtime_ns, size, sha256, lines, section, checked_ns) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                [(self.root, relative, *self._entries[relative].row()) for relative in updated]
+            )
+            conn.executemany(
+                'DELETE FROM files WHERE root = ? AND path = ?',
+                [(self.root, relative) for relative in removed]
+            )
+
+    def files(self) -> Dict[str, str]:
+        """{relative path: sha256} of the files as of the last refresh(), in snapshot order."""
+        with self._lock:
+            return {relative: self._entries[relative].sha256 for _, relative in self._order}
+
+    def text(self) -> str:
+        """The snapshot as of the last refresh(), joined once and reused until something changes."""
+        with self._lock:
+            if self._text is None:
+                parts = [snapshot_header(self.root, len(self._order))]
+                current_dir, total_lines = None, 0
+                for directory, relative in self._order:
+                    if directory != current_dir:
+                        current_dir = directory
+                        parts.append(directory_heading(directory))
+                    entry = self._entries[relative]
+                    parts.append(entry.section)
+                    total_lines += entry.lines
+                parts.append(snapshot_summary(len(self._order), total_lines))
+                self._text = ''.join(parts)
+            return self._text
+
+    def clear(self):
+        with self._lock:
+            with self._connect() as conn:
+                conn.execute('DELETE FROM files WHERE root = ?', (self.root,))
+            self._entries.clear()
+            self._order = []
+            self._text = None
@@ -0,0 +1,135 @@
+import gzip
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from flask import Flask, Response, request
+
+try:
+    import brotli
+except ImportError:  # optional; gzip only without it
+    brotli = None
+
+COMPRESSIBLE_TYPES = {
+    'application/json',
+    'application/javascript',
+    'text/javascript',
+    'text/css',
+    'text/html',
+    'text/plain',
+    'image/svg+xml',
+}
+
+# (gzip level, brotli quality): callbacks are compressed per response, so favour speed;
+# GET bodies (scripts, stylesheets, pages) are compressed once and cached
+DYNAMIC_LEVELS = (5, 4)
+CACHED_LEVELS = (9, 9)
+
+
+def accepted_encoding(accept_encoding: str) -> Optional[str]:
+    """'br' or 'gzip' if the client accepts it (q > 0), preferring br when brotli is installed."""
+    weights = {}
+    for part in (accept_encoding or '').split(','):
+        name, _, params = part.strip().partition(';')
+        weight = 1.0
+        q = params.strip()
+        if q.startswith('q='):
+            try:
+                weight = float(q[2:] or 0)
+            except ValueError:
+                # malformed weight: skip the coding rather than fail the response
+                weight = 0
+        weights[name.strip().lower()] = weight
+
+    def accepts(coding):
+        # a coding listed by name overrides '*', so 'gzip;q=0, *' still refuses gzip
+        return weights.get(coding, weights.get('*', 0)) > 0
+
+    if brotli is not None and accepts('br'):
+        return 'br'
+    if accepts('gzip'):
+        return 'gzip'
+    return None
+
+
+def compress(data: bytes, encoding: str, levels: Tuple[int, int] = DYNAMIC_LEVELS) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(data, quality=levels[1])
+    return gzip.compress(data, compresslevel=levels[0], mtime=0)
+
+
+class CompressedBodyCache:
+    """LRU of compressed GET bodies keyed by a hash of the uncompressed body, bounded in bytes."""
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get_or_compress(self, data: bytes, encoding: str) -> bytes:
+        key = (encoding, hashlib.blake2b(data, digest_size=16).digest())
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        compressed = compress(data, encoding, CACHED_LEVELS)
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = compressed
+                self._size += len(compressed)
+            while self._size > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+        return compressed
+
+
+def init_compression(server: Flask, min_size: Optional[int] = None) -> CompressedBodyCache:
+    """
+    Compress text responses of at least `min_size` bytes (COMPRESS_MIN_SIZE, default 1024)
+    with brotli or gzip, whichever the client accepts. Dash callback responses are compressed
+    on the fly, GET responses (component bundles, assets, the index page) through a cache.
+    """
+    min_size = int(os.getenv('COMPRESS_MIN_SIZE', 1024)) if min_size is None else min_size
+    cache = CompressedBodyCache()
+
+    @server.after_request
+    def compress_response(response: Response) -> Response:
+        response.vary.add('Accept-Encoding')
+        if (response.status_code != 200
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESSIBLE_TYPES
+                or response.is_streamed and not response.direct_passthrough):
+            return response
+        if response.content_length is not None and response.content_length < min_size:
+            return response
+
+        encoding = accepted_encoding(request.headers.get('Accept-Encoding'))
+        if encoding is None:
+            return response
+
+        # send_file responses are file wrappers; read them so they can be compressed,
+        # then close the file, since the wrapper is no longer the body werkzeug will close
+        body_iterable = response.response
+        response.direct_passthrough = False
+        data = response.get_data()
+        if hasattr(body_iterable, 'close'):
+            body_iterable.close()
+        if len(data) < min_size:
+            return response
+
+        if request.method == 'GET':
+            body = cache.get_or_compress(data, encoding)
+        else:
+            body = compress(data, encoding)
+        response.set_data(body)
+        response.headers['Content-Encoding'] = encoding
+        # weak: the representation changed but the ETag still names the same content
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+
+    return cache
@@ -0,0 +1,145 @@
+import hashlib
+import io
+import json
+import os
+import threading
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, Optional, Union
+
+
+class ContentAddressedCache:
+    """
+    Files on disk named by a sha256 key, e.g. of the parameters that produced them.
+    Writes go to a temporary file and are renamed into place, so readers and other
+    gunicorn workers never see partial files. Each hit refreshes the file's mtime, and
+    when the total size passes `max_bytes` the least recently used files are deleted
+    down to `low_water` of the cap.
+    """
+
+    def __init__(self, root: Union[str, Path], max_bytes: int = 256 * 1024 * 1024,
+                 suffix: str = '', low_water: float = 0.9):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self.low_water = low_water
+        self._lock = threading.Lock()
+        # striped locks: concurrent misses for one key produce it once per process
+        self._key_locks = [threading.Lock() for _ in range(64)]
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+        self._size = sum(size for _, size, _ in self._entries())
+
+    @staticmethod
+    def key_for(*parts) -> str:
+        return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+    def path_for(self, key: str) -> Path:
+        return self.root / key[:2] / f'{key}{self.suffix}'
+
+    def get(self, key: str) -> Optional[Path]:
+        path = self.path_for(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            self._record('misses')
+            return None
+        self._record('hits')
+        return path
+
+    def put(self, key: str, write: Callable[[BinaryIO], None]) -> Path:
+        """Create the entry by calling write() with a binary file object."""
+        path = self.path_for(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f'.{path.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+        try:
+            with open(tmp, 'wb') as f:
+                write(f)
+            size = tmp.stat().st_size
+            os.replace(tmp, path)
+        finally:
+            if tmp.exists():
+                tmp.unlink()
+
+        with self._lock:
+            self._size += size
+            over = self._size > self.max_bytes
+        if over:
+            self.evict()
+        return path
+
+    def put_bytes(self, key: str, data: bytes) -> Path:
+        return self.put(key, lambda f: f.write(data))
+
+    def get_or_create(self, key: str, write: Callable[[BinaryIO], None]) -> Path:
+        path = self.get(key)
+        if path is not None:
+            return path
+        with self._key_locks[int(key[:8], 16) % len(self._key_locks)]:
+            # another thread may have produced it while we waited
+            if self.path_for(key).exists():
+                return self.path_for(key)
+            return self.put(key, write)
+
+    def open_or_create(self, key: str, write: Callable[[BinaryIO], None], attempts: int = 2) -> BinaryIO:
+        """
+        get_or_create, returning the entry opened for reading. An open file stays readable
+        after eviction deletes it, so the caller can stream it while other threads or
+        workers evict. If the entry keeps disappearing before it can be opened, it is
+        produced into memory instead.
+        """
+        for _ in range(attempts):
+            path = self.get_or_create(key, write)
+            try:
+                return open(path, 'rb')
+            except FileNotFoundError:
+                # evicted between being found or written and being opened
+                continue
+        buffer = io.BytesIO()
+        write(buffer)
+        buffer.seek(0)
+        return buffer
+
+    def _entries(self):
+        for path in self.root.glob(f'*/*{self.suffix}'):
+            if path.name.startswith('.'):
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            yield path, stat.st_size, stat.st_mtime
+
+    def evict(self) -> int:
+        """Delete least recently used files until the cache is under low_water * max_bytes."""
+        with self._lock:
+            # rescan: other workers share the directory
+            entries = sorted(self._entries(), key=lambda entry: entry[2])
+            total = sum(size for _, size, _ in entries)
+            target = self.max_bytes * self.low_water
+            removed = 0
+            for path, size, _ in entries:
+                if total <= target:
+                    break
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+                total -= size
+                removed += 1
+            self._size = total
+            self._stats['evictions'] += removed
+            return removed
+
+    def _record(self, field: str):
+        with self._lock:
+            self._stats[field] += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._stats, 'bytes': self._size}
+
+    def clear(self):
+        with self._lock:
+            for path, _, _ in list(self._entries()):
+                path.unlink(missing_ok=True)
+            self._size = 0
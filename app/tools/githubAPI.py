@@ -1,23 +1,75 @@
 import os
 
-import requests
 import base64
-from typing import List, Tuple
+import hashlib
+import json
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
 from urllib.parse import urlparse
-import os
 from flask.cli import load_dotenv
+from app.tools.api_cache import get_api_cache
+from app.tools.content_cache import ContentAddressedCache
+from app.tools.http_client import get_http_client
+
+
+def git_blob_sha(data: bytes) -> str:
+    """The sha git (and GitHub) names a file's contents by."""
+    return hashlib.sha1(b'blob %d\0' % len(data) + data).hexdigest()
+
+
+class GithubCache:
+    """
+    GitHub responses kept on disk between runs and shared by gunicorn workers:
+    - blobs: file contents named by their git blob sha, so an entry never goes stale
+    - listings: the last body and ETag of each listing URL, revalidated with If-None-Match
+    """
+
+    def __init__(self, root, max_bytes: int):
+        root = Path(root)
+        self.blobs = ContentAddressedCache(root / 'blobs', max_bytes=max_bytes)
+        self.listings = ContentAddressedCache(root / 'listings', max_bytes=max_bytes, suffix='.json')
+
+    def clear(self):
+        self.blobs.clear()
+        self.listings.clear()
+
+
+_github_cache = None
+_github_cache_lock = threading.Lock()
+
+
+def get_github_cache() -> GithubCache:
+    """
+    Process-wide GitHub disk cache, configured from the environment:
+    - GITHUB_CACHE_PATH: directory (default .cache/github)
+    - GITHUB_CACHE_MAX_BYTES: size cap for blobs and for listings (default 64 MB each)
+    """
+    global _github_cache
+    with _github_cache_lock:
+        if _github_cache is None:
+            _github_cache = GithubCache(
+                os.getenv('GITHUB_CACHE_PATH', '.cache/github'),
+                max_bytes=int(os.getenv('GITHUB_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+            )
+        return _github_cache
 
 
 class GithubAPI:
     def __init__(self):
         load_dotenv()
         self.access_token = os.getenv("GITHUB_ACCESS_TOKEN")
-        self.headers = {'Authorization': f"Bearer{self.access_token}",
-                        'Accept': 'application/vnd.github.v3+json'
-                        }
+        self.headers = {'Accept': 'application/vnd.github.v3+json'}
+        if self.access_token:
+            self.headers['Authorization'] = f"Bearer {self.access_token}"
         self.repo_url = "https://github.com/alexander-matthew/PortfolioWebsite"
         self.base_url = 'https://api.github.com'
         self.target_extensions = {'.py', '.css'}
+        # branch, tag or commit for tree fetches
+        self.ref = 'HEAD'
+        self.max_workers = 8
 
 
     def parse_repo_url(self) -> Tuple[str, str]:
@@ -26,32 +78,132 @@ class GithubAPI:
         return parts[0], parts[1]
 
 
+    def get_json(self, url: str, params: Optional[Dict] = None):
+        """
+        GET a listing, sending the ETag of the copy on disk as If-None-Match. GitHub
+        answers 304 when it hasn't changed, which doesn't count against the rate limit.
+        """
+        listings = get_github_cache().listings
+        key = listings.key_for(url, params, get_api_cache().owner_id(self.access_token))
+        stored = None
+        path = listings.get(key)
+        if path is not None:
+            try:
+                stored = json.loads(path.read_bytes())
+            except (FileNotFoundError, ValueError):
+                # evicted or replaced under us; fetch it again
+                stored = None
+
+        headers = self.headers
+        if stored is not None:
+            headers = {**headers, 'If-None-Match': stored['etag']}
+        response = get_http_client().get(url, headers=headers, params=params)
+        if response.status_code == 304 and stored is not None:
+            return stored['body']
+        response.raise_for_status()
+        body = response.json()
+        etag = response.headers.get('ETag')
+        if etag:
+            listings.put_bytes(key, json.dumps({'etag': etag, 'body': body}).encode('utf-8'))
+        return body
+
     def get_repo_contents(self, owner: str, repo: str, path: str = '') -> List[dict]:
         url = f'{self.base_url}/repos/{owner}/{repo}/contents/{path}'
-        response = requests.get(url, headers=self.headers)
-        response.raise_for_status()
-        return response.json()
+        return get_api_cache().get_or_fetch(
+            'github.repo_contents', lambda: self.get_json(url), owner=self.access_token, params={'url': url}
+        )
+
+    def get_tree(self, owner: str, repo: str, ref: Optional[str] = None) -> dict:
+        """Every entry in the repository in one recursive git-trees request."""
+        url = f'{self.base_url}/repos/{owner}/{repo}/git/trees/{ref or self.ref}'
+        return get_api_cache().get_or_fetch(
+            'github.tree', lambda: self.get_json(url, {'recursive': '1'}), owner=self.access_token,
+            params={'url': url}
+        )
+
+    def get_blob_content(self, owner: str, repo: str, sha: str) -> str:
+        return self.get_cached_blob(
+            sha, lambda: self.get_file_content(f'{self.base_url}/repos/{owner}/{repo}/git/blobs/{sha}')
+        )
+
+    def get_cached_blob(self, sha: Optional[str], fetch: Callable[[], str]) -> str:
+        """File contents from disk by blob sha, downloading them with fetch() on a miss."""
+        if not sha:
+            return fetch()
+        blobs = get_github_cache().blobs
+        path = blobs.get(sha)
+        if path is not None:
+            try:
+                return path.read_bytes().decode('utf-8')
+            except FileNotFoundError:
+                pass
+        content = fetch()
+        data = content.encode('utf-8')
+        # only keep what really has that sha, so a bad response can't poison the cache
+        if git_blob_sha(data) == sha:
+            blobs.put_bytes(sha, data)
+        return content
+
+    def is_target(self, name: str) -> bool:
+        return any(name.endswith(ext) for ext in self.target_extensions)
 
     def get_file_content(self, url: str) -> str:
-        response = requests.get(url, headers=self.headers)
+        response = get_http_client().get(url, headers=self.headers)
         response.raise_for_status()
         content = response.json().get('content', '')
         return base64.b64decode(content).decode('utf-8')
 
-    def fetch_target_files(self) -> List[Tuple[str, str]]:
+    def fetch_target_files(self, mode: str = 'tree') -> List[Tuple[str, str]]:
         """
         Fetch all .py and .css files from a repository.
         Args:
-            repo_url: Full GitHub repository URL
+            mode: 'tree' lists the repo in one git-trees request and downloads the
+                  matching blobs concurrently; 'contents' walks it directory by directory.
+                  Either way listings are revalidated by ETag and blobs already on
+                  disk are not downloaded again.
         Returns:
             List of tuples containing (file_path, content)
         """
+        if mode == 'contents':
+            return self._fetch_by_contents()
+        if mode != 'tree':
+            raise ValueError(f"Unknown fetch mode: {mode}")
+
+        owner, repo = self.parse_repo_url()
+        try:
+            tree = self.get_tree(owner, repo)
+        except Exception as e:
+            print(f"Error listing tree: {str(e)}")
+            return self._fetch_by_contents()
+        if tree.get('truncated'):
+            # too large for one trees response
+            return self._fetch_by_contents()
+
+        blobs = [
+            item for item in tree.get('tree', [])
+            if item['type'] == 'blob' and self.is_target(item['path'].rsplit('/', 1)[-1])
+        ]
+
+        def fetch(item):
+            try:
+                content = self.get_blob_content(owner, repo, item['sha'])
+                print(f"Fetched: {item['path']}")
+                return item['path'], content
+            except Exception as e:
+                print(f"Error fetching {item['path']}: {str(e)}")
+                return None
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            results = list(pool.map(fetch, blobs))
+        return [result for result in results if result is not None]
+
+    def _fetch_by_contents(self) -> List[Tuple[str, str]]:
         owner, repo = self.parse_repo_url()
         contents = []
-        to_process = [('', [])]  # (path, breadcrumbs)
+        to_process = deque([('', [])])  # (path, breadcrumbs)
 
         while to_process:
-            current_path, breadcrumbs = to_process.pop(0)
+            current_path, breadcrumbs = to_process.popleft()
             try:
                 items = self.get_repo_contents(owner, repo, current_path)
 
@@ -65,9 +217,11 @@ class GithubAPI:
                         to_process.append((item['path'], [*breadcrumbs, item['name']]))
 
                     elif item['type'] == 'file':
-                        if any(item['name'].endswith(ext) for ext in self.target_extensions):
+                        if self.is_target(item['name']):
                             try:
-                                content = self.get_file_content(item['url'])
+                                content = self.get_cached_blob(
+                                    item.get('sha'), lambda: self.get_file_content(item['url'])
+                                )
                                 contents.append((item_path, content))
                                 print(f"Fetched: {item_path}")
                             except Exception as e:
@@ -0,0 +1,124 @@
+import math
+from dataclasses import dataclass
+from typing import Tuple
+
+import numpy as np
+
+EARTH_RADIUS_M = 6378137.0
+# web mercator ground resolution at zoom 0, meters per 256px-tile pixel at the equator
+METERS_PER_PIXEL_Z0 = 2 * math.pi * EARTH_RADIUS_M / 256
+MAX_ZOOM = 16
+
+
+@dataclass
+class TrackSummary:
+    original_points: int
+    simplified_points: int
+    tolerance_m: float
+    zoom: float
+
+
+def as_track(latlng) -> np.ndarray:
+    """(N, 2) float64 array of [lat, lon] rows; NaN rows are dropped."""
+    track = np.asarray(latlng, dtype=np.float64).reshape(-1, 2)
+    return track[~np.isnan(track).any(axis=1)]
+
+
+def bounding_box(track: np.ndarray) -> Tuple[float, float, float, float]:
+    """(min_lat, min_lon, max_lat, max_lon)"""
+    (min_lat, min_lon), (max_lat, max_lon) = track.min(axis=0), track.max(axis=0)
+    return float(min_lat), float(min_lon), float(max_lat), float(max_lon)
+
+
+def centroid(track: np.ndarray) -> Tuple[float, float]:
+    lat, lon = track.mean(axis=0)
+    return float(lat), float(lon)
+
+
+def zoom_for_bbox(bbox, width_px: int = 600, height_px: int = 400, padding: float = 1.2) -> float:
+    """Largest web mercator zoom at which the padded bounding box fits the viewport."""
+    min_lat, min_lon, max_lat, max_lon = bbox
+    mid_lat = math.radians((min_lat + max_lat) / 2)
+    width_m = math.radians(max_lon - min_lon) * EARTH_RADIUS_M * math.cos(mid_lat) * padding
+    height_m = math.radians(max_lat - min_lat) * EARTH_RADIUS_M * padding
+
+    meters_per_pixel = max(width_m / width_px, height_m / height_px)
+    if meters_per_pixel <= 0:
+        return MAX_ZOOM
+    zoom = math.log2(METERS_PER_PIXEL_Z0 * math.cos(mid_lat) / meters_per_pixel)
+    return float(min(MAX_ZOOM, max(0.0, zoom)))
+
+
+def tolerance_for_zoom(zoom: float, lat: float, pixels: float = 1.0) -> float:
+    """Ground distance in meters covered by `pixels` screen pixels at this zoom and latitude."""
+    return pixels * METERS_PER_PIXEL_Z0 * math.cos(math.radians(lat)) / 2 ** zoom
+
+
+def project(track: np.ndarray) -> np.ndarray:
+    """Local equirectangular projection to meters, accurate enough for a single activity."""
+    lat0 = math.radians(float(track[:, 0].mean()))
+    rad = np.radians(track)
+    return np.column_stack([
+        rad[:, 1] * math.cos(lat0) * EARTH_RADIUS_M,
+        rad[:, 0] * EARTH_RADIUS_M
+    ])
+
+
+def _segment_distances(points: np.ndarray, start: np.ndarray, end: np.ndarray) -> np.ndarray:
+    segment = end - start
+    length_sq = segment @ segment
+    if length_sq == 0:
+        return np.linalg.norm(points - start, axis=1)
+    t = np.clip((points - start) @ segment / length_sq, 0, 1)
+    return np.linalg.norm(points - (start + t[:, None] * segment), axis=1)
+
+
+def rdp_mask(xy: np.ndarray, epsilon: float) -> np.ndarray:
+    """
+    Ramer-Douglas-Peucker on projected (N, 2) points. Iterative, with each
+    segment's point distances computed in one vectorized pass. Returns a keep mask.
+    """
+    n = len(xy)
+    keep = np.zeros(n, dtype=bool)
+    if n == 0:
+        return keep
+    keep[[0, n - 1]] = True
+
+    stack = [(0, n - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        distances = _segment_distances(xy[first + 1:last], xy[first], xy[last])
+        index = int(np.argmax(distances))
+        if distances[index] > epsilon:
+            split = first + 1 + index
+            keep[split] = True
+            stack.append((first, split))
+            stack.append((split, last))
+    return keep
+
+
+def simplify_track(latlng, zoom: float = None, max_points: int = 2000,
+                   pixel_tolerance: float = 1.0) -> Tuple[np.ndarray, TrackSummary]:
+    """
+    Simplify a GPS track for display at `zoom` (fit to the track when None).
+    The RDP tolerance is `pixel_tolerance` screen pixels of ground distance. If the
+    result still exceeds `max_points`, the tolerance is doubled until it fits.
+    """
+    track = as_track(latlng)
+    if zoom is None:
+        zoom = zoom_for_bbox(bounding_box(track)) if len(track) else MAX_ZOOM
+    if len(track) <= 2:
+        return track, TrackSummary(len(track), len(track), 0.0, zoom)
+
+    xy = project(track)
+    tolerance = tolerance_for_zoom(zoom, float(track[:, 0].mean()), pixel_tolerance)
+    keep = rdp_mask(xy, tolerance)
+    # the two endpoints are always kept
+    while keep.sum() > max(max_points, 2):
+        tolerance *= 2
+        keep = rdp_mask(xy, tolerance)
+
+    simplified = track[keep]
+    return simplified, TrackSummary(len(track), len(simplified), tolerance, zoom)
@@ -0,0 +1,148 @@
+import os
+import threading
+import time
+from collections import deque, defaultdict
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple, Union
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# (connect, read) seconds
+DEFAULT_TIMEOUT = (3.05, 20)
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class _Retry(Retry):
+    """Retry that honors Retry-After, but never sleeps longer than max_retry_after."""
+
+    max_retry_after = 30
+
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        return None if retry_after is None else min(retry_after, self.max_retry_after)
+
+
+@dataclass
+class RequestTiming:
+    host: str
+    method: str
+    path: str
+    status: Optional[int]
+    seconds: float
+
+
+class HttpClient:
+    """
+    Shared transport for the API clients: one pooled keep-alive requests.Session per
+    upstream host, default connect/read timeouts, retry with exponential backoff on
+    connection errors and 429/5xx (Retry-After honored), and per-request timings.
+    """
+
+    def __init__(self, pool_size: int = 10, timeout: Union[float, Tuple[float, float]] = DEFAULT_TIMEOUT,
+                 retries: int = 3, backoff_factor: float = 0.5, max_timings: int = 1000):
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.timings = deque(maxlen=max_timings)
+        self._sessions: Dict[str, requests.Session] = {}
+        self._lock = threading.Lock()
+
+    def _make_session(self) -> requests.Session:
+        retry = _Retry(
+            total=self.retries,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            respect_retry_after_header=True,
+            # hand the last response back to the caller instead of raising
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=retry)
+        session = requests.Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def session_for(self, url: str) -> requests.Session:
+        parsed = urlparse(url)
+        host = f'{parsed.scheme}://{parsed.netloc}'
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = self._sessions[host] = self._make_session()
+            return session
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault('timeout', self.timeout)
+        parsed = urlparse(url)
+        status = None
+        start = time.perf_counter()
+        try:
+            response = self.session_for(url).request(method, url, **kwargs)
+            status = response.status_code
+            return response
+        finally:
+            self.timings.append(RequestTiming(
+                host=parsed.netloc,
+                method=method.upper(),
+                path=parsed.path,
+                status=status,
+                seconds=time.perf_counter() - start
+            ))
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+    def stats(self) -> Dict[str, Dict]:
+        """Count, error count, mean and max latency per host over the recorded timings."""
+        by_host = defaultdict(list)
+        for timing in list(self.timings):
+            by_host[timing.host].append(timing)
+
+        report = {}
+        for host, timings in by_host.items():
+            seconds = [t.seconds for t in timings]
+            report[host] = {
+                'requests': len(timings),
+                'errors': sum(1 for t in timings if t.status is None or t.status >= 400),
+                'avg_ms': 1000 * sum(seconds) / len(seconds),
+                'max_ms': 1000 * max(seconds),
+            }
+        return report
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+_http_client = None
+_http_client_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    """
+    Process-wide client, configured from the environment:
+    - HTTP_POOL_SIZE: keep-alive connections per host (default 10)
+    - HTTP_CONNECT_TIMEOUT / HTTP_READ_TIMEOUT: seconds
+    - HTTP_RETRIES: retry attempts for connection errors and 429/5xx (default 3)
+    """
+    global _http_client
+    with _http_client_lock:
+        if _http_client is None:
+            _http_client = HttpClient(
+                pool_size=int(os.getenv('HTTP_POOL_SIZE', 10)),
+                timeout=(
+                    float(os.getenv('HTTP_CONNECT_TIMEOUT', DEFAULT_TIMEOUT[0])),
+                    float(os.getenv('HTTP_READ_TIMEOUT', DEFAULT_TIMEOUT[1]))
+                ),
+                retries=int(os.getenv('HTTP_RETRIES', 3)),
+            )
+        return _http_client
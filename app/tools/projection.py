@@ -0,0 +1,138 @@
+import math
+from functools import reduce
+
+import numpy as np
+
+
+class Matrix3D:
+    """
+    4x4 homogeneous transforms for column vectors (M @ p). compose(A, B, C) is A @ B @ C,
+    so C is applied first: compose(viewport, perspective, view, model).
+    """
+
+    @staticmethod
+    def identity():
+        return np.eye(4)
+
+    @staticmethod
+    def compose(*matrices):
+        return reduce(np.matmul, matrices, np.eye(4))
+
+    @staticmethod
+    def translation(x=0.0, y=0.0, z=0.0):
+        matrix = np.eye(4)
+        matrix[:3, 3] = x, y, z
+        return matrix
+
+    @staticmethod
+    def scaling(x=1.0, y=None, z=None):
+        return np.diag([x, x if y is None else y, x if z is None else z, 1.0])
+
+    @staticmethod
+    def rotation_y(angle):
+        """Create rotation matrix around Y axis"""
+        cos_a = math.cos(angle)
+        sin_a = math.sin(angle)
+        return np.array([
+            [cos_a, 0, -sin_a, 0],
+            [0, 1, 0, 0],
+            [sin_a, 0, cos_a, 0],
+            [0, 0, 0, 1]
+        ])
+
+    @staticmethod
+    def rotation_x(angle):
+        """Create rotation matrix around X axis"""
+        cos_a = math.cos(angle)
+        sin_a = math.sin(angle)
+        return np.array([
+            [1, 0, 0, 0],
+            [0, cos_a, sin_a, 0],
+            [0, -sin_a, cos_a, 0],
+            [0, 0, 0, 1]
+        ])
+
+    @staticmethod
+    def rotation_z(angle):
+        """Create rotation matrix around Z axis"""
+        cos_a = math.cos(angle)
+        sin_a = math.sin(angle)
+        return np.array([
+            [cos_a, sin_a, 0, 0],
+            [-sin_a, cos_a, 0, 0],
+            [0, 0, 1, 0],
+            [0, 0, 0, 1]
+        ])
+
+    @staticmethod
+    def view(camera_distance=3.0):
+        """Camera at the origin looking down +z: moves the scene `camera_distance` in front of it."""
+        return Matrix3D.translation(z=camera_distance)
+
+    @staticmethod
+    def perspective(focal_length=2.0):
+        """Pinhole projection: after the divide by w (= z), x and y are scaled by focal_length / z."""
+        return np.array([
+            [focal_length, 0, 0, 0],
+            [0, focal_length, 0, 0],
+            [0, 0, 1, 0],
+            [0, 0, 1, 0]
+        ], dtype=float)
+
+    @staticmethod
+    def viewport(center_x, center_y, scale):
+        """Projected coordinates to screen pixels, applied before the divide so it folds into one matrix."""
+        return np.array([
+            [scale, 0, 0, center_x],
+            [0, scale, 0, center_y],
+            [0, 0, 1, 0],
+            [0, 0, 0, 1]
+        ], dtype=float)
+
+
+def homogeneous(points: np.ndarray) -> np.ndarray:
+    """(N, 3) -> (N, 4) with w = 1."""
+    points = np.asarray(points, dtype=np.float64)
+    out = np.empty(points.shape[:-1] + (4,))
+    out[..., :3] = points
+    out[..., 3] = 1.0
+    return out
+
+
+def transform_points(points: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+    """
+    Apply a 4x4 transform to (..., 4) homogeneous or (..., 3) points (w taken as 1)
+    in one matmul. Returns (..., 4).
+    """
+    points = np.asarray(points, dtype=np.float64)
+    if points.shape[-1] == 3:
+        # skip materializing the ones column
+        return points @ matrix[:, :3].T + matrix[:, 3]
+    return points @ matrix.T
+
+
+def perspective_divide(clip: np.ndarray) -> np.ndarray:
+    """(..., 4) -> (..., 2) x/w, y/w."""
+    return clip[..., :2] / clip[..., 3:4]
+
+
+def project_points(points: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+    """Transform and perspective-divide in one pass, e.g. with compose(viewport, perspective, view, model)."""
+    return perspective_divide(transform_points(points, matrix))
+
+
+def sphere_slice_points(num_slices: int = 25, num_points: int = 100, radius: float = 1.0) -> np.ndarray:
+    """
+    Points on `num_slices` horizontal circles of a sphere, top to bottom, as a
+    (num_slices, num_points, 4) homogeneous array.
+    """
+    heights = 1 - 2 * np.arange(num_slices) / max(num_slices - 1, 1)
+    circle_radii = radius * np.sqrt(np.clip(1 - heights ** 2, 0, None))
+    angles = 2 * np.pi * np.arange(num_points) / num_points
+
+    points = np.empty((num_slices, num_points, 4))
+    points[..., 0] = circle_radii[:, None] * np.cos(angles)
+    points[..., 1] = radius * heights[:, None]
+    points[..., 2] = circle_radii[:, None] * np.sin(angles)
+    points[..., 3] = 1.0
+    return points
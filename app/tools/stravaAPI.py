@@ -1,9 +1,77 @@
+import math
 import os
+import time
+from array import array
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor
+import ijson
+import numpy as np
 from dotenv import load_dotenv
-import requests
 from urllib.parse import urlencode
 from dataclasses import dataclass
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
+from app.tools.api_cache import get_api_cache
+from app.tools.http_client import get_http_client
+
+# API maximum for /athlete/activities
+MAX_PER_PAGE = 200
+
+
+class ActivityFetchError(Exception):
+    """
+    A page of activities could not be fetched. `activities` holds the pages before it,
+    in the order the API returned them, so callers can tell a partial list from a full one.
+    """
+
+    def __init__(self, message: str, page: int, status: Optional[int] = None,
+                 activities: Optional[List[Dict]] = None):
+        super().__init__(message)
+        self.page = page
+        self.status = status
+        self.activities = activities or []
+
+
+def _as_sample(value) -> float:
+    # a null or non-numeric sample becomes NaN, so every stream keeps one value per index
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def decode_streams(fp) -> Dict[str, Dict]:
+    """
+    Incrementally decode a key_by_type streams response from a file-like body.
+    Each stream's values go straight into a growable C double buffer, so no Python
+    list-of-lists is ever built; 'data' comes back as a contiguous NumPy array,
+    (N, 2) for latlng and 1-D for the other streams. Null or non-numeric samples
+    (a null latlng pair included) are stored as NaN. Every stream gets 'data', empty if
+    the response had no samples for it.
+    """
+    streams, buffers = {}, {}
+    for prefix, event, value in ijson.parse(fp, use_float=True):
+        stream_type, _, field = prefix.partition('.')
+        if event == 'start_map' and stream_type and not field:
+            streams.setdefault(stream_type, {})
+        if event not in ('number', 'boolean', 'string', 'null'):
+            continue
+        if field.startswith('data.item'):
+            buffer = buffers.get(stream_type)
+            if buffer is None:
+                buffer = buffers[stream_type] = array('d')
+            if stream_type == 'latlng' and field == 'data.item':
+                # a scalar where a [lat, lng] pair belongs
+                buffer.extend((math.nan, math.nan))
+            else:
+                buffer.append(_as_sample(value))
+        elif field and event != 'null':
+            streams.setdefault(stream_type, {})[field] = value
+
+    for stream_type, stream in streams.items():
+        data = np.frombuffer(buffers.get(stream_type, array('d')), dtype=np.float64)
+        stream['data'] = data.reshape(-1, 2) if stream_type == 'latlng' else data
+    return streams
+
 
 # see strava documentation: https://developers.strava.com/docs/reference/#api-Streams
 class Strava:
@@ -16,6 +84,9 @@ class Strava:
         self.access_token = os.getenv("STRAVA_ACCESS_TOKEN")
         self.athlete_id = os.getenv("STRAVA_ATHLETE_ID")
         self.redirect_uri = 'http://127.0.0.1:8050'
+        # longest get_all_activities waits for an exhausted rate-limit window to reset; it
+        # runs inside a request, so a longer wait raises and the sync resumes later
+        self.max_rate_limit_wait = 5
 
     #initiate authentication
     def get_authorization_url(self):
@@ -37,7 +108,7 @@ class Strava:
             'grant_type': 'authorization_code'
         }
 
-        response = requests.post('https://www.strava.com/oauth/token', data=payload)
+        response = get_http_client().post('https://www.strava.com/oauth/token', data=payload)
 
         if response.ok:
             data = response.json()
@@ -48,18 +119,26 @@ class Strava:
 
     # general user info
     def get_athlete(self, access_token):
-        headers = {'Authorization': f'Bearer {access_token}'}
-        response = requests.get(f'{self.base_url}/athlete', headers=headers)
-        return response.json() if response.ok else None
+        def fetch():
+            headers = {'Authorization': f'Bearer {access_token}'}
+            response = get_http_client().get(f'{self.base_url}/athlete', headers=headers)
+            return response.json() if response.ok else None
+
+        return get_api_cache().get_or_fetch('strava.athlete', fetch, owner=access_token)
 
     # summary stats about user
     def get_athlete_stats(self, access_token, athlete_id):
-        headers = {'Authorization': f'Bearer {access_token}'}
-        response = requests.get(
-            f'{self.base_url}/athletes/{athlete_id}/stats',
-            headers=headers
+        def fetch():
+            headers = {'Authorization': f'Bearer {access_token}'}
+            response = get_http_client().get(
+                f'{self.base_url}/athletes/{athlete_id}/stats',
+                headers=headers
+            )
+            return response.json() if response.ok else None
+
+        return get_api_cache().get_or_fetch(
+            'strava.athlete_stats', fetch, owner=access_token, params={'athlete_id': athlete_id}
         )
-        return response.json() if response.ok else None
 
     def get_activities(self, access_token, **params):
         """
@@ -69,31 +148,139 @@ class Strava:
         - page (int, optional): Page number (default: 1)
         - per_page (int, optional): # of items per page (default: 30) -- max 200
         """
-        response = requests.get(
+        return self._request_activities_page(access_token, **params)[0]
+
+    def _request_activities_page(self, access_token, **params) -> Tuple[Optional[List[Dict]], Dict, int]:
+        response = get_http_client().get(
             f'{self.base_url}/athlete/activities',
             headers={'Authorization': f'Bearer {access_token}'},
             params=params
         )
-        return response.json() if response.ok else None
-
-    def get_all_activities(self, access_token, before=None, after=None):
-        # handle pagination to get all
-        results, page = [], 1
-        while res := self.get_activities(access_token, before=before, after=after, page=page, per_page=100):
-            if not res: break
-            results.extend(res)
-            if len(res) < 100: break
-            page += 1
-        return results
-
-    def get_activity_streams(self, access_token: str, activity_id: int, stream_types: List[str]) -> Optional[Dict]:
+        return (response.json() if response.ok else None), response.headers, response.status_code
+
+    @staticmethod
+    def rate_limit_headroom(headers) -> Optional[int]:
+        """
+        Requests left in the tightest rate-limit window, from the
+        X-RateLimit-Limit / X-RateLimit-Usage headers ("15min,daily").
+        """
+        try:
+            limits = [int(v) for v in headers['X-RateLimit-Limit'].split(',')]
+            usage = [int(v) for v in headers['X-RateLimit-Usage'].split(',')]
+        except (KeyError, ValueError, AttributeError):
+            return None
+        return min(limit - used for limit, used in zip(limits, usage))
+
+    @staticmethod
+    def rate_limit_reset_wait(headers, now: Optional[float] = None) -> Optional[float]:
+        """
+        Seconds until every exhausted rate-limit window resets, or None if none is
+        exhausted. Strava's short window resets on the quarter hour, the daily one at
+        midnight UTC.
+        """
+        try:
+            limits = [int(v) for v in headers['X-RateLimit-Limit'].split(',')]
+            usage = [int(v) for v in headers['X-RateLimit-Usage'].split(',')]
+        except (KeyError, ValueError, AttributeError):
+            return None
+        now = datetime.fromtimestamp(time.time() if now is None else now, timezone.utc)
+        resets = []
+        for window, (limit, used) in enumerate(zip(limits, usage)):
+            if used < limit:
+                continue
+            if window == 0:
+                quarter = now.replace(minute=now.minute - now.minute % 15, second=0, microsecond=0)
+                resets.append(quarter + timedelta(minutes=15))
+            else:
+                resets.append(now.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1))
+        return max(resets).timestamp() - now.timestamp() if resets else None
+
+    def get_all_activities(self, access_token, before=None, after=None, concurrency=4):
+        """
+        Fetch every activity. Page 1 is probed first; later pages are fetched
+        `concurrency` at a time (capped by the rate-limit headroom) until the
+        first short page. When the rate limit is used up it waits for the window
+        to reset if that is at most max_rate_limit_wait seconds away, then goes on one
+        page at a time; otherwise it raises.
+        Raises ActivityFetchError if any page fails, so a partial list is never
+        returned or cached.
+        """
+        params = {'before': before, 'after': after, 'per_page': MAX_PER_PAGE}
+
+        def checked(page, response, results):
+            res, headers, status = response
+            if res is None:
+                raise ActivityFetchError(
+                    f"Strava activities page {page} failed with status {status}",
+                    page=page, status=status, activities=results
+                )
+            return res, headers
+
+        def fetch():
+            results = []
+            first, headers = checked(1, self._request_activities_page(access_token, page=1, **params), results)
+            results.extend(first)
+            if len(first) < MAX_PER_PAGE:
+                return results
+
+            page = 2
+            with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+                while True:
+                    wait = self.rate_limit_reset_wait(headers)
+                    if wait is not None:
+                        if wait > self.max_rate_limit_wait:
+                            raise ActivityFetchError(
+                                f"Strava rate limit exhausted for {wait:.0f}s before page {page}",
+                                page=page, status=429, activities=results
+                            )
+                        time.sleep(wait)
+                        # the new window's usage is unknown until the next response
+                        workers = 1
+                    else:
+                        headroom = self.rate_limit_headroom(headers)
+                        workers = max(1, min(concurrency, headroom if headroom is not None else concurrency))
+
+                    pages = range(page, page + workers)
+                    futures = [pool.submit(self._request_activities_page, access_token, page=p, **params)
+                               for p in pages]
+                    # pages are consumed in order; anything after the first short page is dropped
+                    for p, future in zip(pages, futures):
+                        res, headers = checked(p, future.result(), results)
+                        results.extend(res)
+                        if len(res) < MAX_PER_PAGE:
+                            return results
+                    page += workers
+
+        return get_api_cache().get_or_fetch(
+            'strava.all_activities', fetch, owner=access_token, params={'before': before, 'after': after}
+        )
+
+    def get_activity_streams(self, access_token: str, activity_id: int, stream_types: List[str],
+                             resolution: Optional[str] = None, series_type: Optional[str] = None) -> Optional[Dict]:
+        """
+        Params:
+        - resolution (optional): 'low' (~100 points), 'medium' (~1000) or 'high' (~10000); full data when omitted
+        - series_type (optional): 'distance' or 'time', the series used to downsample
+        Returns {stream_type: {'data': np.ndarray, 'series_type': ..., 'original_size': ..., ...}}
+        """
         headers = {'Authorization': f'Bearer {access_token}'}
-        response = requests.get(
-            f'https://www.strava.com/api/v3/activities/{activity_id}/streams',
+        params = {'keys': ','.join(stream_types), 'key_by_type': True}
+        if resolution:
+            params['resolution'] = resolution
+        if series_type:
+            params['series_type'] = series_type
+
+        response = get_http_client().get(
+            f'{self.base_url}/activities/{activity_id}/streams',
             headers=headers,
-            params={'keys': ','.join(stream_types), 'key_by_type': True}
+            params=params,
+            stream=True
         )
-        return response.json() if response.status_code == 200 else None
+        with response:
+            if response.status_code != 200:
+                return None
+            response.raw.decode_content = True
+            return decode_streams(response.raw)
 
     def get_latest_activity_map(self, access_token: str) -> Optional[Dict]:
         activities = self.get_activities(access_token, per_page=1)
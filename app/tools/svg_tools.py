@@ -1,9 +1,12 @@
 from dataclasses import dataclass
-from typing import List, Optional, Tuple, Union
+from typing import IO, Dict, Iterator, List, Optional, Sequence, Tuple, Union
 from pathlib import Path
+import io
 import math
 from abc import ABC, abstractmethod
 
+import numpy as np
+
 
 class SVGError(Exception):
     """Base exception class for SVG-related errors"""
@@ -15,7 +18,8 @@ class ValidationError(SVGError):
     pass
 
 
-@dataclass
+# frozen so styles can be shared and interned
+@dataclass(frozen=True)
 class Style:
     fill: str = "none"
     stroke: str = "black"
@@ -65,17 +69,65 @@ class Style:
     def to_svg_attrs(self) -> str:
         return f'fill="{self.fill}" stroke="{self.stroke}" stroke-width="{self.stroke_width}" opacity="{self.opacity}"'
 
+    def to_css(self, selector: str) -> str:
+        return f'{selector}{{fill:{self.fill};stroke:{self.stroke};stroke-width:{self.stroke_width};opacity:{self.opacity}}}'
+
+
+def format_number(value: float, precision: Optional[int] = None) -> str:
+    """Single-value counterpart of format_numbers; None keeps Python's repr."""
+    if precision is None:
+        return f"{value}"
+    text = f"{value:.{precision}f}"
+    if "." in text:
+        text = text.rstrip("0").rstrip(".")
+    return "0" if text == "-0" else text
+
+
+class StyleTable:
+    """
+    Interned styles: each distinct (fill, stroke, stroke_width, opacity) is validated and
+    stored once, and shapes refer to it by index.
+    """
+
+    def __init__(self):
+        self.styles: List[Style] = []
+        self._index: Dict[Tuple, int] = {}
+
+    def intern(self, fill: str = "none", stroke: str = "black", stroke_width: float = 1,
+               opacity: float = 1) -> int:
+        key = (fill, stroke, stroke_width, opacity)
+        style_id = self._index.get(key)
+        if style_id is None:
+            style = Style(*key)
+            style_id = self._index[key] = len(self.styles)
+            self.styles.append(style)
+        return style_id
+
+    def intern_style(self, style: Style) -> int:
+        return self.intern(style.fill, style.stroke, style.stroke_width, style.opacity)
+
+    def __getitem__(self, style_id: int) -> Style:
+        return self.styles[style_id]
+
+    def __len__(self) -> int:
+        return len(self.styles)
+
 
 class Shape(ABC):
+    __slots__ = ('style',)
+
     def __init__(self, style: Style):
         self.style = style
 
     @abstractmethod
-    def to_svg(self) -> str:
+    def to_svg(self, attrs: Optional[str] = None, precision: Optional[int] = None) -> str:
+        """attrs replaces the inline style attributes, e.g. with a class reference"""
         pass
 
 
 class Ellipse(Shape):
+    __slots__ = ('x', 'y', 'width', 'height', 'rotation')
+
     def __init__(self, x: float, y: float, width: float, height: float, rotation: float = 0, style: Style = None):
         super().__init__(style)
         self.x = x
@@ -89,17 +141,24 @@ class Ellipse(Shape):
         if self.width <= 0 or self.height <= 0:
             raise ValidationError("Ellipse dimensions must be positive")
 
-    def to_svg(self) -> str:
-        transform = f' transform="rotate({self.rotation} {self.x} {self.y})"' if self.rotation != 0 else ''
-        return f'<ellipse cx="{self.x}" cy="{self.y}" rx="{self.width / 2}" ry="{self.height / 2}" {self.style.to_svg_attrs()}{transform}/>'
+    def to_svg(self, attrs: Optional[str] = None, precision: Optional[int] = None) -> str:
+        x, y, rx, ry, rotation = (format_number(v, precision) for v in
+                                  (self.x, self.y, self.width / 2, self.height / 2, self.rotation))
+        transform = f' transform="rotate({rotation} {x} {y})"' if self.rotation != 0 else ''
+        attrs = self.style.to_svg_attrs() if attrs is None else attrs
+        return f'<ellipse cx="{x}" cy="{y}" rx="{rx}" ry="{ry}" {attrs}{transform}/>'
 
 
 class Circle(Ellipse):
+    __slots__ = ()
+
     def __init__(self, x: float, y: float, diameter: float, style: Style = None):
         super().__init__(x, y, diameter, diameter, 0, style)
 
 
 class Rectangle(Shape):
+    __slots__ = ('x', 'y', 'width', 'height')
+
     def __init__(self, x: float, y: float, width: float, height: float, style: Style = None):
         super().__init__(style)
         self.x = x
@@ -112,19 +171,374 @@ class Rectangle(Shape):
         if self.width <= 0 or self.height <= 0:
             raise ValidationError("Rectangle dimensions must be positive")
 
-    def to_svg(self) -> str:
-        return f'<rect x="{self.x}" y="{self.y}" width="{self.width}" height="{self.height}" {self.style.to_svg_attrs()}/>'
+    def to_svg(self, attrs: Optional[str] = None, precision: Optional[int] = None) -> str:
+        x, y, width, height = (format_number(v, precision) for v in (self.x, self.y, self.width, self.height))
+        attrs = self.style.to_svg_attrs() if attrs is None else attrs
+        return f'<rect x="{x}" y="{y}" width="{width}" height="{height}" {attrs}/>'
+
+
+def format_numbers(values, precision: int = 2) -> np.ndarray:
+    """
+    Format floats to `precision` decimals without a Python loop. Returns an (N, W)
+    uint8 array of ASCII characters, one number per row, padded with zero bytes.
+    Trailing fractional zeros and the point are dropped, as in "12.5" and "3".
+    """
+    values = np.asarray(values, dtype=np.float64).ravel()
+    if not np.isfinite(values).all():
+        raise ValidationError("Coordinates must be finite")
+    scale = 10 ** precision
+    scaled = np.rint(values * scale).astype(np.int64)
+    magnitude = np.abs(scaled)
+    int_part, frac_part = np.divmod(magnitude, scale)
+    int_width = len(str(int(int_part.max()))) if len(values) else 1
+
+    columns = [np.where(scaled < 0, ord('-'), 0)]
+    for k in range(int_width - 1, -1, -1):
+        digit = (int_part // 10 ** k) % 10 + ord('0')
+        # no leading zeros, but always one integer digit
+        columns.append(np.where(int_part >= 10 ** k, digit, 0) if k else digit)
+    if precision > 0:
+        columns.append(np.where(frac_part != 0, ord('.'), 0))
+        for j in range(1, precision + 1):
+            digit = (frac_part // 10 ** (precision - j)) % 10 + ord('0')
+            # keep this digit only if it or a later one is non-zero
+            columns.append(np.where(frac_part % 10 ** (precision - j + 1) != 0, digit, 0))
+    return np.column_stack(columns).astype(np.uint8)
+
+
+def _char_column(n: int, char: str) -> np.ndarray:
+    return np.full((n, 1), ord(char), dtype=np.uint8)
+
+
+def format_points(points, precision: int = 2, prefix: str = '', separator: str = ',',
+                  suffix: str = ' ') -> np.ndarray:
+    """(N, 2) points to an (N, W) zero-padded character matrix of prefix + x + separator + y + suffix."""
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    n = len(points)
+    parts = [_char_column(n, c) for c in prefix]
+    parts += [format_numbers(points[:, 0], precision), *(_char_column(n, c) for c in separator),
+              format_numbers(points[:, 1], precision), *(_char_column(n, c) for c in suffix)]
+    return np.hstack(parts)
+
+
+def join_rows(chars: np.ndarray, offsets: Sequence[int]) -> List[str]:
+    """Drop the padding from a character matrix and join rows offsets[i]:offsets[i+1] into one string each."""
+    present = chars != 0
+    text = chars[present].tobytes().decode('ascii')
+    ends = np.concatenate([[0], np.cumsum(present.sum(axis=1))])[np.asarray(offsets)]
+    return [text[start:end] for start, end in zip(ends[:-1], ends[1:])]
+
+
+def _literal(n: int, text: str) -> np.ndarray:
+    return np.broadcast_to(np.frombuffer(text.encode('ascii'), dtype=np.uint8), (n, len(text)))
+
+
+def _text_table(texts: Sequence[str]) -> np.ndarray:
+    """Strings as rows of a zero-padded character matrix, for indexing by id."""
+    width = max((len(t) for t in texts), default=0)
+    table = np.zeros((len(texts), width), dtype=np.uint8)
+    for i, text in enumerate(texts):
+        table[i, :len(text)] = np.frombuffer(text.encode('ascii'), dtype=np.uint8)
+    return table
+
+
+class ShapeBuffer:
+    """
+    Struct-of-arrays storage for one run of ellipses or rectangles: a float64 column
+    per field plus an int32 style id, grown by doubling. Formatted to SVG in bulk.
+    """
+    FIELDS = {
+        'ellipse': ('x', 'y', 'rx', 'ry', 'rotation'),
+        'rect': ('x', 'y', 'width', 'height'),
+    }
+
+    # rows appended one at a time are collected in lists and copied into the arrays in blocks
+    FLUSH_ROWS = 4096
+
+    def __init__(self, kind: str, capacity: int = 1024):
+        if kind not in self.FIELDS:
+            raise ValidationError(f"Unknown shape kind: {kind}")
+        self.kind = kind
+        self.fields = self.FIELDS[kind]
+        self.columns = np.empty((len(self.fields), capacity))
+        self.style_ids = np.empty(capacity, dtype=np.int32)
+        self.size = 0
+        self._pending: List[Tuple[float, ...]] = []
+        self._pending_styles: List[int] = []
+
+    def __len__(self) -> int:
+        return self.size + len(self._pending)
+
+    def _reserve(self, extra: int):
+        needed = self.size + extra
+        capacity = self.style_ids.shape[0]
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        columns = np.empty((len(self.fields), capacity))
+        columns[:, :self.size] = self.columns[:, :self.size]
+        style_ids = np.empty(capacity, dtype=np.int32)
+        style_ids[:self.size] = self.style_ids[:self.size]
+        self.columns, self.style_ids = columns, style_ids
+
+    def _flush(self):
+        if not self._pending:
+            return
+        pending, pending_styles = self._pending, self._pending_styles
+        self._pending, self._pending_styles = [], []
+        self._store(np.array(pending, dtype=np.float64).T, np.array(pending_styles, dtype=np.int32))
+
+    def _store(self, values: np.ndarray, style_ids):
+        count = values.shape[1]
+        self._reserve(count)
+        self.columns[:, self.size:self.size + count] = values
+        self.style_ids[self.size:self.size + count] = style_ids
+        self.size += count
+
+    def append(self, values: Tuple[float, ...], style_id: int):
+        self._pending.append(values)
+        self._pending_styles.append(style_id)
+        if len(self._pending) >= self.FLUSH_ROWS:
+            self._flush()
+
+    def extend(self, values: np.ndarray, style_ids):
+        """values: (len(fields), N) or (N, len(fields)); style_ids: one id or N ids"""
+        values = np.asarray(values, dtype=np.float64)
+        if values.shape[0] != len(self.fields):
+            values = values.T
+        self._flush()
+        self._store(values, style_ids)
+
+    def column(self, name: str) -> np.ndarray:
+        self._flush()
+        return self.columns[self.fields.index(name), :self.size]
+
+    def value(self, index: int, name: str) -> float:
+        self._flush()
+        return float(self.columns[self.fields.index(name), index])
+
+    def set_value(self, index: int, name: str, value: float):
+        self._flush()
+        self.columns[self.fields.index(name), index] = value
+
+    def style_id(self, index: int) -> int:
+        self._flush()
+        return int(self.style_ids[index])
+
+    def set_style_id(self, index: int, style_id: int):
+        self._flush()
+        self.style_ids[index] = style_id
+
+    def nbytes(self) -> int:
+        self._flush()
+        return self.columns[:, :self.size].nbytes + self.style_ids[:self.size].nbytes
+
+    def used_styles(self) -> np.ndarray:
+        self._flush()
+        return np.unique(self.style_ids[:self.size])
+
+    def _format(self, start: int, stop: int, style_attrs: Sequence[str], precision: int) -> str:
+        n = stop - start
+        values = {name: self.columns[i, start:stop] for i, name in enumerate(self.fields)}
+        number = {name: format_numbers(column, precision) for name, column in values.items()}
+        style_attrs = _text_table(style_attrs)[self.style_ids[start:stop]]
+
+        if self.kind == 'ellipse':
+            transform = np.hstack([
+                _literal(n, ' transform="rotate('), number['rotation'], _literal(n, ' '),
+                number['x'], _literal(n, ' '), number['y'], _literal(n, ')"')
+            ])
+            # rows without rotation get no transform attribute
+            transform = transform * (values['rotation'] != 0)[:, None].astype(np.uint8)
+            parts = [
+                _literal(n, '<ellipse cx="'), number['x'], _literal(n, '" cy="'), number['y'],
+                _literal(n, '" rx="'), number['rx'], _literal(n, '" ry="'), number['ry'],
+                _literal(n, '" '), style_attrs, transform
+            ]
+        else:
+            parts = [
+                _literal(n, '<rect x="'), number['x'], _literal(n, '" y="'), number['y'],
+                _literal(n, '" width="'), number['width'], _literal(n, '" height="'), number['height'],
+                _literal(n, '" '), style_attrs
+            ]
+        chars = np.hstack(parts + [_literal(n, '/>\n    ')])
+        return join_rows(chars, [0, n])[0][:-len('\n    ')]
+
+    def iter_svg(self, style_attrs: Sequence[str], precision: int = 2, max_rows: int = 16384) -> Iterator[str]:
+        """style_attrs: the attribute text for each style id, inline attributes or a class"""
+        self._flush()
+        for start in range(0, self.size, max_rows):
+            yield self._format(start, min(start + max_rows, self.size), style_attrs, precision)
+
+    def shape(self, index: int, styles: StyleTable) -> Shape:
+        """A standalone Ellipse/Rectangle copy of one stored shape."""
+        self._flush()
+        values = dict(zip(self.fields, self.columns[:, index].tolist()))
+        style = styles[int(self.style_ids[index])]
+        if self.kind == 'ellipse':
+            return Ellipse(values['x'], values['y'], 2 * values['rx'], 2 * values['ry'], values['rotation'], style)
+        return Rectangle(values['x'], values['y'], values['width'], values['height'], style)
+
+
+class ShapeRef:
+    """
+    Handle on one row of a ShapeBuffer, as returned by Canvas.circle/ellipse/rect.
+    Reads the same attributes as Ellipse/Rectangle and writes go straight to the buffer,
+    so the shape itself stays in the struct-of-arrays storage.
+    """
+    __slots__ = ('buffer', 'index', 'styles')
+
+    # attribute -> (buffer field, attribute value per field unit)
+    ATTRIBUTES = {
+        'ellipse': {'x': ('x', 1), 'y': ('y', 1), 'width': ('rx', 2), 'height': ('ry', 2),
+                    'rotation': ('rotation', 1)},
+        'rect': {'x': ('x', 1), 'y': ('y', 1), 'width': ('width', 1), 'height': ('height', 1)},
+    }
+
+    def __init__(self, buffer: ShapeBuffer, index: int, styles: StyleTable):
+        self.buffer = buffer
+        self.index = index
+        self.styles = styles
+
+    def _attribute(self, name: str) -> Tuple[str, float]:
+        try:
+            return self.ATTRIBUTES[self.buffer.kind][name]
+        except KeyError:
+            raise AttributeError(f"{self.buffer.kind} has no attribute {name!r}") from None
+
+    def __getattr__(self, name: str):
+        if name in self.__slots__ or name.startswith('_'):
+            # not set yet, e.g. while copy/pickle probe a bare instance
+            raise AttributeError(name)
+        field, scale = self._attribute(name)
+        return scale * self.buffer.value(self.index, field)
+
+    def __setattr__(self, name: str, value):
+        if name in self.__slots__:
+            object.__setattr__(self, name, value)
+            return
+        if name == 'style':
+            self.buffer.set_style_id(self.index, self.styles.intern_style(value))
+            return
+        field, scale = self._attribute(name)
+        if name in ('width', 'height') and value <= 0:
+            raise ValidationError("Shape dimensions must be positive")
+        self.buffer.set_value(self.index, field, value / scale)
+
+    @property
+    def style(self) -> Style:
+        return self.styles[self.buffer.style_id(self.index)]
+
+    def shape(self) -> Shape:
+        """A standalone Ellipse/Rectangle copy, e.g. to add to another canvas."""
+        return self.buffer.shape(self.index, self.styles)
+
+    def to_svg(self, attrs: Optional[str] = None, precision: Optional[int] = None) -> str:
+        return self.shape().to_svg(attrs, precision)
+
+
+class ShapeBatch(Shape):
+    """
+    Many paths, polylines or points sharing one style, kept as a coordinate array plus
+    offsets and only formatted to SVG text when written.
+    """
+    TAGS = ('path', 'polyline', 'points')
+
+    def __init__(self, kind: str, coords: np.ndarray, offsets: np.ndarray, style: Style,
+                 close: bool = False, precision: int = 2):
+        super().__init__(style)
+        if kind not in self.TAGS:
+            raise ValidationError(f"Unknown batch kind: {kind}")
+        self.kind = kind
+        self.coords = coords
+        self.offsets = offsets
+        self.close = close
+        self.precision = precision
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def _format(self, start: int, stop: int, attrs: str, precision: int) -> List[str]:
+        first, last = self.offsets[start], self.offsets[stop]
+        coords = self.coords[first:last]
+        offsets = self.offsets[start:stop + 1] - first
+
+        if self.kind == 'points':
+            # zero-length segments with round caps draw one dot of stroke-width per point
+            rows = join_rows(format_points(coords, precision, prefix='M', suffix='h0'), offsets)
+            return [f'<path d="{row}" {attrs} stroke-linecap="round"/>' for row in rows]
+
+        rows = join_rows(format_points(coords, precision), offsets)
+        if self.kind == 'polyline':
+            return [f'<polyline points="{row[:-1]}" {attrs}/>' for row in rows]
+        close = 'Z' if self.close else ''
+        return [f'<path d="M{row[:-1]}{close}" {attrs}/>' for row in rows]
+
+    def iter_svg(self, attrs: Optional[str] = None, precision: Optional[int] = None,
+                 max_points: int = 65536) -> Iterator[str]:
+        """Yield the batch's elements in groups of about `max_points` coordinates."""
+        attrs = self.style.to_svg_attrs() if attrs is None else attrs
+        precision = self.precision if precision is None else precision
+        start = 0
+        while start < len(self):
+            limit = self.offsets[start] + max_points
+            stop = max(start + 1, int(np.searchsorted(self.offsets, limit, side='right')) - 1)
+            stop = min(stop, len(self))
+            yield "\n    ".join(self._format(start, stop, attrs, precision))
+            start = stop
+
+    def to_svg(self, attrs: Optional[str] = None, precision: Optional[int] = None) -> str:
+        return "\n    ".join(self.iter_svg(attrs, precision))
+
+
+def _as_batch(points) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    One (N, 2) array, an (S, N, 2) array or a list of (N_i, 2) arrays
+    -> concatenated (M, 2) coordinates and S + 1 offsets.
+    """
+    if isinstance(points, np.ndarray) and points.ndim == 3:
+        count, length = points.shape[:2]
+        return points.reshape(-1, 2).astype(np.float64, copy=False), np.arange(count + 1) * length
+    if isinstance(points, np.ndarray) or (len(points) and np.ndim(points[0]) == 1):
+        points = [points]
+    arrays = [np.asarray(p, dtype=np.float64).reshape(-1, 2) for p in points]
+    lengths = [len(a) for a in arrays]
+    offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+    coords = np.concatenate(arrays) if arrays else np.empty((0, 2))
+    return coords, offsets
 
 
 class Canvas:
-    def __init__(self, width: int, height: int):
+    STYLE_MODES = ('class', 'inline')
+
+    def __init__(self, width: int, height: int, precision: int = 2, style_mode: str = 'class'):
+        """
+        precision: decimals written for every coordinate and size
+        style_mode: 'class' writes each distinct style once in a <style> block and refers
+        to it by class; 'inline' repeats the style attributes on every element
+        """
         self._validate_dimensions(width, height)
+        if style_mode not in self.STYLE_MODES:
+            raise ValidationError(f"style_mode must be one of {self.STYLE_MODES}")
         self.width = width
         self.height = height
-        self.elements: List[Shape] = []
-        self.style = Style()
+        self.precision = precision
+        self.style_mode = style_mode
+        # Shape objects, ShapeBatch paths and ShapeBuffer runs of ellipses/rects, in drawing order
+        self.elements: List[Union[Shape, ShapeBuffer]] = []
+        self.styles = StyleTable()
+        self._style_id = self.styles.intern()
         self.current_shape: List[Tuple[float, float]] = []
 
+    @property
+    def style(self) -> Style:
+        return self.styles[self._style_id]
+
+    @style.setter
+    def style(self, style: Style):
+        self._style_id = self.styles.intern_style(style)
+
     @staticmethod
     def _validate_dimensions(width: int, height: int):
         if width <= 0 or height <= 0:
@@ -134,43 +548,82 @@ class Canvas:
 
     def background(self, color: str):
         try:
-            style = Style(fill=color, stroke="none")
+            style = self.styles[self.styles.intern(fill=color, stroke="none")]
             rect = Rectangle(0, 0, self.width, self.height, style)
             self.elements.insert(0, rect)
         except ValidationError as e:
             raise ValidationError(f"Invalid background color: {str(e)}")
 
     def fill(self, color: str):
+        style = self.style
         try:
-            self.style = Style(
-                fill=color,
-                stroke=self.style.stroke,
-                stroke_width=self.style.stroke_width,
-                opacity=self.style.opacity
-            )
+            self._style_id = self.styles.intern(color, style.stroke, style.stroke_width, style.opacity)
         except ValidationError as e:
             raise ValidationError(f"Invalid fill color: {str(e)}")
 
     def stroke(self, color: str):
+        style = self.style
         try:
-            self.style = Style(
-                fill=self.style.fill,
-                stroke=color,
-                stroke_width=self.style.stroke_width,
-                opacity=self.style.opacity
-            )
+            self._style_id = self.styles.intern(style.fill, color, style.stroke_width, style.opacity)
         except ValidationError as e:
             raise ValidationError(f"Invalid stroke color: {str(e)}")
 
-    def circle(self, x: float, y: float, diameter: float) -> Circle:
-        circle = Circle(x, y, diameter, self.style)
-        self.elements.append(circle)
-        return circle
+    def add(self, shape: Shape) -> Shape:
+        """Append a shape object as is, e.g. one the caller keeps a reference to."""
+        self.elements.append(shape)
+        return shape
+
+    def _buffer(self, kind: str) -> ShapeBuffer:
+        # consecutive shapes of one kind share a buffer; a new run keeps the drawing order
+        last = self.elements[-1] if self.elements else None
+        if not (isinstance(last, ShapeBuffer) and last.kind == kind):
+            last = ShapeBuffer(kind)
+            self.elements.append(last)
+        return last
+
+    def _append(self, kind: str, values: Tuple[float, ...]) -> ShapeRef:
+        buffer = self._buffer(kind)
+        index = len(buffer)
+        buffer.append(values, self._style_id)
+        return ShapeRef(buffer, index, self.styles)
+
+    def circle(self, x: float, y: float, diameter: float) -> ShapeRef:
+        return self.ellipse(x, y, diameter, diameter)
+
+    def ellipse(self, x: float, y: float, width: float, height: float, rotation: float = 0) -> ShapeRef:
+        if width <= 0 or height <= 0:
+            raise ValidationError("Ellipse dimensions must be positive")
+        return self._append('ellipse', (x, y, width / 2, height / 2, rotation))
 
-    def ellipse(self, x: float, y: float, width: float, height: float, rotation: float = 0) -> Ellipse:
-        ellipse = Ellipse(x, y, width, height, rotation, self.style)
-        self.elements.append(ellipse)
-        return ellipse
+    def rect(self, x: float, y: float, width: float, height: float) -> ShapeRef:
+        if width <= 0 or height <= 0:
+            raise ValidationError("Rectangle dimensions must be positive")
+        return self._append('rect', (x, y, width, height))
+
+    def circles(self, centers, diameters) -> ShapeBuffer:
+        """Circles at each row of an (N, 2) array; diameters is one value or N values"""
+        return self.ellipses(centers, diameters, diameters)
+
+    def ellipses(self, centers, widths, heights, rotations=0) -> ShapeBuffer:
+        centers = np.asarray(centers, dtype=np.float64).reshape(-1, 2)
+        n = len(centers)
+        widths, heights, rotations = (np.broadcast_to(np.asarray(v, dtype=np.float64), (n,))
+                                      for v in (widths, heights, rotations))
+        if n and (widths.min() <= 0 or heights.min() <= 0):
+            raise ValidationError("Ellipse dimensions must be positive")
+        buffer = self._buffer('ellipse')
+        buffer.extend(np.stack([centers[:, 0], centers[:, 1], widths / 2, heights / 2, rotations]), self._style_id)
+        return buffer
+
+    def rects(self, corners, widths, heights) -> ShapeBuffer:
+        corners = np.asarray(corners, dtype=np.float64).reshape(-1, 2)
+        n = len(corners)
+        widths, heights = (np.broadcast_to(np.asarray(v, dtype=np.float64), (n,)) for v in (widths, heights))
+        if n and (widths.min() <= 0 or heights.min() <= 0):
+            raise ValidationError("Rectangle dimensions must be positive")
+        buffer = self._buffer('rect')
+        buffer.extend(np.stack([corners[:, 0], corners[:, 1], widths, heights]), self._style_id)
+        return buffer
 
     def begin_shape(self):
         if self.current_shape:
@@ -188,37 +641,112 @@ class Canvas:
         if len(self.current_shape) < 2:
             raise SVGError("Shape must have at least 2 vertices")
 
-        points = " ".join(f"{x},{y}" for x, y in self.current_shape)
-        close_path = "Z" if close else ""
-        path = f'<path d="M {points} {close_path}" {self.style.to_svg_attrs()}/>'
-        self.elements.append(path)
+        self.path(self.current_shape, close=close)
         self.current_shape = []
 
-    def save(self, filename: Union[str, Path]):
+    def _add_batch(self, kind: str, points, close: bool = False, min_points: int = 1) -> ShapeBatch:
+        coords, offsets = _as_batch(points)
+        if len(offsets) > 1 and np.diff(offsets).min() < min_points:
+            raise SVGError(f"Each {kind} must have at least {min_points} vertices")
+        batch = ShapeBatch(kind, coords, offsets, self.style, close=close, precision=self.precision)
+        self.elements.append(batch)
+        return batch
+
+    def path(self, points, close: bool = False) -> ShapeBatch:
+        """One path through an (N, 2) array of vertices"""
+        return self._add_batch('path', [points], close, min_points=2)
+
+    def paths(self, points, close: bool = False) -> ShapeBatch:
+        """One path per (N, 2) array in a list, or per row of an (S, N, 2) array"""
+        return self._add_batch('path', points, close, min_points=2)
+
+    def polyline(self, points) -> ShapeBatch:
+        return self._add_batch('polyline', [points], min_points=2)
+
+    def polylines(self, points) -> ShapeBatch:
+        return self._add_batch('polyline', points, min_points=2)
+
+    def points(self, points) -> ShapeBatch:
+        """A dot of the current stroke color and width at each row of an (N, 2) array, as one element"""
+        return self._add_batch('points', [points])
+
+    def save(self, target: Union[str, Path, IO], chunk_size: int = 1 << 16):
+        """
+        Stream the document to a .svg path or a writable text or binary file object,
+        writing in chunks of about `chunk_size` characters.
+        """
         try:
-            filepath = Path(filename)
+            if hasattr(target, 'write'):
+                self._write(target, chunk_size)
+                return
+
+            filepath = Path(target)
             if filepath.suffix.lower() != '.svg':
                 raise ValidationError("Filename must have .svg extension")
 
-            svg_content = self._generate_svg()
-
             filepath.parent.mkdir(parents=True, exist_ok=True)
-            filepath.write_text(svg_content, encoding='utf-8')
+            with open(filepath, 'w', encoding='utf-8') as f:
+                self._write(f, chunk_size)
 
         except (OSError, ValidationError) as e:
             raise SVGError(f"Failed to save SVG: {str(e)}")
 
+    def _write(self, fp: IO, chunk_size: int):
+        binary = not isinstance(fp, io.TextIOBase)
+        buffer, size = [], 0
+        for piece in self.iter_svg():
+            buffer.append(piece)
+            size += len(piece)
+            if size >= chunk_size:
+                chunk = ''.join(buffer)
+                fp.write(chunk.encode('utf-8') if binary else chunk)
+                buffer, size = [], 0
+        chunk = ''.join(buffer)
+        fp.write(chunk.encode('utf-8') if binary else chunk)
+
+    @staticmethod
+    def class_name(style_id: int) -> str:
+        return f"s{style_id}"
+
+    def iter_svg(self) -> Iterator[str]:
+        # shape objects and path batches carry Style objects; give them table ids first
+        element_styles = {
+            id(element): self.styles.intern_style(element.style)
+            for element in self.elements if isinstance(element, Shape)
+        }
+        if self.style_mode == 'inline':
+            style_attrs = [style.to_svg_attrs() for style in self.styles.styles]
+        else:
+            style_attrs = [f'class="{self.class_name(i)}"' for i in range(len(self.styles))]
+
+        yield f'''<?xml version="1.0" encoding="UTF-8"?>
+<svg width="{self.width}" height="{self.height}" xmlns="http://www.w3.org/2000/svg">'''
+        if self.style_mode == 'class':
+            used = set(element_styles.values())
+            for element in self.elements:
+                if isinstance(element, ShapeBuffer):
+                    used.update(element.used_styles().tolist())
+            if used:
+                rules = "\n        ".join(
+                    self.styles[i].to_css(f".{self.class_name(i)}") for i in sorted(used)
+                )
+                yield f"\n    <style>\n        {rules}\n    </style>"
+
+        for element in self.elements:
+            if isinstance(element, ShapeBuffer):
+                for chunk in element.iter_svg(style_attrs, self.precision):
+                    yield "\n    " + chunk
+            elif isinstance(element, ShapeBatch):
+                for chunk in element.iter_svg(style_attrs[element_styles[id(element)]], self.precision):
+                    yield "\n    " + chunk
+            elif isinstance(element, Shape):
+                yield "\n    " + element.to_svg(style_attrs[element_styles[id(element)]], self.precision)
+            else:
+                yield "\n    " + str(element)
+        yield "\n</svg>"
+
     def _generate_svg(self) -> str:
-        elements_svg = "\n    ".join(
-            element.to_svg() if isinstance(element, Shape)
-            else str(element)
-            for element in self.elements
-        )
-
-        return f'''<?xml version="1.0" encoding="UTF-8"?>
-<svg width="{self.width}" height="{self.height}" xmlns="http://www.w3.org/2000/svg">
-    {elements_svg}
-</svg>'''
+        return "".join(self.iter_svg())
 
 
 # Constants
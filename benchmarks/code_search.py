@@ -0,0 +1,118 @@
+"""
+Context selection for SoftwareEngineer.create_new_feature:
+- relevance: requests about this repo's own app/ code, each expected to rank a known file
+  in its top results, and the prompt size under a token budget vs the whole snapshot
+- scale: cold chunk/index build, warm refresh, reload in a new process, refresh after
+  edits and query time on copies of app/ grown to --files files, with the prompt held
+  under budget
+
+Usage: python -m benchmarks.code_search [--files 4000] [--budget 8000]
+"""
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from app.tools.code_search import CodeSearch, estimate_tokens
+from app.tools.codebase_index import CodebaseIndex
+from benchmarks.codebase_index import backdate
+
+APP_ROOT = Path(__file__).resolve().parent.parent / 'app'
+
+# request -> a file its top results should include
+QUERIES = {
+    'fetch every strava activity page and store them': 'tools/stravaAPI.py',
+    'draw circles on the svg canvas with style classes': 'tools/svg_tools.py',
+    'show the spotify top tracks in a grid': 'components/TopTracksGrid.py',
+    'gzip and brotli compression for responses': 'tools/compression.py',
+    'navbar colors and hover animation': 'assets/headerStyle.css',
+    'cache github blobs by sha and send etag headers': 'tools/githubAPI.py',
+    'rotate the sphere with a perspective projection matrix': 'tools/projection.py',
+    'retry http requests with backoff on 429': 'tools/http_client.py',
+}
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, round(1000 * (time.perf_counter() - start), 1)
+
+
+def relevance(db, budget, top):
+    search = CodeSearch(CodebaseIndex(APP_ROOT, path=db))
+    _, build_ms = timed(search.refresh)
+    full_tokens = estimate_tokens(search.index.text())
+    print(json.dumps({'repo': 'app', **search.stats(), 'build_ms': build_ms, 'full_prompt_tokens': full_tokens}))
+
+    hits = 0
+    for query, expected in QUERIES.items():
+        results, query_ms = timed(lambda: search.search(query, top))
+        paths = [chunk.path for _, chunk in results]
+        context = search.context(query, budget)
+        hit = expected in paths
+        hits += hit
+        print(json.dumps({
+            'query': query, 'hit': hit, 'rank': paths.index(expected) + 1 if hit else None,
+            'query_ms': query_ms, 'prompt_tokens': estimate_tokens(context),
+        }))
+        assert estimate_tokens(context) <= budget, f"prompt over budget for {query!r}"
+    return hits
+
+
+def replicate_app(root, num_files):
+    """num_files real source files: copies of app/ in numbered directories."""
+    sources = sorted(p for p in APP_ROOT.rglob('*') if p.suffix in ('.py', '.css') and '__pycache__' not in p.parts)
+    files = []
+    for i in range(num_files):
+        source = sources[i % len(sources)]
+        path = root / f'copy{i // len(sources)}' / source.relative_to(APP_ROOT)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(source.read_bytes())
+        files.append(path)
+    return sorted(files)
+
+
+def scale(tmp, num_files, budget):
+    root, db = Path(tmp) / 'repo', str(Path(tmp) / 'scale.sqlite3')
+    files = replicate_app(root, num_files)
+    backdate(files)
+
+    search = CodeSearch(CodebaseIndex(root, path=db))
+    changed, cold_ms = timed(search.refresh)
+    assert len(changed) == len(files)
+    changed, warm_ms = timed(search.refresh)
+    assert changed == []
+    reloaded, load_ms = timed(lambda: CodeSearch(CodebaseIndex(root, path=db)))
+    changed, reload_refresh_ms = timed(reloaded.refresh)
+    assert changed == []
+
+    for path in files[:5]:
+        path.write_text(path.read_text() + 'def added_helper():\n    return 1\n')
+    backdate(files[:5], seconds=30)
+    changed, edit_ms = timed(search.refresh)
+    assert changed == sorted(str(p.relative_to(root)) for p in files[:5]), changed
+
+    context, context_ms = timed(lambda: search.context('added helper for strava activities', budget))
+    assert estimate_tokens(context) <= budget
+    print(json.dumps({
+        'repo': f'{num_files} files', **search.stats(),
+        'cold_ms': cold_ms, 'warm_refresh_ms': warm_ms, 'load_ms': load_ms,
+        'reload_refresh_ms': reload_refresh_ms, 'edit_5_refresh_ms': edit_ms,
+        'context_ms': context_ms, 'full_prompt_tokens': estimate_tokens(search.index.text()),
+        'prompt_tokens': estimate_tokens(context),
+    }))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--files', type=int, default=4000)
+    parser.add_argument('--budget', type=int, default=8000, help='prompt token budget')
+    parser.add_argument('--top', type=int, default=3, help='results checked per query')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        hits = relevance(str(Path(tmp) / 'app.sqlite3'), args.budget, args.top)
+        print(json.dumps({'hits': f'{hits}/{len(QUERIES)}'}))
+        assert hits == len(QUERIES), f"only {hits} of {len(QUERIES)} requests found their file"
+        scale(tmp, args.files, args.budget)
@@ -0,0 +1,90 @@
+"""
+Rebuilding the assistant's codebase prompt with CodebaseIndex vs the streaming snapshot:
+- full: codebase.iter_snapshot joined, re-reading every file
+- cold: first refresh into an empty index
+- warm: refresh with nothing changed, in the same process and in a new one
+- touched: mtimes moved on some files but contents unchanged (hashed, not re-formatted)
+- edited: a few files changed, one added and one removed
+Checks that the index text always equals the full snapshot and that changes are reported.
+
+Usage: python -m benchmarks.codebase_index [--files 4000] [--lines 200]
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from app.tools.codebase import iter_snapshot
+from app.tools.codebase_index import CodebaseIndex
+from benchmarks.codebase_snapshot import make_tree
+
+
+def backdate(paths, seconds=3600):
+    # an existing checkout, not files written a moment ago
+    past = time.time() - seconds
+    for path in paths:
+        os.utime(path, (past, past))
+
+
+def timed(name, index, root, expect=None):
+    start = time.perf_counter()
+    changes = index.refresh()
+    text = index.text()
+    seconds = time.perf_counter() - start
+    assert text == ''.join(iter_snapshot(root)), f"{name}: index text differs from the snapshot"
+    if expect is not None:
+        got = {'added': changes.added, 'modified': changes.modified, 'removed': changes.removed}
+        assert got == expect, f"{name}: reported {got}, expected {expect}"
+    print(json.dumps({'run': name, 'ms': round(1000 * seconds, 1), 'changes': str(changes)}))
+    return seconds
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--files', type=int, default=4000)
+    parser.add_argument('--lines', type=int, default=200, help='lines per file')
+    parser.add_argument('--min-speedup', type=float, default=5.0, help='full / warm')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root, db = Path(tmp) / 'repo', str(Path(tmp) / 'index.sqlite3')
+        make_tree(root, args.files, args.lines)
+        files = sorted(p for p in root.rglob('*') if p.suffix in ('.py', '.css') and '__pycache__' not in p.parts)
+        backdate(files)
+
+        start = time.perf_counter()
+        ''.join(iter_snapshot(root))
+        full = time.perf_counter() - start
+        print(json.dumps({'run': 'full', 'ms': round(1000 * full, 1)}))
+
+        index = CodebaseIndex(root, path=db)
+        timed('cold', index, root)
+        warm = timed('warm', index, root, {'added': [], 'modified': [], 'removed': []})
+        start = time.perf_counter()
+        reloaded = CodebaseIndex(root, path=db)
+        print(json.dumps({'run': 'load index', 'ms': round(1000 * (time.perf_counter() - start), 1)}))
+        timed('warm (new process)', reloaded, root, {'added': [], 'modified': [], 'removed': []})
+
+        backdate(files[:100], seconds=60)
+        timed('touched', index, root, {'added': [], 'modified': [], 'removed': []})
+
+        edited = files[200:205]
+        for path in edited:
+            path.write_text(path.read_text() + 'extra = 1\n')
+        backdate(edited, seconds=30)
+        added, removed = root / 'pkg0' / 'new_module.py', files[300]
+        added.write_text('x = 1\n')
+        backdate([added], seconds=30)
+        removed.unlink()
+        relative = lambda path: str(path.relative_to(root))
+        timed('edited', index, root, {
+            'added': [relative(added)],
+            'modified': [relative(path) for path in edited],
+            'removed': [relative(removed)],
+        })
+
+    speedup = full / warm
+    print(json.dumps({'warm_speedup': round(speedup, 1)}))
+    assert speedup >= args.min_speedup, f"warm refresh only {speedup:.1f}x faster than a full snapshot"
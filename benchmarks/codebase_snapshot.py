@@ -0,0 +1,128 @@
+"""
+Time and peak memory of a codebase snapshot as the tree grows:
+- legacy: the previous read_codebase, a string built with += from whole-file reads and
+  written at once (reproduced here)
+- streaming: app.tools.codebase.write_snapshot, written to the file as it is read
+Checks that both produce the same text, that streaming memory stays flat and that its
+time per file stays roughly constant.
+
+Usage: python -m benchmarks.codebase_snapshot [--files 1000 2000 4000 8000] [--lines 200]
+"""
+import argparse
+import gc
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from app.tools.codebase import DEFAULT_EXTENSIONS, DEFAULT_IGNORE_DIRS, write_snapshot
+
+
+def make_tree(root, num_files, lines_per_file):
+    """num_files .py/.css files, 50 per directory, plus ignored and non-target files."""
+    for i in range(num_files):
+        directory = root / f'pkg{i // 500}' / f'mod{i // 50}'
+        directory.mkdir(parents=True, exist_ok=True)
+        ext = '.py' if i % 3 else '.css'
+        body = ''.join(f'value_{i}_{n} = {n} * {i}  # line {n}\n' for n in range(lines_per_file))
+        (directory / f'file{i}{ext}').write_text(f'\n{body}\n\n')
+        if i % 50 == 0:
+            (directory / 'README.md').write_text('not a target\n')
+    (root / '__pycache__').mkdir(exist_ok=True)
+    (root / '__pycache__' / 'ignored.py').write_text('x = 1\n')
+
+
+def legacy_snapshot(root, output_path):
+    root = Path(root)
+    files = []
+    for dirpath, dirs, names in os.walk(root):
+        dirs[:] = [d for d in dirs if d not in DEFAULT_IGNORE_DIRS]
+        for name in names:
+            path = Path(dirpath) / name
+            if path.suffix.lower() in DEFAULT_EXTENSIONS:
+                files.append(path.relative_to(root))
+    files.sort()
+
+    formatted_text = f"# Code Contents from {root}\n"
+    formatted_text += f"Total files found: {len(files)}\n\n"
+    total_lines = 0
+    current_dir = None
+    for file_path in files:
+        file_dir = str(file_path.parent)
+        if file_dir != current_dir:
+            current_dir = file_dir
+            formatted_text += f"\n## Directory: {current_dir if current_dir != '.' else 'root'}\n\n"
+        with open(root / file_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        line_count = len(content.splitlines())
+        total_lines += line_count
+        formatted_text += f"{'=' * 80}\n"
+        formatted_text += f"File: {file_path.name}\n"
+        formatted_text += f"Lines: {line_count}\n"
+        formatted_text += f"{'=' * 80}\n\n"
+        formatted_text += content.strip() + "\n\n"
+    formatted_text += f"\n{'=' * 80}\n"
+    formatted_text += f"Summary:\n"
+    formatted_text += f"Total files: {len(files)}\n"
+    formatted_text += f"Total lines of code: {total_lines}\n"
+
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(formatted_text)
+
+
+def streaming_snapshot(root, output_path):
+    write_snapshot(root, output_path)
+
+
+def measure(name, snapshot, root, output_path, num_files):
+    start = time.perf_counter()
+    snapshot(root, output_path)
+    seconds = time.perf_counter() - start
+
+    # peak from a second run, since tracing slows the timed one down
+    gc.collect()
+    tracemalloc.start()
+    snapshot(root, output_path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'snapshot': name,
+        'files': num_files,
+        'output_mb': round(output_path.stat().st_size / 2 ** 20, 1),
+        'seconds': round(seconds, 3),
+        'us_per_file': round(1e6 * seconds / num_files, 1),
+        'peak_mb': round(peak / 2 ** 20, 2),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--files', type=int, nargs='+', default=[1000, 2000, 4000, 8000])
+    parser.add_argument('--lines', type=int, default=200, help='lines per file')
+    parser.add_argument('--max-peak-growth', type=float, default=1.5,
+                        help='allowed ratio of streaming peak memory, largest tree to smallest')
+    parser.add_argument('--max-time-growth', type=float, default=2.0,
+                        help='allowed ratio of streaming time per file, largest tree to smallest')
+    args = parser.parse_args()
+
+    results = []
+    for num_files in args.files:
+        with tempfile.TemporaryDirectory() as tmp:
+            root, out = Path(tmp) / 'repo', Path(tmp) / 'out'
+            out.mkdir()
+            make_tree(root, num_files, args.lines)
+            for name, snapshot in (('legacy', legacy_snapshot), ('streaming', streaming_snapshot)):
+                result = measure(name, snapshot, root, out / f'{name}.txt', num_files)
+                results.append(result)
+                print(json.dumps(result))
+            assert (out / 'legacy.txt').read_bytes() == (out / 'streaming.txt').read_bytes(), \
+                f"outputs differ at {num_files} files"
+
+    streaming = [r for r in results if r['snapshot'] == 'streaming']
+    growth = streaming[-1]['peak_mb'] / streaming[0]['peak_mb']
+    time_growth = streaming[-1]['us_per_file'] / streaming[0]['us_per_file']
+    print(json.dumps({'streaming_peak_growth': round(growth, 2), 'streaming_time_per_file_growth': round(time_growth, 2)}))
+    assert growth <= args.max_peak_growth, f"streaming peak memory grew {growth:.2f}x"
+    assert time_growth <= args.max_time_growth, f"streaming time per file grew {time_growth:.2f}x"
@@ -0,0 +1,96 @@
+"""
+Bytes on the wire with and without response compression:
+- page-content callback responses (the sphere page carries its base points) and one
+  server-rendered sphere frame
+- a full first page load, and a repeat load where the browser still holds everything
+  marked immutable (the asset bundles and Dash's fingerprinted component suites)
+
+Usage: python -m benchmarks.compression
+"""
+import json
+import re
+import time
+
+from dash import Dash
+
+from app.app import init_app
+from app.components.sphere_callbacks import register_sphere_callbacks
+from app.components.sphere_renderer import create_sphere_component
+from app.tools.compression import init_compression
+
+ENCODINGS = ('identity', 'gzip', 'br')
+
+
+def post_callback(client, body, encoding):
+    start = time.perf_counter()
+    response = client.post('/_dash-update-component', json=body, headers={'Accept-Encoding': encoding})
+    return len(response.data), 1000 * (time.perf_counter() - start)
+
+
+def page_body(pathname):
+    return {
+        'output': 'page-content.children',
+        'outputs': {'id': 'page-content', 'property': 'children'},
+        'inputs': [{'id': 'url', 'property': 'pathname', 'value': pathname}],
+        'changedPropIds': ['url.pathname'],
+    }
+
+
+def sphere_frame_client():
+    app = Dash(__name__)
+    register_sphere_callbacks(app, render_mode='server', trace_layout='slices')
+    app.layout = create_sphere_component(render_mode='server', trace_layout='slices')
+    init_compression(app.server)
+    body = {
+        'output': 'sphere-graph.figure',
+        'outputs': {'id': 'sphere-graph', 'property': 'figure'},
+        'inputs': [{'id': 'rotation-state', 'property': 'data', 'value': {'x': 0.3, 'y': 0.7, 'z': -1.1}}],
+        'changedPropIds': ['rotation-state.data'],
+    }
+    return app.server.test_client(), body
+
+
+def callback_sizes(client, name, body):
+    row = {'response': name}
+    for encoding in ENCODINGS:
+        post_callback(client, body, encoding)
+        size, ms = post_callback(client, body, encoding)
+        row[f'{encoding}_bytes'] = size
+        row[f'{encoding}_ms'] = round(ms, 2)
+    row['ratio'] = round(row['identity_bytes'] / min(row['gzip_bytes'], row['br_bytes']), 1)
+    return row
+
+
+def page_load(client, encoding, cached_urls=()):
+    """Bytes transferred for the index page and everything it links, skipping `cached_urls`."""
+    headers = {'Accept-Encoding': encoding}
+    index = client.get('/', headers=headers)
+    total, requests, immutable = len(index.data), 1, set()
+    html = client.get('/').get_data(as_text=True)
+    for url in re.findall(r'(?:src|href)="(/[^"]+\.(?:js|css)[^"]*)"', html):
+        if url in cached_urls:
+            continue
+        response = client.get(url, headers=headers)
+        total += len(response.data)
+        requests += 1
+        cache_control = response.headers.get('Cache-Control', '')
+        if 'immutable' in cache_control or 'max-age=31536000' in cache_control:
+            immutable.add(url)
+    return total, requests, immutable
+
+
+if __name__ == '__main__':
+    client = init_app().server.test_client()
+    for pathname in ('/about', '/projects/spotify', '/visualArt/sphere'):
+        print(json.dumps(callback_sizes(client, f'page {pathname}', page_body(pathname))))
+    sphere_client, frame_body = sphere_frame_client()
+    print(json.dumps(callback_sizes(sphere_client, 'sphere frame (server mode)', frame_body)))
+
+    for encoding in ENCODINGS:
+        first, first_requests, immutable = page_load(client, encoding)
+        repeat, repeat_requests, _ = page_load(client, encoding, cached_urls=immutable)
+        print(json.dumps({
+            'page_load': encoding,
+            'first_bytes': first, 'first_requests': first_requests,
+            'repeat_bytes': repeat, 'repeat_requests': repeat_requests,
+        }))
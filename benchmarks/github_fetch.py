@@ -0,0 +1,174 @@
+"""
+GithubAPI.fetch_target_files against a local fake GitHub API: the directory-by-directory
+contents walk vs one recursive git-trees listing plus concurrent blob downloads, each
+cold (empty disk cache) and warm (unchanged repo, listings revalidated by ETag).
+Checks that every run returns the same files, that the tree mode is faster and that a
+warm tree refetch needs a single request.
+
+Usage: python -m benchmarks.github_fetch [--dirs 20] [--files 15] [--latency 0.03]
+"""
+import argparse
+import base64
+import contextlib
+import hashlib
+import io
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+from app.tools.api_cache import get_api_cache
+from app.tools.githubAPI import GithubAPI, get_github_cache, git_blob_sha
+
+OWNER, REPO = 'octo', 'portfolio'
+
+
+def fake_repo(num_dirs, files_per_dir):
+    """{path: text} for a two-level tree with a mix of target and other extensions."""
+    files = {}
+    for d in range(num_dirs):
+        for f in range(files_per_dir):
+            ext = ('.py', '.css', '.md', '.json')[f % 4]
+            directory = f'pkg{d % 5}/mod{d}'
+            files[f'{directory}/file{f}{ext}'] = f'# {directory} file {f}\n' * 20
+    files['main.py'] = 'print("hi")\n'
+    return files
+
+
+def fake_github(files, latency):
+    blobs = {git_blob_sha(text.encode()): text for text in files.values()}
+    dirs = {''}
+    for path in files:
+        parts = path.split('/')
+        dirs.update('/'.join(parts[:i]) for i in range(1, len(parts)))
+    stats = {'requests': 0, 'not_modified': 0}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, *args):
+            pass
+
+        def setup(self):
+            super().setup()
+            # headers and body go out as separate writes; don't let Nagle hold the body back
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        def reply(self, payload, status=200):
+            body = json.dumps(payload).encode()
+            etag = f'"{hashlib.sha1(body).hexdigest()}"'
+            if status == 200 and self.headers.get('If-None-Match') == etag:
+                with lock:
+                    stats['not_modified'] += 1
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            if status == 200:
+                self.send_header('ETag', etag)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            with lock:
+                stats['requests'] += 1
+            time.sleep(latency)
+            base = f'http://127.0.0.1:{self.server.server_port}/repos/{OWNER}/{REPO}'
+            path = urlparse(self.path).path
+            prefix = f'/repos/{OWNER}/{REPO}/'
+            if not path.startswith(prefix):
+                return self.reply({'message': 'Not Found'}, 404)
+            route = path[len(prefix):]
+
+            if route.startswith('git/trees/'):
+                tree = [{'path': d, 'type': 'tree', 'sha': hashlib.sha1(d.encode()).hexdigest()}
+                        for d in sorted(dirs) if d]
+                tree += [{'path': p, 'type': 'blob', 'sha': git_blob_sha(t.encode())}
+                         for p, t in sorted(files.items())]
+                return self.reply({'tree': tree, 'truncated': False})
+
+            if route.startswith('git/blobs/'):
+                text = blobs.get(route.rsplit('/', 1)[-1])
+                if text is None:
+                    return self.reply({'message': 'Not Found'}, 404)
+                return self.reply({'content': base64.b64encode(text.encode()).decode(), 'encoding': 'base64'})
+
+            if route.startswith('contents'):
+                target = route[len('contents'):].strip('/')
+                if target in files:
+                    return self.reply({'content': base64.b64encode(files[target].encode()).decode()})
+                if target not in dirs:
+                    return self.reply({'message': 'Not Found'}, 404)
+                children = {}
+                for p in list(files) + list(dirs):
+                    parent, _, name = p.rpartition('/')
+                    if p and parent == target:
+                        children[p] = name
+                return self.reply([
+                    {'name': name, 'path': p, 'type': 'file' if p in files else 'dir',
+                     'sha': git_blob_sha(files[p].encode()) if p in files else None,
+                     'url': f'{base}/contents/{p}'}
+                    for p, name in sorted(children.items())
+                ])
+            return self.reply({'message': 'Not Found'}, 404)
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, stats
+
+
+def run(github, mode, stats, warm):
+    # the in-memory TTL cache is dropped either way, as in a fresh worker
+    get_api_cache().clear()
+    if not warm:
+        get_github_cache().clear()
+    stats['requests'] = stats['not_modified'] = 0
+    start = time.perf_counter()
+    files = github.fetch_target_files(mode=mode)
+    return files, time.perf_counter() - start, stats['requests'], stats['not_modified']
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--dirs', type=int, default=20)
+    parser.add_argument('--files', type=int, default=15, help='files per directory')
+    parser.add_argument('--latency', type=float, default=0.03, help='seconds per fake API response')
+    parser.add_argument('--min-speedup', type=float, default=3.0)
+    args = parser.parse_args()
+
+    os.environ['GITHUB_CACHE_PATH'] = tempfile.mkdtemp(prefix='github-cache-')
+    repo_files = fake_repo(args.dirs, args.files)
+    server, stats = fake_github(repo_files, args.latency)
+    github = GithubAPI()
+    github.repo_url = f'https://github.com/{OWNER}/{REPO}'
+    github.base_url = f'http://127.0.0.1:{server.server_port}'
+
+    results = {}
+    for mode in ('contents', 'tree'):
+        for warm in (False, True):
+            with contextlib.redirect_stdout(io.StringIO()):
+                files, seconds, requests, not_modified = run(github, mode, stats, warm)
+            results[mode, warm] = (files, seconds, requests)
+            print(json.dumps({
+                'mode': mode, 'cache': 'warm' if warm else 'cold', 'files': len(files),
+                'requests': requests, 'not_modified': not_modified, 'seconds': round(seconds, 3)
+            }))
+
+    expected = {p: t for p, t in repo_files.items() if github.is_target(p)}
+    for (mode, warm), (files, _, _) in results.items():
+        assert dict(files) == expected, f"{mode} ({'warm' if warm else 'cold'}) returned different files"
+    speedup = results['contents', False][1] / results['tree', False][1]
+    print(json.dumps({'speedup': round(speedup, 1)}))
+    assert speedup >= args.min_speedup, f"tree mode only {speedup:.1f}x faster"
+    warm_requests = results['tree', True][2]
+    assert warm_requests == 1, f"warm tree refetch made {warm_requests} requests"
@@ -0,0 +1,151 @@
+"""
+Throughput and latency of the Spotify top-tracks callback under concurrent load, served by
+gunicorn with the old Procfile defaults (one sync worker) vs gunicorn.conf.py.
+Spotify is replaced by a local stub with a fixed response latency; every request uses its
+own access token so the API cache never answers for it.
+
+Usage: python -m benchmarks.load_test [--clients 32] [--duration 10] [--warmup 3] [--latency 0.2]
+"""
+import argparse
+import itertools
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from statistics import quantiles
+
+import requests
+
+ROOT = Path(__file__).resolve().parent.parent
+
+CONFIGS = {
+    'sync-1': ['-w', '1', '-k', 'sync'],
+    'gunicorn.conf.py': ['-c', 'gunicorn.conf.py'],
+}
+
+TOP_TRACKS = json.dumps({'items': [
+    {'name': f'Track {i}', 'artists': [{'name': f'Artist {i}'}],
+     'album': {'name': f'Album {i}', 'images': [{'url': f'https://example.com/{i}.jpg'}]},
+     'popularity': 50, 'duration_ms': 200000}
+    for i in range(10)
+]}).encode()
+
+
+def stub_spotify(latency):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            time.sleep(latency)
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(TOP_TRACKS)))
+            self.end_headers()
+            self.wfile.write(TOP_TRACKS)
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_gunicorn(args, port, upstream):
+    env = {**os.environ, 'SPOTIFY_API_URL': upstream, 'GUNICORN_ACCESS_LOG': ''}
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', *args, '-b', f'127.0.0.1:{port}', 'wsgi:server'],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            if requests.get(f'http://127.0.0.1:{port}/', timeout=1).ok:
+                return process
+        except requests.RequestException:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError('gunicorn did not start')
+
+
+def callback_body(token):
+    return {
+        'output': 'spotify-tracks-container.children',
+        'outputs': {'id': 'spotify-tracks-container', 'property': 'children'},
+        'inputs': [
+            {'id': 'spotify-time-range', 'property': 'value', 'value': 'medium_term'},
+            {'id': 'spotify-auth-store', 'property': 'data', 'value': {'access_token': token}},
+        ],
+        'changedPropIds': ['spotify-auth-store.data'],
+    }
+
+
+def run_load(port, clients, duration):
+    url = f'http://127.0.0.1:{port}/_dash-update-component'
+    tokens = itertools.count()
+    latencies, errors = [], []
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + duration
+
+    def client():
+        session = requests.Session()
+        while time.perf_counter() < stop_at:
+            start = time.perf_counter()
+            try:
+                ok = session.post(url, json=callback_body(f'load-{next(tokens)}'), timeout=30).ok
+            except requests.RequestException:
+                ok = False
+            with lock:
+                (latencies if ok else errors).append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    cuts = quantiles(latencies, n=100) if len(latencies) > 1 else [0.0] * 99
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'rps': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(1000 * cuts[49], 1),
+        'p95_ms': round(1000 * cuts[94], 1),
+        'p99_ms': round(1000 * cuts[98], 1),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=10, help='seconds of load per config')
+    parser.add_argument('--warmup', type=float, default=3, help='seconds of unmeasured load first')
+    parser.add_argument('--latency', type=float, default=0.2, help='seconds per stub Spotify response')
+    args = parser.parse_args()
+
+    upstream = stub_spotify(args.latency)
+    upstream_url = f'http://127.0.0.1:{upstream.server_port}'
+
+    for name, gunicorn_args in CONFIGS.items():
+        port = free_port()
+        process = start_gunicorn(gunicorn_args, port, upstream_url)
+        try:
+            run_load(port, args.clients, args.warmup)
+            print(json.dumps({'config': name, 'clients': args.clients, **run_load(port, args.clients, args.duration)}))
+        finally:
+            process.terminate()
+            process.wait()
@@ -0,0 +1,63 @@
+"""
+Sphere point projection: the old per-point loop (one 4x4 matmul, projection and tuple per
+point) vs one vectorized transform + perspective divide over an (N, 4) array.
+The loop is only timed up to --max-loop points.
+
+Usage: python -m benchmarks.projection [--max-loop 100000] [--repeat 3]
+"""
+import argparse
+import json
+import math
+import time
+
+import numpy as np
+
+from app.pages.svgDemo import CAMERA_DISTANCE, FOCAL_LENGTH, HEIGHT, SCALE, WIDTH, sphere_transform
+from app.tools.projection import Matrix3D, project_points, sphere_slice_points
+
+SIZES = [(25, 100), (100, 1000), (100, 10_000)]
+
+
+def loop_projection(points):
+    """The original svgDemo inner loop."""
+    transform = Matrix3D.rotation_y(math.radians(30)) @ Matrix3D.rotation_x(math.radians(15))
+    out = []
+    for point in points.reshape(-1, 4):
+        transformed = transform @ np.array(point)
+        x, y, z = transformed[:3]
+        scale = FOCAL_LENGTH / (z + CAMERA_DISTANCE)
+        out.append((WIDTH / 2 + x * scale * SCALE, HEIGHT / 2 + y * scale * SCALE))
+    return out
+
+
+def timed(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--max-loop', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    matrix = sphere_transform()
+    for num_slices, num_points in SIZES:
+        points = sphere_slice_points(num_slices, num_points)
+        n = points.shape[0] * points.shape[1]
+        projected, vector_s = timed(lambda: project_points(points, matrix), args.repeat)
+        row = {
+            'points': n,
+            'vectorized_ms': round(1000 * vector_s, 2),
+            'vectorized_ns_per_point': round(1e9 * vector_s / n, 1),
+        }
+        if n <= args.max_loop:
+            looped, loop_s = timed(lambda: loop_projection(points), 1)
+            row['loop_ms'] = round(1000 * loop_s, 1)
+            row['speedup'] = round(loop_s / vector_s, 1)
+            row['max_abs_diff'] = float(np.abs(np.array(looped) - projected.reshape(-1, 2)).max())
+        print(json.dumps(row))
@@ -0,0 +1,103 @@
+"""
+Load benchmark for the sphere page: server round-trips per viewer, 'server' vs 'client' render mode.
+
+Usage: python -m benchmarks.sphere_load [--seconds 5]
+"""
+import argparse
+import json
+import time
+
+from dash import Dash, html
+
+from app.components.sphere_callbacks import register_sphere_callbacks, DT
+from app.components.sphere_renderer import create_sphere_component
+
+INTERVAL_MS = 50
+
+
+def build_app(render_mode):
+    app = Dash(__name__, suppress_callback_exceptions=True)
+    register_sphere_callbacks(app, render_mode=render_mode)
+    app.layout = html.Div(create_sphere_component(render_mode=render_mode))
+    return app
+
+
+def server_callbacks_per_tick(app):
+    """Follow the chain of server-side callbacks fired by one animation tick."""
+    server = {
+        key: cb for key, cb in app.callback_map.items()
+        if cb.get('callback') is not None
+    }
+    fired, frontier = [], {'animation-interval.n_intervals'}
+    while frontier:
+        triggered = [
+            key for key, cb in server.items()
+            if key not in fired and any(f"{i['id']}.{i['property']}" in frontier for i in cb['inputs'])
+        ]
+        fired.extend(triggered)
+        frontier = {out for key in triggered for out in key.strip('.').split('...')}
+    return fired
+
+
+def tick_payloads(app, rotation):
+    """Request bodies the browser would POST for the server callbacks of one tick."""
+    values = {
+        'animation-interval.n_intervals': 1,
+        'auto-rotate.value': ['enabled'],
+        'x-speed.value': 0.5,
+        'y-speed.value': 1.0,
+        'z-speed.value': 0.3,
+        'rotation-state.data': rotation,
+    }
+    payloads = []
+    for key in server_callbacks_per_tick(app):
+        cb = app.callback_map[key]
+        output_id, output_prop = key.rsplit('.', 1)
+        payloads.append({
+            'output': key,
+            'outputs': {'id': output_id, 'property': output_prop},
+            'inputs': [{**i, 'value': values.get(f"{i['id']}.{i['property']}")} for i in cb['inputs']],
+            'state': [{**s, 'value': values.get(f"{s['id']}.{s['property']}")} for s in cb['state']],
+            'changedPropIds': ['animation-interval.n_intervals'],
+        })
+    return payloads
+
+
+def run(render_mode, seconds):
+    app = build_app(render_mode)
+    client = app.server.test_client()
+    client.get('/')  # let dash finish server setup
+
+    ticks_per_second = 1000 / INTERVAL_MS
+    requests_per_tick = len(server_callbacks_per_tick(app))
+
+    requests, nbytes, rotation = 0, 0, {'x': 0, 'y': 0, 'z': 0}
+    start = time.perf_counter()
+    while requests_per_tick and time.perf_counter() - start < seconds:
+        for payload in tick_payloads(app, rotation):
+            response = client.post('/_dash-update-component', json=payload)
+            nbytes += len(response.data)
+            requests += 1
+        rotation = {axis: value + DT for axis, value in rotation.items()}
+    elapsed = time.perf_counter() - start
+
+    server_ms = 1000 * elapsed / requests if requests else 0.0
+    viewer_rps = ticks_per_second * requests_per_tick
+    return {
+        'render_mode': render_mode,
+        'requests_per_viewer_per_s': viewer_rps,
+        'server_ms_per_request': round(server_ms, 3),
+        'server_cpu_ms_per_viewer_s': round(viewer_rps * server_ms, 1),
+        'bytes_per_viewer_s': int(viewer_rps * nbytes / requests) if requests else 0,
+        # client mode never calls the server, so there is no per-worker limit to report
+        'viewers_per_worker': round(1000 / (viewer_rps * server_ms), 1) if requests else None,
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--seconds', type=float, default=5)
+    args = parser.parse_args()
+
+    for mode in ('server', 'client'):
+        print(json.dumps(run(mode, args.seconds)))
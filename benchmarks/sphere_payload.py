@@ -0,0 +1,41 @@
+"""
+Payload size and server serialize time of one sphere frame, per trace layout.
+
+Usage: python -m benchmarks.sphere_payload [--repeat 50]
+"""
+import argparse
+import json
+import time
+
+import plotly.io as pio
+
+from app.components.sphere_renderer import (
+    create_sphere_traces, generate_sphere_points, SPHERE_LAYOUT, TRACE_LAYOUTS
+)
+
+
+def run(trace_layout, repeat):
+    base_points = generate_sphere_points()
+    rotation = [0.3, 0.7, -1.1]
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        traces = create_sphere_traces(base_points, rotation, trace_layout=trace_layout)
+        payload = pio.to_json({'data': traces, 'layout': SPHERE_LAYOUT}, validate=False)
+    elapsed = time.perf_counter() - start
+
+    return {
+        'trace_layout': trace_layout,
+        'traces': len(traces),
+        'payload_bytes': len(payload.encode('utf-8')),
+        'build_and_serialize_ms': round(1000 * elapsed / repeat, 3),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    for trace_layout in TRACE_LAYOUTS:
+        print(json.dumps(run(trace_layout, args.repeat)))
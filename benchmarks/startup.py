@@ -0,0 +1,63 @@
+"""
+Worker startup cost: import time, time until init_app() returns and RSS at that point,
+with lazy page loading vs every page module preloaded (the previous eager behaviour).
+Each measurement runs in a fresh interpreter.
+
+Usage: python -m benchmarks.startup [--runs 5]
+"""
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+from statistics import median
+
+PROBE = '''
+import json, resource, sys, time
+start = time.perf_counter()
+from app.app import init_app
+imported = time.perf_counter()
+app = init_app(preload_pages={preload})
+ready = time.perf_counter()
+
+rss_kb = None
+try:
+    with open('/proc/self/status') as f:
+        rss_kb = next(int(line.split()[1]) for line in f if line.startswith('VmRSS:'))
+except OSError:
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+print(json.dumps({{
+    'import_ms': 1000 * (imported - start),
+    'ready_ms': 1000 * (ready - start),
+    'rss_mb': rss_kb / 1024,
+    'heavy_modules': [m for m in ('numpy', 'pandas', 'scipy', 'requests') if m in sys.modules],
+}}))
+'''
+
+
+def measure(preload, runs):
+    samples = [
+        json.loads(subprocess.run(
+            [sys.executable, '-c', PROBE.format(preload=preload)],
+            cwd=Path(__file__).resolve().parent.parent,
+            capture_output=True, text=True, check=True
+        ).stdout.strip().splitlines()[-1])
+        for _ in range(runs)
+    ]
+    return {
+        'mode': 'preload' if preload else 'lazy',
+        'import_ms': round(median(s['import_ms'] for s in samples), 1),
+        'ready_ms': round(median(s['ready_ms'] for s in samples), 1),
+        'rss_mb': round(median(s['rss_mb'] for s in samples), 1),
+        'heavy_modules': samples[-1]['heavy_modules'],
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    for preload in (True, False):
+        print(json.dumps(measure(preload, args.runs)))
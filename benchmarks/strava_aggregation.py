@@ -0,0 +1,84 @@
+"""
+Cumulative daily distance for a synthetic 10,000-activity history:
+the original object-dtype groupby path vs the typed activity_frame + resample path.
+
+Usage: python -m benchmarks.strava_aggregation [--activities 10000] [--repeat 20]
+"""
+import argparse
+import json
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.tools.activity_store import ActivityStore, activity_frame, distance_by_type
+
+
+def synthetic_activities(n, seed=0):
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp('2015-01-01', tz='UTC')
+    offsets = np.sort(rng.integers(0, 10 * 365 * 86400, n))
+    types = rng.choice(['Run', 'Ride', 'Swim', 'Walk', 'Hike'], n, p=[0.5, 0.3, 0.1, 0.05, 0.05])
+    return [
+        {
+            'id': i,
+            'name': f'Activity {i}',
+            'type': str(types[i]),
+            'start_date': (start + pd.Timedelta(seconds=int(offsets[i]))).strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'distance': float(rng.uniform(1000, 40000)),
+            'moving_time': int(rng.integers(600, 14400)),
+            'elapsed_time': int(rng.integers(600, 16000)),
+            'total_elevation_gain': float(rng.uniform(0, 800)),
+            'average_speed': float(rng.uniform(2, 10)),
+        }
+        for i in range(n)
+    ]
+
+
+def legacy_cumulative(activities, activity_type):
+    # the pre-activity_frame create_distance_plot aggregation
+    df = pd.DataFrame(activities)
+    df = df.loc[df['type'] == activity_type] if activity_type else df
+    df['date'] = pd.to_datetime(df['start_date']).dt.date
+    df['distance'] = df['distance'] / 1000
+    return df.groupby('date')['distance'].sum().cumsum()
+
+
+def typed_cumulative(activities, activity_type):
+    return distance_by_type(activity_frame(activities), freq='D', cumulative=True)[activity_type]
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return result, 1000 * (time.perf_counter() - start) / repeat
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--activities', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    activities = synthetic_activities(args.activities)
+
+    legacy, legacy_ms = timed(lambda: legacy_cumulative(activities, 'Run'), args.repeat)
+    typed, typed_ms = timed(lambda: typed_cumulative(activities, 'Run'), args.repeat)
+    assert np.isclose(legacy.iloc[-1], typed.iloc[-1], rtol=1e-4)
+
+    # per-request cost on the dashboard: typed table and aggregate cached per athlete
+    store = ActivityStore(f'{tempfile.mkdtemp()}/activities.sqlite3')
+    store.upsert(1, activities)
+    store.distance_by_type(1, freq='D', cumulative=True)
+    _, cached_ms = timed(lambda: store.distance_by_type(1, freq='D', cumulative=True)['Run'], args.repeat)
+
+    print(json.dumps({
+        'activities': args.activities,
+        'legacy_ms': round(legacy_ms, 2),
+        'typed_ms': round(typed_ms, 2),
+        'cached_ms': round(cached_ms, 3),
+        'typed_speedup': round(legacy_ms / typed_ms, 1),
+        'cached_speedup': round(legacy_ms / cached_ms, 1),
+    }))
@@ -0,0 +1,82 @@
+"""
+Wall-clock time of Strava.get_all_activities against a local fake Strava API,
+serial vs concurrent page fetching.
+
+Usage: python -m benchmarks.strava_pagination [--activities 3000] [--latency 0.1]
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from app.tools.api_cache import get_api_cache
+from app.tools.stravaAPI import Strava
+
+
+def fake_strava_server(num_activities, latency):
+    activities = [
+        {'id': i, 'name': f'Run {i}', 'type': 'Run', 'distance': 5000.0,
+         'start_date': f'2024-01-01T{i % 24:02d}:00:00Z'}
+        for i in range(num_activities)
+    ]
+    stats = {'requests': 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            stats['requests'] += 1
+            url = urlparse(self.path)
+            query = {k: int(v[0]) for k, v in parse_qs(url.query).items() if k in ('page', 'per_page')}
+            page, per_page = query.get('page', 1), min(query.get('per_page', 30), 200)
+
+            time.sleep(latency)
+            body = json.dumps(activities[(page - 1) * per_page:page * per_page]).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('X-RateLimit-Limit', '600,30000')
+            self.send_header('X-RateLimit-Usage', f"{stats['requests']},{stats['requests']}")
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, stats
+
+
+def run(strava, concurrency, token):
+    start = time.perf_counter()
+    activities = strava.get_all_activities(token, concurrency=concurrency)
+    return len(activities), time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--activities', type=int, default=3000)
+    parser.add_argument('--latency', type=float, default=0.1, help='seconds per fake API response')
+    args = parser.parse_args()
+
+    server, stats = fake_strava_server(args.activities, args.latency)
+    strava = Strava()
+    strava.base_url = f'http://127.0.0.1:{server.server_port}'
+
+    baseline = None
+    for concurrency in (1, 4, 8):
+        get_api_cache().clear()
+        stats['requests'] = 0
+        count, seconds = run(strava, concurrency, token=f'bench-{concurrency}')
+        baseline = baseline or seconds
+        print(json.dumps({
+            'concurrency': concurrency,
+            'activities': count,
+            'requests': stats['requests'],
+            'seconds': round(seconds, 3),
+            'speedup': round(baseline / seconds, 2),
+        }))
+    server.shutdown()
@@ -0,0 +1,76 @@
+"""
+Writing many shapes on a 16384x16384 canvas: the previous vertex()/end_shape() loop with
+the document joined in memory, vs Canvas.paths() with the array formatter and streaming
+save(). Reports wall time, peak traced memory and file size.
+
+Usage: python -m benchmarks.svg_canvas [--shapes 200000] [--vertices 8]
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from app.tools.svg_tools import Canvas
+
+SIZE = 16384
+
+
+def random_shapes(shapes, vertices, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.uniform(0, SIZE, (shapes, 1, 2))
+    return centers + rng.uniform(-20, 20, (shapes, vertices, 2))
+
+
+def legacy(shapes, path):
+    """The old per-vertex API and in-memory document, reproduced as it was."""
+    elements = []
+    for shape in shapes.tolist():
+        current = []
+        for x, y in shape:
+            current.append((x, y))
+        points = " ".join(f"{x},{y}" for x, y in current)
+        elements.append(f'<path d="M {points} Z" fill="none" stroke="black" stroke-width="1" opacity="1"/>')
+    body = "\n    ".join(elements)
+    svg = f'''<?xml version="1.0" encoding="UTF-8"?>
+<svg width="{SIZE}" height="{SIZE}" xmlns="http://www.w3.org/2000/svg">
+    {body}
+</svg>'''
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(svg)
+
+
+def bulk(shapes, path):
+    canvas = Canvas(SIZE, SIZE)
+    canvas.paths(shapes, close=True)
+    canvas.save(path)
+
+
+def measure(fn, shapes, path):
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn(shapes, path)
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'seconds': round(seconds, 2),
+        'peak_mb': round(peak / 2 ** 20, 1),
+        'file_mb': round(os.path.getsize(path) / 2 ** 20, 1),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--shapes', type=int, default=200_000)
+    parser.add_argument('--vertices', type=int, default=8)
+    args = parser.parse_args()
+
+    shapes = random_shapes(args.shapes, args.vertices)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'out.svg')
+        for name, fn in (('vertex loop + join', legacy), ('paths() + streaming save', bulk)):
+            print(json.dumps({'writer': name, 'shapes': args.shapes, **measure(fn, shapes, path)}))
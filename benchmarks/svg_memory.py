@@ -0,0 +1,139 @@
+"""
+Memory per shape and build/serialize time for a scene of N circles in a few colors:
+- objects: the previous storage, a dict-backed Circle and a fresh validated Style per
+  fill() call (reproduced here)
+- slots: Canvas.add() with the __slots__ Circle objects and interned styles
+- buffer: Canvas.circle(), one row per circle in a struct-of-arrays buffer
+- bulk: Canvas.circles() per color from arrays
+
+Usage: python -m benchmarks.svg_memory [--shapes 100000]
+"""
+import argparse
+import gc
+import io
+import json
+import time
+import tracemalloc
+from dataclasses import dataclass
+
+import numpy as np
+
+from app.tools.svg_tools import Canvas, Circle, VALID_COLOR_NAMES
+
+COLORS = ['red', 'green', 'blue', 'orange', 'purple']
+
+
+@dataclass
+class LegacyStyle:
+    fill: str = "none"
+    stroke: str = "black"
+    stroke_width: float = 1
+    opacity: float = 1
+
+    def __post_init__(self):
+        for color in (self.fill, self.stroke):
+            if color != "none" and color not in VALID_COLOR_NAMES and not color.startswith(("#", "rgb", "hsl")):
+                raise ValueError(color)
+
+    def to_svg_attrs(self):
+        return f'fill="{self.fill}" stroke="{self.stroke}" stroke-width="{self.stroke_width}" opacity="{self.opacity}"'
+
+
+class LegacyCircle:
+    def __init__(self, x, y, diameter, style):
+        self.style = style
+        self.x, self.y, self.width, self.height, self.rotation = x, y, diameter, diameter, 0
+
+    def to_svg(self):
+        return (f'<ellipse cx="{self.x}" cy="{self.y}" rx="{self.width / 2}" ry="{self.height / 2}" '
+                f'{self.style.to_svg_attrs()}/>')
+
+
+def scene(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(0, 4096, (n, 2)).round(2), rng.uniform(1, 20, n).round(2), rng.integers(0, len(COLORS), n)
+
+
+def build_objects(xy, d, colors):
+    elements, style = [], LegacyStyle()
+    for (x, y), diameter, color in zip(xy.tolist(), d.tolist(), colors.tolist()):
+        style = LegacyStyle(fill=COLORS[color], stroke=style.stroke)
+        elements.append(LegacyCircle(x, y, diameter, style))
+    return elements
+
+
+def write_objects(elements):
+    return len("\n    ".join(element.to_svg() for element in elements))
+
+
+def build_slots(xy, d, colors):
+    canvas = Canvas(4096, 4096)
+    for (x, y), diameter, color in zip(xy.tolist(), d.tolist(), colors.tolist()):
+        canvas.fill(COLORS[color])
+        canvas.add(Circle(x, y, diameter, canvas.style))
+    return canvas
+
+
+def build_buffer(xy, d, colors):
+    canvas = Canvas(4096, 4096)
+    for (x, y), diameter, color in zip(xy.tolist(), d.tolist(), colors.tolist()):
+        canvas.fill(COLORS[color])
+        canvas.circle(x, y, diameter)
+    return canvas
+
+
+def build_bulk(xy, d, colors):
+    canvas = Canvas(4096, 4096)
+    for i, color in enumerate(COLORS):
+        mask = colors == i
+        canvas.fill(color)
+        canvas.circles(xy[mask], d[mask])
+    return canvas
+
+
+def write_canvas(canvas):
+    out = io.StringIO()
+    canvas.save(out)
+    return len(out.getvalue())
+
+
+def measure(name, build, write, data):
+    start = time.perf_counter()
+    scene_obj = build(*data)
+    build_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    size = write(scene_obj)
+    write_s = time.perf_counter() - start
+
+    # memory from a second build, since tracing slows the timed one down
+    del scene_obj
+    gc.collect()
+    tracemalloc.start()
+    scene_obj = build(*data)
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    n = len(data[0])
+    return {
+        'storage': name,
+        'bytes_per_shape': round(retained / n, 1),
+        'build_ms': round(1000 * build_s, 1),
+        'serialize_ms': round(1000 * write_s, 1),
+        'svg_mb': round(size / 2 ** 20, 2),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--shapes', type=int, default=100_000)
+    args = parser.parse_args()
+
+    data = scene(args.shapes)
+    for name, build, write in (
+        ('objects', build_objects, write_objects),
+        ('slots', build_slots, write_canvas),
+        ('buffer', build_buffer, write_canvas),
+        ('bulk', build_bulk, write_canvas),
+    ):
+        print(json.dumps(measure(name, build, write, data)))
@@ -0,0 +1,67 @@
+"""
+SVG size, serialize time and XML parse time for a large scene written with inline style
+attributes vs a shared <style> block and class references, at a few precisions.
+
+Usage: python -m benchmarks.svg_styles [--circles 100000] [--paths 20000]
+"""
+import argparse
+import io
+import json
+import time
+import xml.etree.ElementTree as ET
+
+import numpy as np
+
+from app.tools.svg_tools import Canvas
+
+FILLS = ['red', 'green', 'blue', 'orange', 'purple']
+STROKES = ['black', 'darkblue', 'darkred']
+
+
+def build(style_mode, precision, circles, paths, seed=0):
+    rng = np.random.default_rng(seed)
+    canvas = Canvas(4096, 4096, precision=precision, style_mode=style_mode)
+    canvas.background("white")
+    colors = rng.integers(0, len(FILLS), circles)
+    xy, diameters = rng.uniform(0, 4096, (circles, 2)), rng.uniform(1, 20, circles)
+    for i, fill in enumerate(FILLS):
+        canvas.fill(fill)
+        canvas.circles(xy[colors == i], diameters[colors == i])
+
+    canvas.fill("none")
+    shapes = rng.uniform(0, 4096, (paths, 1, 2)) + rng.uniform(-30, 30, (paths, 6, 2))
+    for i, stroke in enumerate(STROKES):
+        canvas.stroke(stroke)
+        canvas.paths(shapes[i::len(STROKES)], close=True)
+    return canvas
+
+
+def measure(style_mode, precision, circles, paths):
+    canvas = build(style_mode, precision, circles, paths)
+    start = time.perf_counter()
+    out = io.StringIO()
+    canvas.save(out)
+    serialize_s = time.perf_counter() - start
+
+    svg = out.getvalue().encode('utf-8')
+    start = time.perf_counter()
+    ET.fromstring(svg)
+    parse_s = time.perf_counter() - start
+    return {
+        'style_mode': style_mode,
+        'precision': precision,
+        'svg_mb': round(len(svg) / 2 ** 20, 2),
+        'serialize_ms': round(1000 * serialize_s, 1),
+        'parse_ms': round(1000 * parse_s, 1),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--circles', type=int, default=100_000)
+    parser.add_argument('--paths', type=int, default=20_000)
+    args = parser.parse_args()
+
+    for style_mode in ('inline', 'class'):
+        for precision in (3, 2, 1):
+            print(json.dumps(measure(style_mode, precision, args.circles, args.paths)))
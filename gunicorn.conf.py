@@ -0,0 +1,29 @@
+# gunicorn settings for wsgi:server, see Procfile. Every value can be overridden from the environment.
+import multiprocessing
+import os
+
+cpu_count = multiprocessing.cpu_count()
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+
+# import the app once in the master; workers fork with pages already loaded
+preload_app = True
+
+# callbacks mostly wait on Spotify/Strava/GitHub, so threads (or gevent) per worker
+# keep slow upstream calls from blocking other requests
+workers = int(os.getenv('WEB_CONCURRENCY', cpu_count * 2 + 1))
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+threads = int(os.getenv('GUNICORN_THREADS', max(4, cpu_count * 2)))
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', 1000))  # gevent only
+
+# the API clients time out on their own (see app/tools/http_client.py); this only catches hung workers
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 60))
+graceful_timeout = 30
+keepalive = 5
+
+# recycle workers to cap slow memory growth
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 100))
+
+# empty disables the access log
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-') or None
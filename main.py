@@ -1,8 +1,7 @@
-from http.cookiejar import debug
-
 from app.app import init_app
 
 app = init_app()
+server = app.server
 
 if __name__ == '__main__':
-    app.run_server(debug=True)
\ No newline at end of file
+    app.run_server(debug=True)
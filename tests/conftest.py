@@ -0,0 +1,21 @@
+import pytest
+
+from app.tools import http_client
+from app.tools.api_cache import get_api_cache
+from app.tools.http_client import HttpClient
+
+
+@pytest.fixture
+def no_retry_client(monkeypatch):
+    """The shared HTTP client without retries, so failing stub responses fail at once."""
+    client = HttpClient(retries=0, timeout=5)
+    monkeypatch.setattr(http_client, '_http_client', client)
+    yield client
+    client.close()
+
+
+@pytest.fixture(autouse=True)
+def clear_api_cache():
+    get_api_cache().clear()
+    yield
+    get_api_cache().clear()
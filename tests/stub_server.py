@@ -0,0 +1,77 @@
+import json
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Tuple
+from urllib.parse import parse_qs, urlparse
+
+
+class StubServer:
+    """
+    Local HTTP server for tests. `respond(request)` gets a dict with method, path, query
+    (first value per key) and headers, and returns (status, headers, body); dict and list
+    bodies are sent as JSON. Every request is recorded with the client port it came
+    from, so tests can tell whether a connection was reused.
+    """
+
+    def __init__(self, respond: Callable[[Dict], Tuple[int, Dict, object]]):
+        self.respond = respond
+        self.requests: List[Dict] = []
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def setup(self):
+                super().setup()
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                request = {
+                    'method': 'GET',
+                    'path': url.path,
+                    'query': {k: v[0] for k, v in parse_qs(url.query).items()},
+                    'headers': dict(self.headers),
+                    'client_port': self.client_address[1],
+                }
+                with server.lock:
+                    server.requests.append(request)
+                    server.in_flight += 1
+                    server.max_in_flight = max(server.max_in_flight, server.in_flight)
+                try:
+                    status, headers, body = server.respond(request)
+                finally:
+                    with server.lock:
+                        server.in_flight -= 1
+                if isinstance(body, (dict, list)):
+                    body = json.dumps(body).encode()
+                    headers = {'Content-Type': 'application/json', **headers}
+                body = body or b''
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.httpd.daemon_threads = True
+        self.url = f'http://127.0.0.1:{self.httpd.server_port}'
+        threading.Thread(target=self.httpd.serve_forever, args=(0.05,), daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
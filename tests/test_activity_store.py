@@ -0,0 +1,91 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from app.tools.activity_store import ActivityStore, activity_frame, distance_by_type
+from app.tools.stravaAPI import ActivityFetchError
+
+ATHLETE = 7
+
+
+def activity(i):
+    return {'id': i, 'name': f'Run {i}', 'type': 'Run', 'start_date': f'2024-01-{i:02d}T08:00:00Z',
+            'distance': 1000.0 * i}
+
+
+class FakeStrava:
+    """get_all_activities over a fixed oldest-first history, failing after `fail_after` activities."""
+
+    def __init__(self, activities, fail_after=None):
+        self.activities = activities
+        self.fail_after = fail_after
+        self.calls = []
+
+    def get_all_activities(self, access_token, after=None):
+        self.calls.append(after)
+        newer = [a for a in self.activities if a['start_date'] > self.as_date(after)]
+        if self.fail_after is not None and len(newer) > self.fail_after:
+            raise ActivityFetchError('page failed', page=2, status=503, activities=newer[:self.fail_after])
+        return newer
+
+    @staticmethod
+    def as_date(after):
+        return datetime.fromtimestamp(after, timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ActivityStore(str(tmp_path / 'activities.sqlite3'))
+
+
+def test_sync_stores_everything_and_resumes(store):
+    history = [activity(i) for i in range(1, 6)]
+    strava = FakeStrava(history[:3])
+    assert store.sync(strava, 'token', ATHLETE) == 3
+    # a first sync still passes `after`, so the API returns oldest first
+    assert strava.calls == [0]
+
+    strava.activities = history
+    store.sync(strava, 'token', ATHLETE)
+    assert store.count(ATHLETE) == 5
+    assert list(store.load(ATHLETE)['id']) == [1, 2, 3, 4, 5]
+
+
+def test_failed_sync_stores_only_the_contiguous_prefix(store):
+    history = [activity(i) for i in range(1, 11)]
+    strava = FakeStrava(history, fail_after=4)
+    with pytest.raises(ActivityFetchError):
+        store.sync(strava, 'token', ATHLETE)
+    assert list(store.load(ATHLETE)['id']) == [1, 2, 3, 4]
+    assert store.latest_start_date(ATHLETE).isoformat() == '2024-01-04T08:00:00+00:00'
+
+    # the next sync picks up right after the stored prefix, leaving no gap
+    strava.fail_after = None
+    store.sync(strava, 'token', ATHLETE)
+    assert list(store.load(ATHLETE)['id']) == list(range(1, 11))
+
+
+def test_failed_sync_out_of_order_stores_nothing(store):
+    strava = FakeStrava([])
+    partial = [activity(3), activity(1), activity(2)]
+
+    def failing(access_token, after=None):
+        raise ActivityFetchError('page failed', page=2, activities=partial)
+
+    strava.get_all_activities = failing
+    with pytest.raises(ActivityFetchError):
+        store.sync(strava, 'token', ATHLETE)
+    assert store.count(ATHLETE) == 0
+
+
+def test_distance_by_type_skips_activities_without_a_type():
+    frame = activity_frame([
+        {**activity(1), 'type': 'Run', 'distance': 5000.0},
+        {**activity(2), 'type': None, 'distance': 7000.0},
+        {**activity(3), 'type': 'Ride', 'distance': 20000.0},
+    ])
+    km = distance_by_type(frame)
+    assert list(km.columns) == ['Ride', 'Run']
+    assert km['Run'].sum() == 5.0
+    assert km['Ride'].sum() == 20.0
+    assert km.loc['2024-01-02'].sum() == 0
@@ -0,0 +1,198 @@
+import threading
+import types
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.tools import api_cache
+from app.tools.api_cache import ApiCache, MemoryBackend, SQLiteBackend
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A fake clock for api_cache: sleep() advances it instead of waiting."""
+    clock = types.SimpleNamespace(now=1_700_000_000.0, sleeps=[])
+
+    def sleep(seconds):
+        clock.sleeps.append(seconds)
+        clock.now += seconds
+
+    monkeypatch.setattr(api_cache, 'time', types.SimpleNamespace(
+        time=lambda: clock.now, sleep=sleep, perf_counter=lambda: clock.now
+    ))
+    return clock
+
+
+def counter(value):
+    """A fetch function that returns value and counts its calls."""
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return value
+    return fetch, calls
+
+
+@pytest.fixture
+def sqlite_path(tmp_path):
+    return str(tmp_path / 'api_cache.sqlite3')
+
+
+def test_lease_timeout_fetches_without_releasing_the_holders_lease(clock, sqlite_path):
+    other_process = SQLiteBackend(sqlite_path)
+    cache = ApiCache(SQLiteBackend(sqlite_path), lease_timeout=2)
+    key = cache.make_key('strava.athlete', 'token')
+    # another process holds the lease for longer than we are willing to wait
+    assert other_process.acquire_lease(key, ttl=60)
+
+    fetch, calls = counter({'id': 1})
+    assert cache.get_or_fetch('strava.athlete', fetch, owner='token') == {'id': 1}
+    assert len(calls) == 1
+    assert 2 < sum(clock.sleeps) < 2.2
+    # the holder's lease is still in place
+    assert not other_process.acquire_lease(key, ttl=60)
+
+
+def test_lease_holder_filling_the_cache_is_a_hit(clock, sqlite_path):
+    other_process = SQLiteBackend(sqlite_path)
+    cache = ApiCache(SQLiteBackend(sqlite_path), lease_timeout=5)
+    key = cache.make_key('strava.athlete', 'token')
+    assert other_process.acquire_lease(key, ttl=60)
+
+    sleep = api_cache.time.sleep
+
+    def holder_finishes(seconds):
+        other_process.set(key, {'id': 2}, ttl=60)
+        other_process.release_lease(key)
+        sleep(seconds)
+
+    api_cache.time.sleep = holder_finishes
+    fetch, calls = counter({'id': 1})
+    assert cache.get_or_fetch('strava.athlete', fetch, owner='token') == {'id': 2}
+    assert calls == []
+
+
+@pytest.mark.parametrize('backend', ['memory', 'sqlite'])
+def test_callers_get_their_own_copy(backend, sqlite_path):
+    cache = ApiCache(MemoryBackend() if backend == 'memory' else SQLiteBackend(sqlite_path))
+    fetched = [{'id': 1, 'name': 'Morning Run'}]
+    first = cache.get_or_fetch('strava.all_activities', lambda: fetched)
+    first.append({'id': 2})
+    fetched[0]['name'] = 'changed'
+
+    second = cache.get_or_fetch('strava.all_activities', lambda: pytest.fail('should be cached'))
+    assert second == [{'id': 1, 'name': 'Morning Run'}]
+    second[0]['name'] = 'changed again'
+    assert cache.get_or_fetch('strava.all_activities', lambda: None)[0]['name'] == 'Morning Run'
+
+
+def test_entries_expire_after_their_ttl(clock):
+    cache = ApiCache(MemoryBackend(), ttls={'strava.athlete': 10})
+    fetch, calls = counter({'id': 1})
+    cache.get_or_fetch('strava.athlete', fetch)
+    clock.now += 9
+    cache.get_or_fetch('strava.athlete', fetch)
+    assert len(calls) == 1
+    clock.now += 2
+    cache.get_or_fetch('strava.athlete', fetch)
+    assert len(calls) == 2
+    assert cache.stats()['strava.athlete']['hits'] == 1
+
+
+def test_sqlite_entries_expire_after_their_ttl(clock, sqlite_path):
+    cache = ApiCache(SQLiteBackend(sqlite_path))
+    fetch, calls = counter({'id': 1})
+    cache.get_or_fetch('strava.athlete', fetch, ttl=10)
+    clock.now += 11
+    cache.get_or_fetch('strava.athlete', fetch, ttl=10)
+    assert len(calls) == 2
+
+
+def test_memory_backend_evicts_least_recently_used():
+    backend = MemoryBackend(maxsize=2)
+    backend.set('a', 1, ttl=60)
+    backend.set('b', 2, ttl=60)
+    assert backend.get('a') == (True, 1)
+    backend.set('c', 3, ttl=60)
+    assert backend.get('b') == (False, None)
+    assert backend.get('a') == (True, 1)
+    assert backend.get('c') == (True, 3)
+
+
+class CountingEvent(threading.Event):
+    """An Event that counts the threads that have started waiting on it."""
+
+    def __init__(self, waiting):
+        super().__init__()
+        self.waiting = waiting
+
+    def wait(self, timeout=None):
+        with self.waiting:
+            self.waiting.count += 1
+            self.waiting.notify_all()
+        return super().wait(timeout)
+
+
+def concurrent_misses(cache, fetch, monkeypatch, threads=8):
+    """
+    get_or_fetch for one key from many threads. The first fetch is held open until
+    every other thread is waiting on it, so none of them arrives after it finished.
+    """
+    waiting = threading.Condition()
+    waiting.count = 0
+
+    class CountedFlight(api_cache._Flight):
+        def __init__(self):
+            super().__init__()
+            self.done = CountingEvent(waiting)
+
+    monkeypatch.setattr(api_cache, '_Flight', CountedFlight)
+
+    def held():
+        with waiting:
+            waiting.wait_for(lambda: waiting.count == threads - 1, timeout=5)
+        return fetch()
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        futures = [pool.submit(cache.get_or_fetch, 'strava.athlete', held, owner='token') for _ in range(threads)]
+        return [future.exception() or future.result() for future in futures]
+
+
+def test_concurrent_misses_fetch_once(monkeypatch):
+    cache = ApiCache(MemoryBackend())
+    fetch, calls = counter({'id': 1})
+    assert concurrent_misses(cache, fetch, monkeypatch) == [{'id': 1}] * 8
+    assert len(calls) == 1
+
+
+def test_concurrent_misses_share_a_failed_fetch(monkeypatch):
+    cache = ApiCache(MemoryBackend())
+    calls = []
+
+    def failing():
+        calls.append(1)
+        raise ConnectionError('upstream down')
+
+    outcomes = concurrent_misses(cache, failing, monkeypatch)
+    assert len(calls) == 1
+    assert all(isinstance(outcome, ConnectionError) for outcome in outcomes)
+
+    # a fetch returning None is a failure too: shared, and not cached
+    fetch, calls = counter(None)
+    assert concurrent_misses(cache, fetch, monkeypatch) == [None] * 8
+    assert len(calls) == 1
+    fetch, calls = counter({'id': 1})
+    assert cache.get_or_fetch('strava.athlete', fetch, owner='token') == {'id': 1}
+
+
+def test_sqlite_cache_is_shared_between_instances(sqlite_path):
+    first, second = ApiCache(SQLiteBackend(sqlite_path)), ApiCache(SQLiteBackend(sqlite_path))
+    value = {'id': 1, 'tracks': ['a', 'b']}
+    fetch, calls = counter(value)
+    assert first.get_or_fetch('spotify.top_tracks', fetch, owner='token', params={'limit': 2}) == value
+    assert second.get_or_fetch('spotify.top_tracks', fetch, owner='token', params={'limit': 2}) == value
+    assert len(calls) == 1
+    # other owners and params are separate entries
+    second.get_or_fetch('spotify.top_tracks', fetch, owner='other', params={'limit': 2})
+    second.get_or_fetch('spotify.top_tracks', fetch, owner='token', params={'limit': 5})
+    assert len(calls) == 3
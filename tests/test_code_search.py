@@ -0,0 +1,60 @@
+import hashlib
+
+import pytest
+
+from app.tools.code_search import CodeSearch, estimate_tokens
+from app.tools.codebase_index import CodebaseIndex
+
+MODULES = {
+    'alpha.py': 'import os\n\nLIMIT = 10\n\n\ndef fetch_pages(url):\n    return [url] * LIMIT\n',
+    'beta.py': 'import json\n\n\nclass Parser:\n    def parse(self, text):\n        return json.loads(text)\n',
+    'pkg/gamma.py': 'RETRIES = 3\n\n\ndef backoff(attempt):\n    return 2 ** attempt\n' + '# padding\n' * 200,
+}
+
+
+@pytest.fixture
+def search(tmp_path):
+    root = tmp_path / 'repo'
+    for path, text in MODULES.items():
+        (root / path).parent.mkdir(parents=True, exist_ok=True)
+        (root / path).write_text(text)
+    return CodeSearch(CodebaseIndex(root, path=str(tmp_path / 'index.sqlite3')))
+
+
+def test_matching_query_selects_its_chunk(search):
+    context = search.context('parse json text', 150)
+    assert estimate_tokens(context) <= 150
+    assert 'class Parser' in context
+
+
+def test_unmatched_query_falls_back_to_module_code(search):
+    budget = 150
+    search.refresh()
+    assert estimate_tokens(search.index.text()) > budget
+    assert search.search('zebra quokka') == []
+
+    context = search.context('zebra quokka', budget)
+    assert estimate_tokens(context) <= budget
+    # every file's imports and constants come before any definition
+    for line in ('import os', 'import json', 'RETRIES = 3'):
+        assert line in context
+
+
+def test_refresh_records_the_hash_of_what_it_chunked(search, monkeypatch):
+    root = search.index.root
+    search.index.refresh()
+    # the file changes after the index hashed it but before it is chunked
+    new_text = MODULES['alpha.py'].replace('fetch_pages', 'download_pages')
+    with open(f'{root}/alpha.py', 'w') as f:
+        f.write(new_text)
+    refresh = search.index.refresh
+    monkeypatch.setattr(search.index, 'refresh', lambda: None)
+    search.refresh()
+    assert search._file_chunks['alpha.py'][0] == hashlib.sha256(new_text.encode()).hexdigest()
+    assert search.search('download')
+
+    # once the index catches up there is nothing left to re-chunk
+    monkeypatch.setattr(search.index, 'refresh', refresh)
+    assert search.refresh() == []
+    reloaded = CodeSearch(CodebaseIndex(root, path=str(search.path)))
+    assert reloaded.refresh() == []
@@ -0,0 +1,55 @@
+import gzip
+
+import pytest
+from flask import Flask, send_file
+
+from app.tools import compression
+from app.tools.compression import accepted_encoding
+
+
+def test_malformed_q_value_skips_the_coding():
+    assert accepted_encoding('gzip;q=abc') is None
+    assert accepted_encoding('gzip;q=abc, *;q=0') is None
+
+
+def test_malformed_q_value_does_not_hide_other_codings(monkeypatch):
+    monkeypatch.setattr(compression, 'brotli', None)
+    assert accepted_encoding('br;q=oops, gzip') == 'gzip'
+
+
+def test_zero_and_positive_weights():
+    assert accepted_encoding('gzip;q=0') is None
+    assert accepted_encoding('gzip;q=0.5') == 'gzip'
+
+
+def test_explicit_refusal_overrides_wildcard(monkeypatch):
+    monkeypatch.setattr(compression, 'brotli', None)
+    assert accepted_encoding('gzip;q=0, *') is None
+    assert accepted_encoding('*, gzip;q=0') is None
+    assert accepted_encoding('br, *;q=0') is None
+    assert accepted_encoding('*') == 'gzip'
+
+
+def test_wildcard_still_offers_brotli_when_gzip_is_refused():
+    if compression.brotli is None:
+        pytest.skip('brotli not installed')
+    assert accepted_encoding('gzip;q=0, *') == 'br'
+
+
+def test_compressing_send_file_closes_the_file(tmp_path):
+    path = tmp_path / 'body.txt'
+    path.write_text('sphere ' * 1000)
+    opened = []
+
+    server = Flask(__name__)
+    compression.init_compression(server, min_size=0)
+
+    @server.route('/file')
+    def serve_file():
+        opened.append(open(path, 'rb'))
+        return send_file(opened[0], mimetype='text/plain')
+
+    response = server.test_client().get('/file', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(response.data) == path.read_bytes()
+    assert opened[0].closed
@@ -0,0 +1,129 @@
+import subprocess
+import sys
+import types
+from pathlib import Path
+
+import pytest
+from flask import Flask
+
+from app.pages import art
+from app.tools.content_cache import ContentAddressedCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ContentAddressedCache(tmp_path / 'cache', max_bytes=1024, suffix='.svg')
+
+
+def writer(data, calls):
+    def write(f):
+        calls.append(1)
+        f.write(data)
+    return write
+
+
+def test_open_handle_survives_eviction(cache):
+    calls = []
+    with cache.open_or_create('ab' * 32, writer(b'<svg/>', calls)) as f:
+        cache.clear()
+        assert f.read() == b'<svg/>'
+    assert calls == [1]
+
+
+def test_entry_evicted_before_opening_is_produced_again(cache, monkeypatch):
+    calls, key = [], 'cd' * 32
+    get_or_create = cache.get_or_create
+
+    def evicted_once(key, write):
+        path = get_or_create(key, write)
+        if len(calls) == 1:
+            path.unlink()
+        return path
+
+    monkeypatch.setattr(cache, 'get_or_create', evicted_once)
+    with cache.open_or_create(key, writer(b'<svg/>', calls)) as f:
+        assert f.read() == b'<svg/>'
+    assert len(calls) == 2
+    assert cache.path_for(key).exists()
+
+
+def test_entry_that_keeps_disappearing_is_served_from_memory(cache, monkeypatch):
+    calls = []
+    get_or_create = cache.get_or_create
+
+    def always_evicted(key, write):
+        path = get_or_create(key, write)
+        path.unlink()
+        return path
+
+    monkeypatch.setattr(cache, 'get_or_create', always_evicted)
+    with cache.open_or_create('ef' * 32, writer(b'<svg/>', calls)) as f:
+        assert f.read() == b'<svg/>'
+    assert len(calls) == 3
+
+
+@pytest.fixture
+def art_client(tmp_path, monkeypatch):
+    monkeypatch.setattr(art, '_art_cache', ContentAddressedCache(tmp_path / 'art', suffix='.svg'))
+    server = Flask(__name__)
+    art.register_art_routes(types.SimpleNamespace(server=server))
+    return server.test_client()
+
+
+def test_art_route_serves_and_revalidates(art_client):
+    response = art_client.get('/art/sphere-slices.svg?slices=4&points=8')
+    assert response.status_code == 200
+    assert response.mimetype == 'image/svg+xml'
+    assert response.data.startswith(b'<?xml')
+    assert int(response.headers['Content-Length']) == len(response.data)
+    etag = response.headers['ETag']
+
+    assert art_client.get('/art/sphere-slices.svg?slices=4&points=8',
+                          headers={'If-None-Match': etag}).status_code == 304
+    # evicted between requests: rendered again rather than a 500
+    art.get_art_cache().clear()
+    assert art_client.get('/art/sphere-slices.svg?slices=4&points=8').data == response.data
+    assert art_client.get('/art/nope.svg').status_code == 404
+
+
+def count_renders(monkeypatch):
+    renders = []
+    scene = art.SCENES['sphere-slices']
+
+    def render(**params):
+        renders.append(params)
+        return scene.render(**params)
+
+    monkeypatch.setitem(art.SCENES, 'sphere-slices', art.Scene(render, scene.params))
+    return renders
+
+
+def test_matching_etag_gets_304_without_rendering(art_client, monkeypatch):
+    url = '/art/sphere-slices.svg?slices=4&points=8'
+    etag = art_client.get(url).headers['ETag']
+    art.get_art_cache().clear()
+    renders = count_renders(monkeypatch)
+
+    response = art_client.get(url, headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.headers['ETag'] == etag
+    assert response.cache_control.max_age == art.ART_MAX_AGE
+    assert renders == []
+
+
+def test_rotations_are_quantized_before_rendering(art_client, monkeypatch):
+    renders = count_renders(monkeypatch)
+    etags = {
+        art_client.get(f'/art/sphere-slices.svg?slices=4&points=8&rot_x={rot_x}').headers['ETag']
+        for rot_x in ('0.1', '0.10001', '0.09999', '0.1000000001')
+    }
+    assert len(etags) == 1
+    assert [params['rot_x'] for params in renders] == [0.1]
+    art_client.get('/art/sphere-slices.svg?slices=4&points=8&rot_x=0.2')
+    assert len(renders) == 2
+
+
+def test_registering_art_routes_does_not_load_numpy():
+    code = ('import sys; from app.app import init_app; init_app(); '
+            'assert "numpy" not in sys.modules, "numpy loaded at init_app"')
+    subprocess.run([sys.executable, '-c', code], check=True, cwd=Path(__file__).resolve().parent.parent)
@@ -0,0 +1,188 @@
+import base64
+import hashlib
+import json
+
+import pytest
+import requests
+
+from app.tools import githubAPI
+from app.tools.githubAPI import GithubAPI, GithubCache, git_blob_sha
+from tests.stub_server import StubServer
+
+OWNER, REPO = 'octo', 'portfolio'
+FILES = {
+    'main.py': 'print("hi")\n',
+    'app/style.css': 'body { color: #fff; }\n',
+    'app/tools/util.py': '# naïve café ünïcode\n' * 10,
+    'README.md': '# not a target\n',
+    'app/data.json': '{}\n',
+}
+TARGETS = {path: text for path, text in FILES.items() if path.endswith(('.py', '.css'))}
+
+
+def encode(text):
+    # GitHub wraps base64 content at 60 characters
+    data = base64.b64encode(text.encode('utf-8')).decode()
+    return '\n'.join(data[i:i + 60] for i in range(0, len(data), 60)) + '\n'
+
+
+class FakeGithub:
+    """git trees, git blobs and contents endpoints over FILES, with ETags and injectable failures."""
+
+    def __init__(self, files):
+        self.files = files
+        self.base_url = None  # the stub server's, for the file urls in contents listings
+        self.truncated = False
+        self.errors = {}  # path -> status
+        self.content_overrides = {}  # sha -> text served instead
+
+    def sha(self, path):
+        return git_blob_sha(self.files[path].encode('utf-8'))
+
+    def __call__(self, request):
+        path = request['path']
+        if path in self.errors:
+            return self.errors[path], {}, {'message': 'error'}
+        prefix = f'/repos/{OWNER}/{REPO}/'
+        kind, _, rest = path[len(prefix):].partition('/')
+        if kind == 'git' and rest.startswith('trees/'):
+            return self.listing(request, {'tree': self.tree(), 'truncated': self.truncated})
+        if kind == 'git' and rest.startswith('blobs/'):
+            sha = rest[len('blobs/'):]
+            texts = {self.sha(p): t for p, t in self.files.items()}
+            if sha not in texts:
+                return 404, {}, {'message': 'Not Found'}
+            return 200, {}, {'sha': sha, 'encoding': 'base64',
+                             'content': encode(self.content_overrides.get(sha, texts[sha]))}
+        if kind == 'contents':
+            return self.listing(request, self.contents(rest))
+        return 404, {}, {'message': 'Not Found'}
+
+    def listing(self, request, body):
+        etag = f'"{hashlib.sha1(json.dumps(body).encode()).hexdigest()}"'
+        if request['headers'].get('If-None-Match') == etag:
+            return 304, {'ETag': etag}, b''
+        return 200, {'ETag': etag}, body
+
+    def tree(self):
+        entries, dirs = [], set()
+        for path in self.files:
+            parts = path.split('/')
+            dirs.update('/'.join(parts[:i]) for i in range(1, len(parts)))
+            entries.append({'path': path, 'type': 'blob', 'sha': self.sha(path)})
+        entries += [{'path': d, 'type': 'tree', 'sha': 'dir'} for d in dirs]
+        return sorted(entries, key=lambda e: e['path'])
+
+    def contents(self, directory):
+        if directory in self.files:
+            return {'name': directory.rsplit('/', 1)[-1], 'path': directory, 'type': 'file',
+                    'sha': self.sha(directory), 'content': encode(self.files[directory])}
+        items = {}
+        for path in self.files:
+            if directory and not path.startswith(directory + '/'):
+                continue
+            child = path[len(directory) + 1 if directory else 0:].split('/')[0]
+            child_path = f'{directory}/{child}' if directory else child
+            if child_path in self.files:
+                items[child] = {'name': child, 'path': child_path, 'type': 'file', 'sha': self.sha(child_path),
+                                'url': f'{self.base_url}/repos/{OWNER}/{REPO}/contents/{child_path}'}
+            else:
+                items[child] = {'name': child, 'path': child_path, 'type': 'dir'}
+        return list(items.values())
+
+
+@pytest.fixture
+def github(tmp_path, monkeypatch, no_retry_client):
+    """A GithubAPI pointed at a fresh FakeGithub, with its disk cache in tmp_path."""
+    monkeypatch.setattr(githubAPI, '_github_cache', GithubCache(tmp_path / 'github', max_bytes=1024 * 1024))
+    monkeypatch.setenv('GITHUB_ACCESS_TOKEN', '')
+    fake = FakeGithub(dict(FILES))
+    with StubServer(fake) as server:
+        fake.base_url = server.url
+        api = GithubAPI()
+        api.repo_url = f'https://github.com/{OWNER}/{REPO}'
+        api.base_url = server.url
+        yield api, fake, server
+
+
+def blob_requests(server):
+    return [r['path'].rsplit('/', 1)[-1] for r in server.requests if '/git/blobs/' in r['path']]
+
+
+def test_tree_maps_target_blobs_to_decoded_contents(github):
+    api, fake, server = github
+    assert dict(api.fetch_target_files()) == TARGETS
+    # one tree request, then exactly the target blobs by the shas the tree gave
+    assert sum('/git/trees/' in r['path'] for r in server.requests) == 1
+    assert server.requests[0]['query'] == {'recursive': '1'}
+    assert sorted(blob_requests(server)) == sorted(fake.sha(path) for path in TARGETS)
+
+
+def test_warm_tree_fetch_revalidates_and_reads_blobs_from_disk(github):
+    api, fake, server = github
+    api.fetch_target_files()
+    githubAPI.get_api_cache().clear()
+    del server.requests[:]
+
+    assert dict(api.fetch_target_files()) == TARGETS
+    assert len(server.requests) == 1
+    assert server.requests[0]['headers'].get('If-None-Match')
+
+
+def test_truncated_tree_falls_back_to_contents(github):
+    api, fake, server = github
+    fake.truncated = True
+    assert dict(api.fetch_target_files()) == TARGETS
+    assert any('/contents/' in r['path'] for r in server.requests)
+    assert blob_requests(server) == []
+
+
+def test_failed_tree_listing_falls_back_to_contents(github):
+    api, fake, server = github
+    fake.errors[f'/repos/{OWNER}/{REPO}/git/trees/HEAD'] = 500
+    assert dict(api.fetch_target_files()) == TARGETS
+
+
+def test_failed_blob_is_skipped_and_not_cached(github):
+    api, fake, server = github
+    failing = f"/repos/{OWNER}/{REPO}/git/blobs/{fake.sha('main.py')}"
+    fake.errors[failing] = 502
+    files = dict(api.fetch_target_files())
+    assert 'main.py' not in files
+    assert files == {path: text for path, text in TARGETS.items() if path != 'main.py'}
+
+    # the next fetch downloads only the blob that failed
+    del fake.errors[failing]
+    githubAPI.get_api_cache().clear()
+    del server.requests[:]
+    assert dict(api.fetch_target_files()) == TARGETS
+    assert blob_requests(server) == [fake.sha('main.py')]
+
+
+def test_blob_not_matching_its_sha_is_not_cached(github):
+    api, fake, server = github
+    sha = fake.sha('main.py')
+    fake.content_overrides[sha] = 'tampered\n'
+    assert api.get_blob_content(OWNER, REPO, sha) == 'tampered\n'
+    assert githubAPI.get_github_cache().blobs.get(sha) is None
+
+    del fake.content_overrides[sha]
+    assert api.get_blob_content(OWNER, REPO, sha) == FILES['main.py']
+    assert githubAPI.get_github_cache().blobs.get(sha) is not None
+
+
+def test_http_errors_propagate(github):
+    api, fake, server = github
+    with pytest.raises(requests.HTTPError) as error:
+        api.get_blob_content(OWNER, REPO, '0' * 40)
+    assert error.value.response.status_code == 404
+
+    fake.errors[f'/repos/{OWNER}/{REPO}/git/trees/main'] = 500
+    with pytest.raises(requests.HTTPError):
+        api.get_tree(OWNER, REPO, 'main')
+    # the failure is not cached
+    del fake.errors[f'/repos/{OWNER}/{REPO}/git/trees/main']
+    assert api.get_tree(OWNER, REPO, 'main')['truncated'] is False
+
+    with pytest.raises(ValueError, match='Unknown fetch mode'):
+        api.fetch_target_files(mode='graphql')
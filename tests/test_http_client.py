@@ -0,0 +1,79 @@
+import time
+import types
+
+import pytest
+import requests
+import urllib3.util.retry
+
+from app.tools.http_client import HttpClient
+from tests.stub_server import StubServer
+
+
+@pytest.fixture
+def retry_sleeps(monkeypatch):
+    """The sleeps urllib3 asks for between attempts, recorded instead of slept."""
+    sleeps = []
+    monkeypatch.setattr(urllib3.util.retry, 'time', types.SimpleNamespace(sleep=sleeps.append, time=time.time))
+    return sleeps
+
+
+def responses(*replies):
+    """A stub responder giving each reply in turn, then repeating the last one."""
+    replies = list(replies)
+
+    def respond(request):
+        return replies.pop(0) if len(replies) > 1 else replies[0]
+    return respond
+
+
+def test_429_is_retried_after_retry_after_on_the_same_connection(retry_sleeps):
+    client = HttpClient(retries=3, timeout=5)
+    respond = responses((429, {'Retry-After': '1'}, b'slow down'), (200, {}, {'ok': True}))
+    with StubServer(respond) as server:
+        response = client.get(f'{server.url}/thing')
+        assert response.status_code == 200
+        assert response.json() == {'ok': True}
+        assert len(server.requests) == 2
+        assert retry_sleeps == [1.0]
+        # the retry went over the kept-alive connection of the first attempt
+        assert server.requests[0]['client_port'] == server.requests[1]['client_port']
+
+        client.get(f'{server.url}/thing')
+        assert len({r['client_port'] for r in server.requests}) == 1
+    client.close()
+
+
+def test_retry_after_is_capped(retry_sleeps):
+    client = HttpClient(retries=1, timeout=5)
+    respond = responses((429, {'Retry-After': '3600'}, b''), (200, {}, b'done'))
+    with StubServer(respond) as server:
+        assert client.get(server.url).status_code == 200
+    assert retry_sleeps == [30]
+    client.close()
+
+
+def test_gives_up_with_the_last_response(retry_sleeps):
+    client = HttpClient(retries=2, timeout=5, backoff_factor=0.5)
+    with StubServer(responses((503, {}, b'down'))) as server:
+        response = client.get(server.url)
+        assert response.status_code == 503
+        assert len(server.requests) == 3
+    # exponential backoff: urllib3 retries the first failure at once
+    assert retry_sleeps == [1.0]
+    assert client.stats()[server.url.split('//')[1]]['errors'] == 1
+    client.close()
+
+
+def test_read_timeout_raises():
+    client = HttpClient(retries=0, timeout=(1, 0.1))
+
+    def slow(request):
+        time.sleep(0.5)
+        return 200, {}, b'late'
+
+    with StubServer(slow) as server:
+        # a read timeout surfaces as ConnectionError once the retries are used up
+        with pytest.raises(requests.exceptions.ConnectionError, match='Read timed out'):
+            client.get(server.url)
+    assert client.timings[-1].status is None
+    client.close()
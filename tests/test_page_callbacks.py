@@ -0,0 +1,42 @@
+import pytest
+from dash import _callback
+
+from app.app import init_app
+
+PATHS = ['/', '/visualArt/sphere', '/projects/spotify', '/visualArt/sphere', '/about', '/projects/strava', '/nowhere']
+
+
+@pytest.fixture(scope='module')
+def app():
+    return init_app()
+
+
+def navigate(client, pathname):
+    """What the browser sends when dcc.Location changes: the page-content callback."""
+    return client.post('/_dash-update-component', json={
+        'output': 'page-content.children',
+        'outputs': {'id': 'page-content', 'property': 'children'},
+        'inputs': [{'id': 'url', 'property': 'pathname', 'value': pathname}],
+        'changedPropIds': ['url.pathname'],
+    })
+
+
+def test_navigation_registers_no_callbacks(app):
+    client = app.server.test_client()
+    callbacks = len(app.callback_map)
+    pending = len(_callback.GLOBAL_CALLBACK_LIST)
+
+    for _ in range(3):
+        for pathname in PATHS:
+            response = navigate(client, pathname)
+            assert response.status_code == 200, pathname
+            assert client.get(pathname).status_code == 200
+            assert len(app.callback_map) == callbacks, f"callbacks registered rendering {pathname}"
+    assert len(_callback.GLOBAL_CALLBACK_LIST) == pending
+
+
+def test_pages_render_the_same_every_time(app):
+    client = app.server.test_client()
+    first = {pathname: navigate(client, pathname).get_json() for pathname in PATHS}
+    for pathname in PATHS:
+        assert navigate(client, pathname).get_json() == first[pathname]
@@ -0,0 +1,58 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.components.sphere_renderer import FrameCache, generate_sphere_points
+
+
+def counting(cache, fail_first=False):
+    """Wrap cache._render to count renders, hold them until released, and optionally fail once."""
+    render = cache._render
+    calls, started, release = [], threading.Event(), threading.Event()
+
+    def wrapped(rotation):
+        calls.append(rotation)
+        started.set()
+        release.wait(5)
+        if fail_first and len(calls) == 1:
+            raise RuntimeError('render failed')
+        return render(rotation)
+
+    cache._render = wrapped
+    return calls, started, release
+
+
+@pytest.mark.parametrize('trace_layout', ['slices', 'single'])
+def test_concurrent_misses_render_once(trace_layout):
+    cache = FrameCache(generate_sphere_points(10, 20), trace_layout=trace_layout)
+    calls, started, release = counting(cache)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futures = [pool.submit(cache.get, [0.5, 1.0, 0.3]) for _ in range(8)]
+        started.wait(5)
+        release.set()
+        frames = [future.result() for future in futures]
+    assert len(calls) == 1
+    assert all(frame is frames[0] for frame in frames)
+    assert cache.stats()['misses'] == 1
+    assert cache.stats()['hits'] == 7
+
+
+def test_failed_render_is_retried_by_a_waiter():
+    cache = FrameCache(generate_sphere_points(10, 20))
+    calls, started, release = counting(cache, fail_first=True)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(cache.get, [0.1, 0.2, 0.3]) for _ in range(4)]
+        started.wait(5)
+        release.set()
+        outcomes = [future.exception() for future in futures]
+    assert sum(isinstance(e, RuntimeError) for e in outcomes) == 1
+    assert cache.stats()['size'] == 1
+    assert not cache._inflight
+
+
+def test_nearby_rotations_share_a_frame():
+    cache = FrameCache(generate_sphere_points(10, 20))
+    first = cache.get([0.5, 1.0, 0.3])
+    assert cache.get([0.5 + 1e-6, 1.0, 0.3]) is first
+    assert cache.get([0.5 + 2 * 3.141592653589793, 1.0, 0.3]) is first
@@ -0,0 +1,148 @@
+import types
+from datetime import datetime, timezone
+
+import pytest
+
+from app.tools import stravaAPI
+from app.tools.stravaAPI import MAX_PER_PAGE, ActivityFetchError, Strava
+from tests.stub_server import StubServer
+
+
+def make_activities(count):
+    return [{'id': i, 'name': f'Run {i}', 'start_date': f'2024-01-01T00:00:{i % 60:02d}Z'} for i in range(count)]
+
+
+class FakeStrava:
+    """/athlete/activities over a fixed list, with failing pages and rate-limit usage per page."""
+
+    def __init__(self, activities, failing_pages=(), usage=lambda page: (1, 1), limits=(600, 30000)):
+        self.activities = activities
+        self.failing_pages = set(failing_pages)
+        self.usage = usage
+        self.limits = limits
+
+    def __call__(self, request):
+        page = int(request['query'].get('page', 1))
+        per_page = int(request['query'].get('per_page', 30))
+        headers = {
+            'X-RateLimit-Limit': ','.join(map(str, self.limits)),
+            'X-RateLimit-Usage': ','.join(map(str, self.usage(page))),
+        }
+        if page in self.failing_pages:
+            return 503, headers, {'message': 'unavailable'}
+        return 200, headers, self.activities[(page - 1) * per_page:page * per_page]
+
+
+@pytest.fixture
+def fake_time(monkeypatch):
+    """A frozen clock for get_all_activities that records its sleeps instead of sleeping."""
+    clock = types.SimpleNamespace(now=datetime(2024, 1, 1, 10, 7, 30, tzinfo=timezone.utc), sleeps=[])
+    monkeypatch.setattr(stravaAPI, 'time', types.SimpleNamespace(
+        time=lambda: clock.now.timestamp(), sleep=clock.sleeps.append
+    ))
+    return clock
+
+
+def strava_for(server):
+    strava = Strava()
+    strava.base_url = server.url
+    return strava
+
+
+def pages_requested(server):
+    return sorted(int(r['query']['page']) for r in server.requests)
+
+
+@pytest.mark.parametrize('count, expected_pages', [
+    (MAX_PER_PAGE * 2 + 50, [1, 2, 3]),       # full pages, then a short last page
+    (MAX_PER_PAGE * 2, [1, 2, 3]),            # exact multiple: an empty page ends it
+    (30, [1]),                                # one short page
+])
+def test_all_pages_in_order(no_retry_client, count, expected_pages):
+    activities = make_activities(count)
+    with StubServer(FakeStrava(activities)) as server:
+        result = strava_for(server).get_all_activities('token', concurrency=1)
+        assert result == activities
+        assert pages_requested(server) == expected_pages
+
+
+def test_concurrent_pages_are_complete_and_ordered(no_retry_client):
+    activities = make_activities(MAX_PER_PAGE * 6 + 17)
+    with StubServer(FakeStrava(activities)) as server:
+        result = strava_for(server).get_all_activities('token', concurrency=4)
+    assert [a['id'] for a in result] == list(range(len(activities)))
+
+
+def test_failed_middle_page_raises_and_is_not_cached(no_retry_client):
+    activities = make_activities(MAX_PER_PAGE * 4 + 10)
+    fake = FakeStrava(activities, failing_pages={3})
+    with StubServer(fake) as server:
+        strava = strava_for(server)
+        with pytest.raises(ActivityFetchError) as error:
+            strava.get_all_activities('token', concurrency=4)
+        assert error.value.page == 3
+        assert error.value.status == 503
+        # the pages before the failure, in order
+        assert error.value.activities == activities[:MAX_PER_PAGE * 2]
+
+        # the failure was not cached as the full history
+        fake.failing_pages.clear()
+        assert strava.get_all_activities('token', concurrency=4) == activities
+
+
+def test_failed_first_page_raises(no_retry_client):
+    with StubServer(FakeStrava(make_activities(10), failing_pages={1})) as server:
+        with pytest.raises(ActivityFetchError) as error:
+            strava_for(server).get_all_activities('token')
+    assert error.value.page == 1
+    assert error.value.activities == []
+
+
+def test_low_headroom_caps_pages_in_flight(no_retry_client, fake_time):
+    activities = make_activities(MAX_PER_PAGE * 6 + 5)
+    # two requests left in the 15 minute window after every response
+    fake = FakeStrava(activities, usage=lambda page: (598, 1000))
+    with StubServer(fake) as server:
+        result = strava_for(server).get_all_activities('token', concurrency=4)
+        assert result == activities
+        assert server.max_in_flight <= 2
+    assert fake_time.sleeps == []
+
+
+def test_exhausted_window_waits_for_a_reset_seconds_away(no_retry_client, fake_time):
+    fake_time.now = datetime(2024, 1, 1, 10, 14, 57, tzinfo=timezone.utc)
+    activities = make_activities(MAX_PER_PAGE * 2 + 5)
+    # page 1 uses up the 15 minute window; later responses come from the next window
+    fake = FakeStrava(activities, usage=lambda page: (600, 1000) if page == 1 else (page, 1000))
+    with StubServer(fake) as server:
+        result = strava_for(server).get_all_activities('token', concurrency=4)
+        assert result == activities
+        # one page probes the new window before fetching concurrently again
+        assert [r['query']['page'] for r in server.requests[:2]] == ['1', '2']
+    # 10:14:57 -> the window resets at 10:15:00
+    assert fake_time.sleeps == [3.0]
+
+
+def test_exhausted_window_far_from_reset_raises(no_retry_client, fake_time):
+    activities = make_activities(MAX_PER_PAGE * 2 + 5)
+    fake = FakeStrava(activities, usage=lambda page: (600, 1000))
+    with StubServer(fake) as server:
+        with pytest.raises(ActivityFetchError) as error:
+            strava_for(server).get_all_activities('token')
+        assert pages_requested(server) == [1]
+    # 10:07:30 is 450s from the reset: a request doesn't wait that long
+    assert error.value.status == 429
+    assert error.value.activities == activities[:MAX_PER_PAGE]
+    assert fake_time.sleeps == []
+
+
+def test_exhausted_daily_limit_raises(no_retry_client, fake_time):
+    activities = make_activities(MAX_PER_PAGE + 5)
+    fake = FakeStrava(activities, usage=lambda page: (10, 30000))
+    with StubServer(fake) as server:
+        with pytest.raises(ActivityFetchError) as error:
+            strava_for(server).get_all_activities('token')
+        assert pages_requested(server) == [1]
+    assert error.value.page == 2
+    assert error.value.activities == activities[:MAX_PER_PAGE]
+    assert fake_time.sleeps == []
@@ -0,0 +1,61 @@
+import io
+import json
+
+import numpy as np
+
+from app.tools.stravaAPI import decode_streams
+
+
+def decode(body):
+    return decode_streams(io.BytesIO(json.dumps(body).encode()))
+
+
+def test_streams_decode_to_arrays():
+    streams = decode({
+        'latlng': {'data': [[51.5, -0.1], [51.6, -0.2]], 'series_type': 'distance', 'original_size': 2},
+        'heartrate': {'data': [120, 125.5], 'resolution': 'high'},
+        'moving': {'data': [True, False]},
+    })
+    assert streams['latlng']['data'].shape == (2, 2)
+    np.testing.assert_array_equal(streams['heartrate']['data'], [120, 125.5])
+    np.testing.assert_array_equal(streams['moving']['data'], [1, 0])
+    assert streams['latlng']['series_type'] == 'distance'
+    assert streams['heartrate']['resolution'] == 'high'
+
+
+def test_bad_samples_become_nan_and_keep_alignment():
+    streams = decode({
+        'latlng': {'data': [[51.5, -0.1], None, [None, -0.2], [51.7, -0.3]]},
+        'heartrate': {'data': [120, None, 'n/a', '130']},
+        'altitude': {'data': [10.0, 11.0, 12.0, 13.0], 'series_type': None},
+    })
+    latlng = streams['latlng']['data']
+    assert latlng.shape == (4, 2)
+    assert np.isnan(latlng[1]).all() and np.isnan(latlng[2, 0])
+    np.testing.assert_array_equal(latlng[3], [51.7, -0.3])
+
+    heartrate = streams['heartrate']['data']
+    assert len(heartrate) == len(streams['altitude']['data']) == 4
+    np.testing.assert_array_equal(heartrate, [120, np.nan, np.nan, 130])
+    assert 'series_type' not in streams['altitude']
+
+
+def test_empty_and_missing_stream_arrays_give_empty_data():
+    streams = decode({
+        'latlng': {'data': [], 'series_type': 'distance'},
+        'heartrate': {'series_type': 'distance'},
+        'altitude': {'data': None},
+        'time': {},
+    })
+    assert streams['latlng']['data'].shape == (0, 2)
+    assert streams['latlng']['series_type'] == 'distance'
+    for stream_type in ('heartrate', 'altitude', 'time'):
+        assert streams[stream_type]['data'].shape == (0,)
+        assert streams[stream_type]['data'].dtype == np.float64
+
+
+def test_activity_map_without_gps_samples():
+    from app.pages.stravaDash import create_activity_map
+    streams = decode({'latlng': {'data': []}})
+    layout = create_activity_map({'activity': {'name': 'Treadmill'}, 'streams': streams})
+    assert layout.children == "No GPS data available for this activity"
@@ -0,0 +1,44 @@
+import copy
+
+import pytest
+
+from app.tools.svg_tools import Canvas, Ellipse, Rectangle, ShapeRef, Style, ValidationError
+
+
+def test_shape_handles_read_the_buffer_row():
+    canvas = Canvas(100, 100)
+    canvas.fill('red')
+    circle = canvas.circle(10, 20, 6)
+    ellipse = canvas.ellipse(30, 40, 8, 4, rotation=45)
+    rect = canvas.rect(1, 2, 3, 4)
+
+    assert isinstance(circle, ShapeRef)
+    assert (circle.x, circle.y, circle.width, circle.height, circle.rotation) == (10, 20, 6, 6, 0)
+    assert (ellipse.width, ellipse.height, ellipse.rotation) == (8, 4, 45)
+    assert (rect.x, rect.y, rect.width, rect.height) == (1, 2, 3, 4)
+    assert circle.style == Style(fill='red')
+    with pytest.raises(AttributeError):
+        rect.rotation
+
+
+def test_writes_through_a_handle_change_the_output():
+    canvas = Canvas(100, 100, precision=0, style_mode='inline')
+    circle = canvas.circle(10, 20, 6)
+    circle.x = 50
+    circle.width = 10
+    circle.style = Style(fill='blue')
+    assert '<ellipse cx="50" cy="20" rx="5" ry="3" fill="blue"' in canvas._generate_svg()
+    with pytest.raises(ValidationError):
+        circle.height = 0
+
+
+def test_handles_match_the_shape_objects():
+    canvas = Canvas(100, 100)
+    ellipse = canvas.ellipse(30, 40, 8, 4, rotation=45)
+    rect = canvas.rect(1, 2, 3, 4)
+    assert ellipse.to_svg(precision=2) == Ellipse(30, 40, 8, 4, 45, Style()).to_svg(precision=2)
+    assert rect.to_svg(precision=2) == Rectangle(1, 2, 3, 4, Style()).to_svg(precision=2)
+    # handles into a buffer with unflushed rows stay valid after the flush
+    handles = [canvas.circle(i, i, 1) for i in range(5000)]
+    assert handles[-1].x == 4999
+    assert copy.copy(handles[0]).x == 0
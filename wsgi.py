@@ -0,0 +1,8 @@
+import os
+
+from app.app import init_app
+
+# gunicorn.conf.py preloads this module in the master process, so importing every page
+# here lets the forked workers share the loaded modules and built pages copy-on-write
+app = init_app(preload_pages=os.getenv('PRELOAD_PAGES', '1') == '1')
+server = app.server